@@ -11,15 +11,24 @@ sys.path.insert(0, str(project_root / "src"))
 
 # Now your regular imports
 import gradio as gr
-from product.crew import ProductDiscoveryCrew
+from product.checkpoints import load_output
+from product.jobs import FINISHED, JobQueueFull, get_job_manager, log_path
+from product.schemas import render
+from product import telemetry
 import time
 from datetime import datetime
-from io import StringIO
+import os
 import re
-import queue
 import threading
 import sys
 
+# How much of the live log is sent to the browser per tick
+LOG_TAIL_CHARS = int(os.getenv("PRODUCT_LOG_TAIL_CHARS", "20000"))
+POLL_SECONDS = 0.5
+
+# Analyses run as jobs (product/jobs.py): the page only submits and follows them,
+# so a closed tab loses nothing and the job can be picked up again by ID
+
 # Custom CSS for beautiful styling
 custom_css = """
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap');
@@ -108,15 +117,41 @@ custom_css = """
     color: #6b7280;
 }
 
+.agent-failed {
+    background: #fee2e2;
+    color: #991b1b;
+}
+
 @keyframes pulse {
     0%, 100% { opacity: 1; }
     50% { opacity: 0.6; }
 }
 """
 
+# Badge index of the agent behind each task (crew.py task names)
+TASK_AGENTS = {
+    "market_landscape_task": 0,
+    "subreddit_discovery_task": 1,
+    "customer_pain_task": 1,
+    "opportunity_sizing_task": 2,
+    "risk_assumptions_task": 3,
+    "final_strategy_task": 4,
+}
+
+# Result tab (position in the outputs of analyze_product_idea) filled by each task's output
+TASK_TABS = {
+    "market_landscape_task": 1,
+    "customer_pain_task": 2,
+    "opportunity_sizing_task": 3,
+    "risk_assumptions_task": 4,
+    "final_strategy_task": 5,
+}
+
 # Agent activity tracker
 class AgentTracker:
     def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
         self.activities = []
         self.agents = [
             {"name": "Market Landscape", "icon": "🔍", "status": "pending"},
@@ -126,21 +161,72 @@ class AgentTracker:
             {"name": "Strategy Synthesis", "icon": "🎯", "status": "pending"}
         ]
     
-    def update_status(self, agent_index: int, status: str, message: str = ""):
-        if 0 <= agent_index < len(self.agents):
-            self.agents[agent_index]["status"] = status
-            
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.activities.append({
-            "time": timestamp,
-            "message": message
-        })
-    
+    def update_status(self, agent_index: int, status: str, message: str = "", at: float = None):
+        with self.lock:
+            if 0 <= agent_index < len(self.agents):
+                self.agents[agent_index]["status"] = status
+            self.log(message, at)
+
+    def log(self, message: str, at: float = None):
+        timestamp = (datetime.fromtimestamp(at) if at else datetime.now()).strftime("%H:%M:%S")
+        with self.lock:
+            self.activities.append({
+                "time": timestamp,
+                "message": message
+            })
+            self.version += 1
+
+    def on_span(self, span: dict, at: float = None):
+        """Job span events: task spans drive the badges, tool and LLM calls the activity log"""
+        event, kind, name, status = span["event"], span["kind"], span["name"], span["status"]
+        agent_name = span["attrs"].get("agent", "")
+        if kind == "task" and name in TASK_AGENTS:
+            index = TASK_AGENTS[name]
+            agent = self.agents[index]["name"]
+            if event == "start":
+                self.update_status(index, "running", f"{agent} started {name}", at)
+            elif status == "error":
+                self.update_status(index, "failed", f"{agent} failed: {span['error']}", at)
+            elif name != "subreddit_discovery_task":
+                # Pain mining owns two tasks; its badge completes with the second
+                self.update_status(index, "completed", f"{agent} finished in {span['duration_s']:.1f}s", at)
+        elif kind == "tool" and event == "end":
+            outcome = f"failed: {span['error']}" if status == "error" else f"{span['duration_s']:.1f}s"
+            self.log(f"🔧 {name} ({agent_name}) {outcome}", at)
+        elif kind == "llm" and event == "end" and status == "error":
+            self.log(f"🧠 LLM call failed ({agent_name}): {span['error']}", at)
+
+    def on_task_output(self, name: str, at: float = None):
+        """A task's output is available: its agent is done (also for outputs reused from earlier runs)"""
+        if name not in TASK_AGENTS or name == "subreddit_discovery_task":
+            return
+        index = TASK_AGENTS[name]
+        if self.agents[index]["status"] != "completed":
+            self.update_status(index, "completed", f"{self.agents[index]['name']} output ready ({name})", at)
+
+    def on_status(self, job: dict, at: float = None):
+        status = job["status"]
+        if status == "queued":
+            position = job.get("queue_position")
+            self.log(f"⏳ Queued{f' (position {position})' if position else ''}", at)
+        elif status == "running":
+            self.log("🚀 Analysis started", at)
+        elif status == "succeeded":
+            self.log("✅ Analysis finished", at)
+        elif status == "failed":
+            self.log(f"❌ Analysis failed: {job.get('error')}", at)
+        elif status == "cancelled":
+            self.log("🛑 Analysis cancelled", at)
+
     def get_progress_html(self):
+        with self.lock:
+            agents = [dict(agent) for agent in self.agents]
+            activities = list(self.activities[-10:])
+
         html = '<div style="margin: 20px 0;">'
         
         # Progress badges
-        for agent in self.agents:
+        for agent in agents:
             status_class = f"agent-{agent['status']}"
             html += f'<span class="agent-badge {status_class}">{agent["icon"]} {agent["name"]}</span>'
         
@@ -150,7 +236,7 @@ class AgentTracker:
         html += '<div class="card" style="margin-top: 20px; max-height: 300px; overflow-y: auto;">'
         html += '<h3 style="margin-top: 0;">📋 Activity Log</h3>'
         
-        for activity in self.activities[-10:]:
+        for activity in activities:
             html += f'<div style="padding: 8px; border-left: 3px solid #667eea; margin: 8px 0; background: #f9fafb;">'
             html += f'<span style="font-weight: 600; color: #667eea;">{activity["time"]}</span> '
             html += f'<span>{activity["message"]}</span>'
@@ -159,124 +245,154 @@ class AgentTracker:
         html += '</div>'
         return html
 
-# Stream handler to capture terminal output
-class StreamToQueue:
-    def __init__(self, q):
-        self.q = q
-
-    def write(self, data):
-        if data:
-            self.q.put(data)
-
-    def flush(self):
-        pass
-
-# Parse results into structured sections
-def parse_results(raw_output: str):
-    """Extract key sections from the crew output"""
+def tail_log(path, chars: int = LOG_TAIL_CHARS) -> str:
+    """Last `chars` characters of a job's log file, read from the end (cost bounded by `chars`)."""
+    if not path.exists():
+        return ""
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        # UTF-8 characters are at most 4 bytes
+        f.seek(max(size - chars * 4, 0))
+        text = f.read().decode("utf-8", errors="ignore")[-chars:]
+    if size > len(text.encode("utf-8")):
+        text = f"... (showing the last {len(text):,} characters, download the full log below)\n" + text
+    return text
+
+# Summary fields, read from the typed task outputs (see product/schemas.py)
+def parse_results(outputs):
+    """Extract the summary fields from the task outputs, keyed by task name"""
+    final = outputs.get("final_strategy_task")
     sections = {
         "recommendation": "",
         "confidence": "",
         "market_size": "",
         "top_risk": "",
-        "full_report": raw_output
+        "full_report": render(final) if final else "No data"
     }
-    
-    # Improved parsing with regex for cleaner extraction
-    rec_match = re.search(r"Product Recommendation:\s*(.*?)(?:\n\n|\n[A-Z]|$)", raw_output, re.DOTALL)
-    if rec_match:
-        sections["recommendation"] = rec_match.group(1).strip()
-    
-    conf_match = re.search(r"Confidence Level:\s*(.*?)(?:\n|$)", raw_output)
-    if conf_match:
-        sections["confidence"] = conf_match.group(1).strip()
-    
-    # Extract market sizing info (looking for SOM range)
-    som_match = re.search(r"SOM.*?(\$[\d\.,MK\s]+-?\$?[\d\.,MK\s]+)", raw_output)
-    if som_match:
-        sections["market_size"] = som_match.group(1).strip()
-    
-    # Extract top risk
-    risk_match = re.search(r"(?:CRITICAL RISK|KEY RISKS):\s*(.*?)(?:\n\n|\n[A-Z]|$)", raw_output, re.DOTALL)
-    if risk_match:
-        risk_text = risk_match.group(1).strip()
+
+    recommendation = getattr(final, "pydantic", None)
+    if recommendation is not None:
+        sections["recommendation"] = f"{recommendation.decision.capitalize()}: {recommendation.summary}"
+        sections["confidence"] = recommendation.confidence.capitalize()
+    elif final is not None:
+        # Untyped output (e.g. schema validation failed): fall back to the text
+        rec_match = re.search(r"Product Recommendation:\s*(.*?)(?:\n\n|\n[A-Z]|$)", final.raw, re.DOTALL)
+        if rec_match:
+            sections["recommendation"] = rec_match.group(1).strip()
+        conf_match = re.search(r"Confidence Level:\s*(.*?)(?:\n|$)", final.raw)
+        if conf_match:
+            sections["confidence"] = conf_match.group(1).strip()
+
+    sizing = getattr(outputs.get("opportunity_sizing_task"), "pydantic", None)
+    if sizing is not None:
+        sections["market_size"] = sizing.som.range_text
+    else:
+        som_match = re.search(r"SOM.*?(\$[\d\.,MK\s]+-?\$?[\d\.,MK\s]+)", sections["full_report"])
+        if som_match:
+            sections["market_size"] = som_match.group(1).strip()
+
+    risks = getattr(outputs.get("risk_assumptions_task"), "pydantic", None)
+    if risks is not None and risks.top_risk is not None:
+        risk_text = f"{risks.top_risk.risk} ({risks.top_risk.severity} severity)"
         sections["top_risk"] = risk_text[:300] + "..." if len(risk_text) > 300 else risk_text
-    
+
     return sections
 
-# Main analysis function with progress tracking and streaming
+def _message(text):
+    """Output tuple showing only a message (inputs missing, queue full, unknown job...)"""
+    return (text, "", "", "", "", "", "Waiting for input...", None)
+
+
+# Main analysis function: submits a job, then follows it
 def analyze_product_idea(product_idea, target_customer, constraints, industry, vertical):
-    """Run the product discovery analysis with real-time updates and streaming logs"""
-    
-    tracker = AgentTracker()
-    log_queue = queue.Queue()
-    stream_handler = StreamToQueue(log_queue)
-    
-    # Capture stdout
-    old_stdout = sys.stdout
-    sys.stdout = stream_handler
-    
+    """Queue the product discovery analysis and stream its progress"""
+
     # Validate inputs
     if not product_idea or not target_customer:
-        sys.stdout = old_stdout
-        yield (
-            "❌ Please provide both a product idea and target customer.",
-            "", "", "", "", "", "Waiting for input..."
-        )
+        yield _message("❌ Please provide both a product idea and target customer.")
         return
 
-    # Prepare inputs
-    inputs = {
-        "product_idea": product_idea,
-        "target_customer": target_customer,
-        "constraints": constraints or "No specific constraints provided",
-        "industry": industry or "Not specified",
-        "vertical": vertical or "Not specified"
-    }
+    try:
+        job = get_job_manager().submit({
+            "product_idea": product_idea,
+            "target_customer": target_customer,
+            # Empty optional fields get the shared defaults in job_inputs (they are part of the
+            # task fingerprints, so dashboard, CLI and batch runs can reuse each other's outputs)
+            "constraints": constraints,
+            "industry": industry,
+            "vertical": vertical,
+        })
+    except JobQueueFull as e:
+        yield _message(f"⏳ The analysis queue is full ({e}). Please try again in a minute.")
+        return
 
-    results = {"final": None, "error": None}
-    
-    def run_crew():
-        try:
-            crew_obj = ProductDiscoveryCrew().crew()
-            results["final"] = crew_obj.kickoff(inputs=inputs)
-        except Exception as e:
-            results["error"] = str(e)
-
-    # Start crew in a separate thread
-    thread = threading.Thread(target=run_crew)
-    thread.start()
-
-    accumulated_logs = ""
-    summary_html = '<div class="card"><p style="text-align: center; padding: 20px;">🤖 Agents are brainstorming... check the "Agent Thinking" tab for live logs!</p></div>'
-    
-    # Yield logs while the thread is running
-    while thread.is_alive():
-        while not log_queue.empty():
-            accumulated_logs += log_queue.get()
-        
-        yield (
-            summary_html,
-            "_Analysis in progress..._",
-            "_Analysis in progress..._",
-            "_Analysis in progress..._",
-            "_Analysis in progress..._",
-            accumulated_logs,
-            accumulated_logs
-        )
-        time.sleep(0.5)
-
-    # Restore stdout
-    sys.stdout = old_stdout
-
-    if results["error"]:
-        error_msg = f"❌ An error occurred: {results['error']}"
-        yield (error_msg, "", "", "", "", "", accumulated_logs)
+    yield from follow_job(job["id"])
+
+
+def follow_job(job_id):
+    """Stream a job's badges, activity log, finished task tabs and crew log until it ends (works for any earlier job too)"""
+    manager = get_job_manager()
+    job_id = (job_id or "").strip()
+    job = manager.get(job_id) if job_id else None
+    if job is None:
+        yield _message(f"❌ No analysis with job ID '{job_id}'.")
+        return
+
+    tracker = AgentTracker()
+    log_file = log_path(job_id)
+    summary_html = (
+        '<div class="card"><p style="text-align: center; padding: 20px;">🤖 Agents are brainstorming... '
+        'check the "Agent Thinking" tab for live logs!<br>'
+        f'<span style="color: #6b7280; font-size: 14px;">Job ID <code>{job_id}</code>: if you close this page, '
+        'paste it under "Resume an analysis" to pick up the results.</span></p></div>'
+    )
+    in_progress = "_Analysis in progress..._"
+
+    yield (summary_html, in_progress, in_progress, in_progress, in_progress, in_progress, "", None)
+
+    # Only push the (bounded) log tail, the badges and tabs whose task just finished
+    seq, seen_version, seen_log_size = 0, 0, -1
+    while True:
+        # Status first: every event written before the job finished is read below
+        job = manager.get(job_id)
+        # None = leave that output as it is
+        update = [None] * 8
+        for event in manager.store.events(job_id, after=seq):
+            seq = event["seq"]
+            if event["type"] == "span":
+                tracker.on_span(event["data"], event["at"])
+            elif event["type"] == "status":
+                tracker.on_status({**job, **event["data"]}, event["at"])
+            elif event["type"] == "task":
+                # Each tab fills in as soon as its task is done, long before synthesis
+                name = event["data"]["task"]
+                tracker.on_task_output(name, event["at"])
+                if name in TASK_TABS:
+                    update[TASK_TABS[name]] = render(load_output(event["data"]["output"])) or "No data"
+        if job["status"] in FINISHED:
+            break
+
+        if tracker.version != seen_version:
+            seen_version = tracker.version
+            update[0] = tracker.get_progress_html()
+        log_size = log_file.stat().st_size if log_file.exists() else 0
+        if log_size != seen_log_size:
+            seen_log_size = log_size
+            update[6] = tail_log(log_file)
+        if any(value is not None for value in update):
+            yield tuple(gr.skip() if value is None else value for value in update)
+        time.sleep(POLL_SECONDS)
+
+    logs = tail_log(log_file)
+    log_download = str(log_file) if log_file.exists() else None
+    if job["status"] != "succeeded":
+        reason = job["error"] if job["status"] == "failed" else "the analysis was cancelled"
+        yield (f"❌ An error occurred: {reason}", "", "", "", "", "", logs, log_download)
         return
 
     # Process final results
-    result = results["final"]
-    sections = parse_results(str(result))
+    tasks = {name: load_output(data) for name, data in manager.store.task_outputs(job_id).items()}
+    sections = parse_results(tasks)
     
     # Create beautiful summary HTML
     summary_html = f"""
@@ -301,14 +417,12 @@ def analyze_product_idea(product_idea, target_customer, constraints, industry, v
     </div>
     """
     
-    # Extract specific task outputs
-    # Order in crew.py: market_landscape (0), subreddit_discovery (1), customer_pain (2), opportunity_sizing (3), risk_assumptions (4), final_strategy (5)
-    tasks = result.tasks_output
-    competitive = tasks[0].raw if len(tasks) > 0 else "No data"
-    pain = tasks[2].raw if len(tasks) > 2 else "No data"
-    sizing = tasks[3].raw if len(tasks) > 3 else "No data"
-    risks = tasks[4].raw if len(tasks) > 4 else "No data"
-    full_text = str(result)
+    # Tab contents by task name (typed outputs are rendered to markdown)
+    competitive = render(tasks.get("market_landscape_task")) or "No data"
+    pain = render(tasks.get("customer_pain_task")) or "No data"
+    sizing = render(tasks.get("opportunity_sizing_task")) or "No data"
+    risks = render(tasks.get("risk_assumptions_task")) or "No data"
+    full_text = sections["full_report"]
 
     yield (
         summary_html,
@@ -317,7 +431,8 @@ def analyze_product_idea(product_idea, target_customer, constraints, industry, v
         sizing,
         risks,
         full_text,
-        accumulated_logs
+        logs,
+        log_download
     )
 
 # Create Gradio interface
@@ -377,6 +492,15 @@ with gr.Blocks(title="Product Discovery AI") as demo:
                 submit_btn = gr.Button("🚀 Start Analysis", variant="primary", size="lg")
                 clear_btn = gr.ClearButton([product_idea, target_customer, constraints, industry, vertical], value="Clear")
 
+            with gr.Accordion("🔁 Resume an analysis", open=False):
+                job_id_input = gr.Textbox(
+                    label="Job ID",
+                    placeholder="job-20250101-120000-abc123",
+                    lines=1,
+                    info="Shown when an analysis starts; analyses keep running if you close the page"
+                )
+                resume_btn = gr.Button("Show results")
+
             
             # Examples
             gr.Examples(
@@ -437,23 +561,36 @@ inputs=[product_idea, target_customer, constraints, industry, vertical],
                         value="Agents are ready to start...",
                         lines=20
                     )
+                    log_file_output = gr.File(label="Full log (available when the run finishes)")
     
 
     
-    # Wire up the submit button
+    # Wire up the submit button. The handlers only follow jobs (admission and
+    # concurrency are the job queue's), so they are not concurrency-limited
+    result_outputs = [summary_output, competitive_output, pain_output, sizing_output, risks_output, full_output, thinking_output, log_file_output]
     submit_btn.click(
         fn=analyze_product_idea,
         inputs=[product_idea, target_customer, constraints, industry, vertical],
-        outputs=[summary_output, competitive_output, pain_output, sizing_output, risks_output, full_output, thinking_output],
-        show_progress=True
+        outputs=result_outputs,
+        show_progress=True,
+        concurrency_limit=None
+    )
+    resume_btn.click(
+        fn=follow_job,
+        inputs=[job_id_input],
+        outputs=result_outputs,
+        show_progress=True,
+        concurrency_limit=None
     )
 
-# Launch the app
+# Launch the app together with the job API (product/api.py) on one server
 if __name__ == "__main__":
+    import uvicorn
+    from product.api import app as api_app
+
+    # Starts the job workers (re-queuing unfinished jobs) and warms up their crews
+    get_job_manager()
+    telemetry.start_metrics_server()
     demo.queue()
-    demo.launch(
-    share=False,
-    show_error=True,
-    server_name="0.0.0.0", 
-    css=custom_css
-)
+    app = gr.mount_gradio_app(api_app, demo, path="/", css=custom_css, show_error=True)
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("GRADIO_SERVER_PORT", "7860")))
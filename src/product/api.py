@@ -0,0 +1,135 @@
+"""
+HTTP API for analysis jobs (see product.jobs).
+
+    POST   /jobs                 submit inputs -> 202 with the job (429 + Retry-After when the queue is full)
+    GET    /jobs                 recent jobs
+    GET    /jobs/{id}            status, queue position, task outputs so far and the result
+    GET    /jobs/{id}/events     server-sent events: status changes, task/tool spans, task outputs
+    GET    /jobs/{id}/log        the job's crew log
+    DELETE /jobs/{id}            cancel a job that has not started
+    GET    /health               worker and queue counts, per-host rate limiter queues and waits
+
+The dashboard (app_basic.py) serves the same routes next to its UI; `uv run api`
+serves them alone. FastAPI and uvicorn come with Gradio.
+"""
+
+import argparse
+import json
+import time
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from product.jobs import FINISHED, JobQueueFull, get_job_manager, log_path
+from product.tools.rate_limit import get_rate_limiter
+
+# Suggested wait before resubmitting when the queue is full
+RETRY_AFTER_SECONDS = 60
+EVENT_POLL_SECONDS = 0.5
+
+app = FastAPI(title="Product Discovery AI", description="Asynchronous product idea analysis jobs")
+
+
+class JobRequest(BaseModel):
+    """Inputs of one analysis (same fields as the dashboard)."""
+    product_idea: str = Field(..., min_length=1)
+    target_customer: str = Field(..., min_length=1)
+    constraints: str = ""
+    industry: str = ""
+    vertical: str = ""
+    mode: Optional[str] = Field(default=None, description="'sequential' or 'parallel' (PRODUCT_EXECUTION_MODE if unset)")
+
+
+def _job_or_404(job_id: str) -> dict:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with ID '{job_id}'")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    manager = get_job_manager()
+    try:
+        return manager.submit(request.model_dump(exclude={"mode"}), mode=request.mode)
+    except JobQueueFull as e:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(e), **manager.stats()},
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.get("/jobs")
+def list_jobs(limit: int = Query(20, ge=1, le=500), status: Optional[str] = None):
+    return get_job_manager().store.recent(limit, status)
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = _job_or_404(job_id)
+    job["tasks"] = get_job_manager().store.task_outputs(job_id)
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+def stream_events(job_id: str, after: int = 0):
+    """Server-sent events from `after` on; the stream ends once the job has finished."""
+    _job_or_404(job_id)
+    store = get_job_manager().store
+
+    def events():
+        seq = after
+        while True:
+            # Read the status first so no event written before it finished is missed
+            finished = store.get(job_id)["status"] in FINISHED
+            for event in store.events(job_id, after=seq):
+                seq = event["seq"]
+                yield f"id: {seq}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if finished:
+                return
+            time.sleep(EVENT_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/jobs/{job_id}/log")
+def get_log(job_id: str):
+    _job_or_404(job_id)
+    path = log_path(job_id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="The job has not written a log yet")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = _job_or_404(job_id)
+    if not get_job_manager().cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; only queued jobs can be cancelled")
+    return get_job_manager().get(job_id)
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", **get_job_manager().stats(), "rate_limits": get_rate_limiter().metrics()}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the analysis job API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    # Start workers (and re-queue unfinished jobs) before the first request
+    get_job_manager()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
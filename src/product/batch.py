@@ -0,0 +1,185 @@
+"""
+Batch analysis of many product ideas.
+Reads ideas from a JSONL or CSV file, runs them on a bounded thread pool of
+warm crews and appends one JSONL record per finished idea to the output file.
+All runs share the process-wide tool cache, HTTP session and rate limiter, so
+concurrent ideas never exceed the per-host limits.
+
+Restarting with the same output file skips ideas that already succeeded; ideas
+that failed mid-run resume from their task checkpoints.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from product import telemetry
+from product.checkpoints import hash_inputs
+from product.log_capture import capture_to
+from product.results import DEFAULTS, INPUT_FIELDS, FileSink, result_record
+
+def read_ideas(path: Path) -> Iterator[dict]:
+    """
+    Yield {"id", "inputs"} per row of a .jsonl or .csv file. Rows without an
+    `id` column are identified by a hash of their inputs, so re-running the
+    same file matches ideas to earlier results.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with path.open(encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            raise ValueError(f"{path}:{number}: expected an object with product_idea, target_customer, ...")
+        # JSON values can be numbers, booleans or lists; every input is text
+        inputs = {field: str(row.get(field) or "").strip() for field in INPUT_FIELDS}
+        if not inputs["product_idea"] or not inputs["target_customer"]:
+            raise ValueError(f"{path}:{number}: product_idea and target_customer are required")
+        for field, default in DEFAULTS.items():
+            inputs[field] = inputs[field] or default
+        # IDs become file names and run IDs
+        idea_id = re.sub(r"[^\w.-]", "_", str(row.get("id") or "").strip()) or hash_inputs(inputs)
+        yield {"id": idea_id, "inputs": inputs}
+
+
+def completed_ids(path: Path) -> set:
+    """IDs already written to the output file with status "ok"."""
+    done = set()
+    if not path.exists():
+        return done
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial last line from an interrupted run
+                continue
+            if record.get("status") == "ok":
+                done.add(record.get("id"))
+    return done
+
+
+class BatchRunner:
+    """Runs ideas concurrently and appends a JSONL record as each one finishes."""
+
+    def __init__(self, output: Path, workers: int = 2, mode: Optional[str] = None, log_dir: Optional[Path] = None):
+        from product.crew_pool import CrewPool
+
+        self.output = Path(output)
+        self.workers = max(workers, 1)
+        self.mode = mode
+        self.log_dir = Path(log_dir) if log_dir else self.output.with_name(f"{self.output.stem}_logs")
+        self.pool = CrewPool(size=self.workers)
+        self._write_lock = threading.Lock()
+
+    def _write(self, record: dict) -> None:
+        # One complete line per write, flushed, so a crash loses at most the idea in flight
+        line = json.dumps(record, default=str) + "\n"
+        with self._write_lock:
+            with self.output.open("a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+
+    def run_one(self, idea: dict) -> dict:
+        # Stable run ID per idea: a restarted batch picks up its task checkpoints
+        run_id = f"batch-{idea['id']}"
+        sink = FileSink(self.log_dir / f"{idea['id']}.log")
+        tracer = telemetry.Tracer(run_id)
+        start = time.perf_counter()
+        try:
+            with capture_to(sink), telemetry.trace(tracer), self.pool.acquire() as discovery:
+                result = discovery.pipeline(mode=self.mode, run_id=run_id).kickoff(inputs=idea["inputs"])
+            record = result_record(idea, run_id, result, time.perf_counter() - start)
+        except Exception as e:
+            record = {
+                "id": idea["id"],
+                "status": "error",
+                "run_id": run_id,
+                "inputs": idea["inputs"],
+                "error": f"{type(e).__name__}: {e}",
+                "duration_s": round(time.perf_counter() - start, 2),
+                "completed_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        finally:
+            sink.close()
+            tracer.finish()
+            tracer.export()
+        self._write(record)
+        return record
+
+    def run(self, ideas: List[dict]) -> dict:
+        """Run every idea not already in the output file; returns the throughput summary."""
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        done = completed_ids(self.output)
+        # Duplicate rows would share a run ID (and its checkpoints): run each ID once
+        pending = list({idea["id"]: idea for idea in ideas if idea["id"] not in done}.values())
+        # Progress goes to stderr: while a single idea is capturing, stdout from
+        # threads without a capture context is routed to that idea's log
+        print(f"📦 {len(ideas)} ideas, {len(ideas) - len(pending)} already done, "
+              f"{len(pending)} to run on {self.workers} workers", file=sys.stderr)
+
+        if pending:
+            self.pool.warmup(min(self.workers, len(pending)))
+        records: List[dict] = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.run_one, idea): idea for idea in pending}
+            for future in as_completed(futures):
+                record = future.result()
+                records.append(record)
+                mark = "✅" if record["status"] == "ok" else "❌"
+                detail = record.get("decision") or record.get("error", "")
+                print(f"{mark} [{len(records)}/{len(pending)}] {record['id']} "
+                      f"{record['duration_s']:.0f}s {detail}"[:160], file=sys.stderr)
+        return summarize(records, time.perf_counter() - start, skipped=len(ideas) - len(pending))
+
+
+def summarize(records: List[dict], wall: float, skipped: int = 0) -> dict:
+    ok = [r for r in records if r["status"] == "ok"]
+    durations = sorted(r["duration_s"] for r in records)
+    tokens = sum(r["token_usage"]["prompt_tokens"] + r["token_usage"]["completion_tokens"] for r in ok)
+    return {
+        "completed": len(ok),
+        "failed": len(records) - len(ok),
+        "skipped": skipped,
+        "wall_s": round(wall, 1),
+        "ideas_per_hour": round(len(records) / wall * 3600, 1) if wall and records else 0.0,
+        "mean_idea_s": round(sum(durations) / len(durations), 1) if durations else 0.0,
+        "p95_idea_s": durations[min(len(durations) - 1, int(len(durations) * 0.95))] if durations else 0.0,
+        "total_tokens": tokens,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Analyze many product ideas from a JSONL or CSV file")
+    parser.add_argument("ideas", type=Path, help="Input file (.jsonl or .csv) with product_idea, target_customer, ...")
+    parser.add_argument("--output", type=Path, help="Results file (default: <ideas>.results.jsonl); reused to resume")
+    parser.add_argument("--workers", type=int, default=2, help="Ideas analyzed at the same time")
+    parser.add_argument("--mode", choices=["sequential", "parallel"], help="Task execution mode per idea")
+    args = parser.parse_args(argv)
+
+    output = args.output or args.ideas.with_name(f"{args.ideas.stem}.results.jsonl")
+    ideas = list(read_ideas(args.ideas))
+    summary = BatchRunner(output, workers=args.workers, mode=args.mode).run(ideas)
+
+    print(f"\n🚀 {summary['completed']} done, {summary['failed']} failed, {summary['skipped']} skipped "
+          f"in {summary['wall_s']}s ({summary['ideas_per_hour']} ideas/hour, "
+          f"mean {summary['mean_idea_s']}s, p95 {summary['p95_idea_s']}s per idea)")
+    print(f"   {summary['total_tokens']:,} LLM tokens; results in {output}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
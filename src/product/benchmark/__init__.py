@@ -0,0 +1,8 @@
+"""
+Offline benchmark harness.
+Runs ProductDiscoveryCrew end to end against a local stub server (recorded
+Reddit JSON/RSS, Serper, web page and embedding fixtures) and a scripted fake
+LLM, so performance changes can be measured without network variance.
+
+Usage: benchmark [--runs N] [--concurrency N] [--output results.json] [--compare baseline.json]
+"""
@@ -0,0 +1,101 @@
+"""
+Deterministic stand-in for the agents' LLM.
+Replies follow fixtures/llm_script.json: for each task (matched on its
+"Current Task" text) a fixed sequence of ReAct steps, i.e. tool calls and then
+a final answer, so the real tools and crew plumbing run exactly as in production.
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM
+
+from product.budget import count_tokens
+
+SCRIPT_FILE = Path(__file__).parent / "fixtures" / "llm_script.json"
+_CURRENT_TASK = re.compile(r"Current Task:(.*?)(?:\n\nBegin!|$)", re.DOTALL)
+
+
+def load_script(base_url: str, path: Path = SCRIPT_FILE) -> List[dict]:
+    """Task scripts with the stub server's URL filled in."""
+    raw = path.read_text(encoding="utf-8").replace("{base_url}", base_url)
+    return json.loads(raw)["tasks"]
+
+
+class ScriptedLLM(BaseLLM):
+    """Fake LLM replaying scripted ReAct steps with a fixed per-call latency."""
+
+    def __init__(self, script: List[dict], latency: float = 0.2, model: str = "scripted-fake"):
+        super().__init__(model=model)
+        self.script = script
+        self.latency = latency
+        self.calls = 0
+        self.unmatched = 0
+        self._lock = threading.Lock()
+
+    def supports_function_calling(self) -> bool:
+        # Forces the text (Thought/Action/Final Answer) protocol the script is written in
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None) -> str:
+        messages = self._format_messages(messages)
+        # Same events as a real LLM call, so tracing sees the fake calls too
+        self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        reply = self._reply(messages)
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        self._track_token_usage_internal({
+            "prompt_tokens": count_tokens(prompt),
+            "completion_tokens": count_tokens(reply),
+        })
+        self._emit_call_completed_event(
+            response=reply, call_type=LLMCallType.LLM_CALL, from_task=from_task, from_agent=from_agent, messages=messages,
+        )
+        return reply
+
+    def _reply(self, messages: List[dict]) -> str:
+        entry = self._match(messages)
+        if entry is None:
+            with self._lock:
+                self.unmatched += 1
+            return "Thought: I now can give a great answer\nFinal Answer: No scripted response for this prompt."
+        # One scripted step per assistant turn already taken in this conversation
+        step_index = sum(1 for m in messages if m.get("role") == "assistant")
+        step = entry["steps"][min(step_index, len(entry["steps"]) - 1)]
+        if "action" in step:
+            return (
+                f"Thought: I should use {step['action']}\n"
+                f"Action: {step['action']}\n"
+                f"Action Input: {json.dumps(step['input'])}"
+            )
+        final = step["final"]
+        if not isinstance(final, str):
+            final = json.dumps(final)
+        return f"Thought: I now can give a great answer\nFinal Answer: {final}"
+
+    def _match(self, messages: List[dict]) -> Optional[dict]:
+        for message in messages:
+            found = _CURRENT_TASK.search(str(message.get("content", "")))
+            if not found:
+                continue
+            for entry in self.script:
+                if entry["match"] in found.group(1):
+                    return entry
+        return None
+
+
+def install(crew: Any, script: List[dict], latency: float) -> None:
+    """Give every agent of a built crew its own scripted LLM (so usage stays per agent)."""
+    for agent in crew.agents:
+        agent.llm = ScriptedLLM(script, latency=latency)
@@ -0,0 +1,296 @@
+"""
+Benchmark entry point.
+Starts the stub server, points every tool at it, swaps each agent's LLM for
+the scripted fake and then measures:
+  - per-task and per-tool wall time over --runs sequential runs,
+  - throughput of --concurrency simultaneous runs (through a CrewPool),
+  - peak Python heap (tracemalloc) and process RSS.
+Results are written as JSON (with the git commit) so runs can be compared
+across commits with --compare.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from product.benchmark.stub_server import StubServer
+
+SAMPLE_INPUTS = {
+    "product_idea": "AI-powered meal planning app for people with Type 2 diabetes",
+    "target_customer": "Adults aged 40-65 diagnosed with Type 2 diabetes, struggling with dietary management",
+    "constraints": "Need to ensure FDA compliance, 6-month development window",
+    "industry": "healthcare tech",
+    "vertical": "B2C SaaS",
+}
+
+
+def _configure_env(stub_url: str, cache_dir: str) -> None:
+    # Must run before product.tools is imported: base URLs and limits are read at import time
+    os.environ.update({
+        "PRODUCT_CACHE_DIR": cache_dir,
+        "PRODUCT_REDDIT_BASE_URL": stub_url,
+        "PRODUCT_SERPER_SEARCH_URL": f"{stub_url}/search",
+        "PRODUCT_SERPER_BASE_URL": stub_url,
+        "PRODUCT_RATE_LIMIT_127_0_0_1": "1000/1000",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark"),
+        "SERPER_API_KEY": "benchmark",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "CREWAI_TRACING_ENABLED": "false",
+        # Skips crewai's first-run "view your execution traces?" prompt, which would wait on stdin
+        "CREWAI_TESTING": "true",
+        "OTEL_SDK_DISABLED": "true",
+    })
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _stats(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_s": round(statistics.fmean(ordered), 4),
+        "p50_s": round(ordered[len(ordered) // 2], 4),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max_s": round(ordered[-1], 4),
+    }
+
+
+class Timings:
+    """Task and tool durations collected from crewai events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (task name, id(task)) -> start and completion timestamps, paired once the bus has drained
+        self._task_events = defaultdict(lambda: ([], []))
+        self.tools = defaultdict(list)
+        # Events stamped after this are not recorded (set once the sequential runs are done)
+        self.until = None
+
+    def stop_recording(self) -> None:
+        self.until = datetime.now(timezone.utc)
+
+    def _recorded(self, timestamp: datetime) -> bool:
+        return self.until is None or timestamp < self.until
+
+    @property
+    def tasks(self) -> dict:
+        # Handlers run on a pool of bus threads, so a start can be handled after later runs of
+        # the same (pooled) task finished. A task object runs once at a time, though, so its
+        # n-th start and n-th completion by timestamp belong to the same run.
+        durations = defaultdict(list)
+        with self._lock:
+            for (name, _), (starts, finishes) in self._task_events.items():
+                for started, finished in zip(sorted(starts), sorted(finishes)):
+                    if self._recorded(started):
+                        durations[name].append((finished - started).total_seconds())
+        return durations
+
+    def register(self) -> None:
+        from crewai.events import crewai_event_bus
+        from crewai.events.types.task_events import TaskCompletedEvent, TaskStartedEvent
+        from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+
+        def key(task) -> tuple:
+            return getattr(task, "name", None) or "unknown", id(task)
+
+        # Durations and the recording cut-off come from event timestamps, not handler timing
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            with self._lock:
+                self._task_events[key(event.task)][0].append(event.timestamp)
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            with self._lock:
+                self._task_events[key(event.task)][1].append(event.timestamp)
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            with self._lock:
+                if self._recorded(event.timestamp):
+                    self.tools[event.tool_name].append((event.finished_at - event.started_at).total_seconds())
+
+
+def _run_once(pool, mode: str) -> float:
+    start = time.perf_counter()
+    with pool.acquire() as discovery:
+        discovery.pipeline(mode=mode).kickoff(inputs=SAMPLE_INPUTS)
+    return time.perf_counter() - start
+
+
+def run_benchmark(args) -> dict:
+    stub = StubServer(latency=args.http_latency).start()
+    cache_dir = tempfile.mkdtemp(prefix="product-bench-")
+    _configure_env(stub.url, cache_dir)
+
+    # Imported only now that the environment points at the stub server
+    from product import llm_cache
+    from product.benchmark.fake_llm import install, load_script
+    from product.crew import ProductDiscoveryCrew
+    from product.crew_pool import CrewPool
+    from product.tools.cache import get_tool_cache
+
+    script = load_script(stub.url)
+
+    def factory():
+        instance = ProductDiscoveryCrew()
+        crew = instance.crew()
+        install(crew, script, args.llm_latency)
+        if args.llm_cache:
+            llm_cache.install(crew)
+        if not args.verbose:
+            crew.verbose = False
+            for agent in crew.agents:
+                agent.verbose = False
+        return instance
+
+    timings = Timings()
+    timings.register()
+    tracemalloc.start()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+
+    with quiet:
+        pool = CrewPool(size=max(args.concurrency, 1), factory=factory)
+        build_start = time.perf_counter()
+        pool.warmup()
+        build_s = time.perf_counter() - build_start
+
+        # Sequential runs: per-task/per-tool latency (first run has a cold tool cache)
+        run_times = []
+        for _ in range(args.runs):
+            if args.cold:
+                get_tool_cache().clear()
+            run_times.append(_run_once(pool, args.mode))
+
+        # Concurrent runs: throughput
+        timings.stop_recording()
+        if args.cold:
+            get_tool_cache().clear()
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            concurrent_times = list(executor.map(lambda _: _run_once(pool, args.mode), range(args.concurrency)))
+        wall = time.perf_counter() - wall_start
+
+        # Event handlers still queued on the bus print after kickoff returns and feed the timings;
+        # let them finish now, while stdout is redirected, instead of at interpreter exit
+        from crewai.events import crewai_event_bus
+
+        crewai_event_bus.shutdown(wait=True)
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stub.stop()
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "mode": args.mode,
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "llm_latency_s": args.llm_latency,
+            "http_latency_s": args.http_latency,
+            "cold_cache": args.cold,
+            "llm_cache": args.llm_cache,
+        },
+        "crew_build_s": round(build_s, 4),
+        "run": _stats(run_times),
+        "tasks": {name: _stats(samples) for name, samples in sorted(timings.tasks.items())},
+        "tools": {name: _stats(samples) for name, samples in sorted(timings.tools.items())},
+        "throughput": {
+            "concurrent_runs": args.concurrency,
+            "wall_s": round(wall, 4),
+            "runs_per_min": round(60 * args.concurrency / wall, 2) if wall else None,
+            "run": _stats(concurrent_times),
+        },
+        "memory": {"tracemalloc_peak_mb": round(peak / 1e6, 2), "max_rss_mb": round(rss_mb, 2)},
+        "http_requests": dict(stub.requests),
+        "tool_cache": get_tool_cache().stats(),
+        "llm_cache": llm_cache.get_llm_cache().stats() if args.llm_cache else None,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Side-by-side of mean timings vs. a baseline result file (negative delta = faster)."""
+    lines = [f"Compared with {baseline.get('commit', '?')} ({baseline.get('timestamp', '?')}):"]
+
+    def row(label, new, old):
+        if new is None or old is None:
+            return
+        delta = (new - old) / old * 100 if old else 0.0
+        lines.append(f"  {label:<45} {old:>9.3f} -> {new:>9.3f}  ({delta:+.1f}%)")
+
+    row("run mean (s)", current["run"]["mean_s"], baseline.get("run", {}).get("mean_s"))
+    row("throughput (runs/min)", current["throughput"]["runs_per_min"], baseline.get("throughput", {}).get("runs_per_min"))
+    row("tracemalloc peak (MB)", current["memory"]["tracemalloc_peak_mb"], baseline.get("memory", {}).get("tracemalloc_peak_mb"))
+    for section in ("tasks", "tools"):
+        for name, stats in current[section].items():
+            old = baseline.get(section, {}).get(name)
+            row(f"{section[:-1]} {name} (s)", stats["mean_s"], old and old["mean_s"])
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the product discovery crew")
+    parser.add_argument("--runs", type=int, default=3, help="Sequential runs for per-task/per-tool timings")
+    parser.add_argument("--concurrency", type=int, default=4, help="Simultaneous runs for the throughput phase")
+    parser.add_argument("--mode", choices=["sequential", "parallel"], default="sequential")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--http-latency", type=float, default=0.05, help="Seconds per stub HTTP request")
+    parser.add_argument("--cold", action="store_true", help="Clear the tool cache before every run")
+    parser.add_argument("--llm-cache", action="store_true",
+                        help="Replay LLM replies from the LLM cache (first run records, later runs hit)")
+    parser.add_argument("--output", type=Path, help="Result file (default: bench_results/<commit>-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to diff against")
+    parser.add_argument("--verbose", action="store_true", help="Show crew output")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    output = args.output or Path("bench_results") / f"{results['commit']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    print(f"\n⏱️  {args.runs} runs: mean {results['run']['mean_s']}s, p95 {results['run']['p95_s']}s")
+    for name, stats in results["tasks"].items():
+        print(f"   task {name:<28} mean {stats['mean_s']:>7.3f}s  max {stats['max_s']:>7.3f}s")
+    for name, stats in results["tools"].items():
+        print(f"   tool {name:<36} mean {stats['mean_s']:>7.3f}s  calls {stats['count']}")
+    throughput = results["throughput"]
+    print(f"🚀 {throughput['concurrent_runs']} concurrent runs in {throughput['wall_s']}s "
+          f"({throughput['runs_per_min']} runs/min)")
+    if results["llm_cache"]:
+        print(f"💾 LLM cache hit rate {results['llm_cache']['hit_rate']:.0%} "
+              f"({results['llm_cache']['hits']} hits, {results['llm_cache']['misses']} misses)")
+    print(f"🧠 peak heap {results['memory']['tracemalloc_peak_mb']} MB, max RSS {results['memory']['max_rss_mb']} MB")
+    print(f"📄 results written to {output}")
+    if args.compare:
+        print(compare(results, json.loads(args.compare.read_text(encoding="utf-8"))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Local HTTP stand-in for Reddit, Serper (Reddit and web searches), scraped pages and the
+OpenAI embeddings API.
+Replays the recorded fixtures in ./fixtures with a configurable per-request latency.
+Reddit search pages through REDDIT_PAGES pages via `after` cursors.
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = Path(__file__).parent / "fixtures"
+EMBEDDING_DIMS = 64
+REDDIT_PAGES = 3
+
+
+def _fake_embedding(text: str) -> list:
+    """Deterministic bag-of-words hash embedding, so similar passages score similarly."""
+    vector = [0.0] * EMBEDDING_DIMS
+    for word in text.lower().split():
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        vector[digest[0] % EMBEDDING_DIMS] += 1.0 if digest[1] % 2 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class StubServer:
+    """Threaded stub server; `url` is its base URL once started."""
+
+    def __init__(self, latency: float = 0.05, port: int = 0):
+        self.latency = latency
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._reddit = json.loads((FIXTURES / "reddit_search.json").read_text(encoding="utf-8"))
+        self._comments = json.loads((FIXTURES / "reddit_comments.json").read_text(encoding="utf-8"))
+        self._rss = (FIXTURES / "reddit_search.rss").read_text(encoding="utf-8")
+        self._serper = json.loads((FIXTURES / "serper_search.json").read_text(encoding="utf-8"))
+        self._serper_web = json.loads((FIXTURES / "serper_web.json").read_text(encoding="utf-8"))
+        self._page = (FIXTURES / "market_report.html").read_text(encoding="utf-8")
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="bench-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, route: str) -> None:
+        with self._lock:
+            self.requests[route] += 1
+
+    def reddit_listing(self, subreddit: str, query: str, after: str = "") -> dict:
+        # Same posts for every keyword in a subreddit (so cross-keyword dedupe has work to do),
+        # distinct IDs per subreddit and page
+        page = int(after.rsplit("p", 1)[-1]) if after else 0
+        prefix = hashlib.sha1(subreddit.lower().encode("utf-8")).hexdigest()[:3] + (f"{page}" if page else "")
+        children = []
+        for post in self._reddit["posts"]:
+            post_id = f"{prefix}{post['id']}"
+            children.append({"kind": "t3", "data": {
+                **post,
+                "id": post_id,
+                "subreddit": subreddit,
+                "permalink": f"/r/{subreddit}/comments/{post_id}/{post['slug']}/",
+            }})
+        next_after = f"t3_p{page + 1}" if page + 1 < REDDIT_PAGES else None
+        return {"kind": "Listing", "data": {"after": next_after, "children": children, "before": None}}
+
+    def reddit_comments(self, subreddit: str, post_id: str) -> list:
+        """[post listing, comment listing] as served by /comments/<id>.json."""
+
+        def comment(entry: dict, index: str) -> dict:
+            replies = [comment(reply, f"{index}{i}") for i, reply in enumerate(entry["replies"])]
+            return {"kind": "t1", "data": {
+                "id": f"c{post_id}{index}",
+                "body": entry["body"],
+                "score": entry["score"],
+                "replies": {"kind": "Listing", "data": {"children": replies}} if replies else "",
+            }}
+
+        post = {"kind": "t3", "data": {"id": post_id, "subreddit": subreddit, "title": "", "selftext": ""}}
+        comments = [comment(entry, str(i)) for i, entry in enumerate(self._comments["comments"])]
+        return [
+            {"kind": "Listing", "data": {"children": [post], "after": None}},
+            {"kind": "Listing", "data": {"children": comments, "after": None}},
+        ]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: str, content_type: str, headers: dict = None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _not_modified(self, etag: str):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                params = parse_qs(parts.query)
+                query = params.get("q", [""])[0]
+                segments = parts.path.strip("/").split("/")
+                if len(segments) == 3 and segments[0] == "r" and segments[2] == "search.json":
+                    server._count("reddit_json")
+                    listing = server.reddit_listing(segments[1], query, params.get("after", [""])[0])
+                    self._send(200, json.dumps(listing), "application/json")
+                elif len(segments) == 4 and segments[0] == "r" and segments[2] == "comments":
+                    server._count("reddit_comments")
+                    comments = server.reddit_comments(segments[1], segments[3].removesuffix(".json"))
+                    self._send(200, json.dumps(comments), "application/json")
+                elif len(segments) == 3 and segments[0] == "r" and segments[2] == "new.json":
+                    server._count("reddit_new")
+                    listing = server.reddit_listing(segments[1], "", params.get("after", [""])[0])
+                    self._send(200, json.dumps(listing), "application/json")
+                elif len(segments) == 3 and segments[0] == "r" and segments[2] == "search.rss":
+                    feed = server._rss.replace("{subreddit}", segments[1])
+                    etag = '"' + hashlib.sha1(feed.encode("utf-8")).hexdigest()[:16] + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        server._count("reddit_rss_304")
+                        self._not_modified(etag)
+                        return
+                    server._count("reddit_rss")
+                    self._send(200, feed, "application/atom+xml", {"ETag": etag})
+                elif segments[0] == "pages":
+                    server._count("page")
+                    etag = '"' + hashlib.sha1(server._page.encode("utf-8")).hexdigest()[:16] + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self._not_modified(etag)
+                        return
+                    self._send(200, server._page, "text/html; charset=utf-8", {"ETag": etag})
+                else:
+                    self._send(404, "not found", "text/plain")
+
+            def do_POST(self):
+                time.sleep(server.latency)
+                length = int(self.headers.get("Content-Length", "0"))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                path = urlsplit(self.path).path.rstrip("/")
+                if path == "/search" and "site:reddit.com" in payload.get("q", ""):
+                    server._count("serper")
+                    self._send(200, json.dumps(server._serper), "application/json")
+                elif path == "/search":
+                    # The agents' general web search (SerperDevTool)
+                    server._count("serper_web")
+                    results = {**server._serper_web, "searchParameters": {"q": payload.get("q", ""), "type": "search"}}
+                    self._send(200, json.dumps(results), "application/json")
+                elif path.endswith("/embeddings"):
+                    server._count("embeddings")
+                    texts = payload.get("input", [])
+                    texts = [texts] if isinstance(texts, str) else texts
+                    body = {
+                        "object": "list",
+                        "model": payload.get("model", "stub"),
+                        "data": [
+                            {"object": "embedding", "index": i, "embedding": _fake_embedding(text)}
+                            for i, text in enumerate(texts)
+                        ],
+                        "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                    }
+                    self._send(200, json.dumps(body), "application/json")
+                else:
+                    self._send(404, "not found", "text/plain")
+
+        return Handler
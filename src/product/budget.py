@@ -0,0 +1,324 @@
+"""
+Token accounting and context budgets.
+Counts prompt/completion tokens per task and per tool call, and keeps tool
+outputs and upstream task context within the budgets configured in
+config/budgets.yaml. Anything over budget is compacted with deterministic
+extractive compression: headings, figures and query-relevant lines are kept,
+in their original order, until the budget is spent.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+BUDGETS_FILE = Path(__file__).parent / "config" / "budgets.yaml"
+ENABLED = os.getenv("PRODUCT_TOKEN_BUDGETS", "on").lower() not in ("0", "off", "false", "no")
+# Same separator crewai puts between upstream task outputs
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+
+_HEADING = re.compile(r"^\s*(#{1,6}\s|\*\*[^*]+\*\*:?\s*$|[A-Z][A-Z0-9 &/-]{3,}:?\s*$)")
+_BULLET = re.compile(r"^\s*([-*•]|\d+[.)])\s+")
+_FIGURE = re.compile(r"\d|\$|%")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+_encoder = None
+_encoder_lock = threading.Lock()
+_handlers_installed = False
+_handlers_lock = threading.Lock()
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                try:
+                    import tiktoken
+                    _encoder = tiktoken.get_encoding(os.getenv("PRODUCT_TOKEN_ENCODING", "cl100k_base"))
+                except Exception:
+                    # tiktoken is optional; fall back to the ~4 chars/token rule of thumb
+                    _encoder = False
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _units(text: str) -> List[str]:
+    """Split text into lines, breaking long prose lines into sentences."""
+    units = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if len(line) > 400 and not _HEADING.match(line):
+            units.extend(s for s in _SENTENCE.split(line) if s.strip())
+        else:
+            units.append(line)
+    return units
+
+
+def compress(text: str, max_tokens: int, query: str = "") -> str:
+    """
+    Deterministic extractive compression of `text` to at most ~max_tokens.
+    Scores each line/sentence (headings > figures > query overlap > early in
+    its section) and keeps the best ones in their original order.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    units = _units(text)
+    query_words = set(_WORD.findall(query.lower()))
+    scored = []
+    position = 0
+    for index, unit in enumerate(units):
+        if _HEADING.match(unit):
+            position = 0
+            score = 10.0
+        else:
+            position += 1
+            score = 1.0 / position
+            if _FIGURE.search(unit):
+                score += 0.5
+            if _BULLET.match(unit):
+                score += 0.25
+            if query_words:
+                words = set(_WORD.findall(unit.lower()))
+                score += len(words & query_words) / len(query_words)
+        scored.append((score, index))
+
+    note_tokens = 16
+    budget = max(max_tokens - note_tokens, 0)
+    kept, used = set(), 0
+    # Ties go to the earlier unit so the result never depends on dict/set order
+    for score, index in sorted(scored, key=lambda item: (-item[0], item[1])):
+        cost = count_tokens(units[index]) + 1
+        if used + cost > budget:
+            continue
+        kept.add(index)
+        used += cost
+
+    lines, previous = [], -1
+    for index in sorted(kept):
+        if index != previous + 1 and lines:
+            lines.append("…")
+        lines.append(units[index])
+        previous = index
+    if not lines:
+        # Nothing fits whole: hard-truncate the start of the text
+        lines = [text[: max(budget, 1) * 4]]
+    original = count_tokens(text)
+    lines.append(f"[compacted from ~{original} to ~{max_tokens} tokens]")
+    return "\n".join(lines)
+
+
+class Budgets:
+    """Per-task context and per-tool output limits, in tokens."""
+
+    def __init__(self, path: Optional[Path] = None):
+        path = Path(path or BUDGETS_FILE)
+        config = yaml.safe_load(path.read_text()) if path.exists() else {}
+        config = config or {}
+        defaults = config.get("defaults", {})
+        self.default_context = int(os.getenv("PRODUCT_CONTEXT_BUDGET", defaults.get("context_tokens", 6000)))
+        self.default_tool = int(os.getenv("PRODUCT_TOOL_OUTPUT_BUDGET", defaults.get("tool_output_tokens", 2500)))
+        self.tasks: Dict[str, int] = {
+            name: int(value.get("context_tokens", self.default_context))
+            for name, value in (config.get("tasks") or {}).items()
+        }
+        self.tools: Dict[str, int] = {
+            name: int(value.get("output_tokens", self.default_tool))
+            for name, value in (config.get("tools") or {}).items()
+        }
+
+    def context_limit(self, task: str) -> int:
+        return self.tasks.get(task, self.default_context)
+
+    def tool_limit(self, tool: str) -> int:
+        return self.tools.get(tool, self.default_tool)
+
+
+class TokenLedger:
+    """Thread-safe token counts for one run (or the whole process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tasks: Dict[str, dict] = {}
+        self.tools: Dict[str, dict] = {}
+
+    def _task(self, name: str) -> dict:
+        return self.tasks.setdefault(name, {
+            "prompt_tokens": 0, "completion_tokens": 0, "requests": 0,
+            "context_tokens": 0, "context_tokens_sent": 0,
+        })
+
+    def record_task(self, name: str, prompt_tokens: int, completion_tokens: int, requests: int = 0) -> None:
+        with self._lock:
+            entry = self._task(name)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["requests"] += requests
+
+    def record_context(self, name: str, original: int, sent: int) -> None:
+        with self._lock:
+            entry = self._task(name)
+            entry["context_tokens"] += original
+            entry["context_tokens_sent"] += sent
+
+    def _tool(self, tool: str) -> dict:
+        return self.tools.setdefault(tool, {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "compacted": 0, "tokens": 0, "tokens_sent": 0,
+        })
+
+    def record_tool_call(self, tool: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """One call: its output goes into the next prompt, its arguments were generated by the LLM."""
+        with self._lock:
+            entry = self._tool(tool)
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+
+    def record_tool(self, tool: str, original: int, sent: int) -> None:
+        """Output size of a tool that fits its output to a budget, before and after compaction."""
+        with self._lock:
+            entry = self._tool(tool)
+            entry["compacted"] += int(sent < original)
+            entry["tokens"] += original
+            entry["tokens_sent"] += sent
+
+    def summary(self) -> dict:
+        with self._lock:
+            tasks = {name: dict(entry) for name, entry in self.tasks.items()}
+            tools = {name: dict(entry) for name, entry in self.tools.items()}
+        return {
+            "tasks": tasks,
+            "tools": tools,
+            "prompt_tokens": sum(t["prompt_tokens"] for t in tasks.values()),
+            "completion_tokens": sum(t["completion_tokens"] for t in tasks.values()),
+            "tokens_saved": sum(t["context_tokens"] - t["context_tokens_sent"] for t in tasks.values())
+            + sum(t["tokens"] - t["tokens_sent"] for t in tools.values()),
+        }
+
+    def report(self) -> str:
+        summary = self.summary()
+        lines = [f"{'task':<28} {'prompt':>8} {'compl.':>8} {'context':>8} {'sent':>8}"]
+        for name, t in summary["tasks"].items():
+            lines.append(
+                f"{name:<28} {t['prompt_tokens']:>8} {t['completion_tokens']:>8} "
+                f"{t['context_tokens']:>8} {t['context_tokens_sent']:>8}"
+            )
+        if summary["tools"]:
+            lines.append(
+                f"\n{'tool':<36} {'calls':>6} {'prompt':>8} {'compl.':>8} {'compacted':>9} {'tokens':>8} {'sent':>8}"
+            )
+            for name, t in summary["tools"].items():
+                lines.append(
+                    f"{name:<36} {t['calls']:>6} {t['prompt_tokens']:>8} {t['completion_tokens']:>8} "
+                    f"{t['compacted']:>9} {t['tokens']:>8} {t['tokens_sent']:>8}"
+                )
+        lines.append(
+            f"\nTotal: {summary['prompt_tokens']} prompt + {summary['completion_tokens']} completion tokens, "
+            f"{summary['tokens_saved']} tokens saved by budgets"
+        )
+        return "\n".join(lines)
+
+
+_budgets: Optional[Budgets] = None
+_process_ledger = TokenLedger()
+_current_ledger: ContextVar[Optional[TokenLedger]] = ContextVar("product_token_ledger", default=None)
+
+
+def get_budgets() -> Budgets:
+    global _budgets
+    if _budgets is None:
+        _budgets = Budgets()
+    return _budgets
+
+
+def current_ledger() -> TokenLedger:
+    """The ledger of the run in progress, or the process-wide one outside a run."""
+    return _current_ledger.get() or _process_ledger
+
+
+def active_ledger() -> Optional[TokenLedger]:
+    """The ledger of the run in progress, or None outside a run."""
+    return _current_ledger.get()
+
+
+@contextmanager
+def track(ledger: TokenLedger):
+    """Record tokens of everything run in this context (and copies of it) into `ledger`."""
+    token = _current_ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _current_ledger.reset(token)
+
+
+def install_event_handlers() -> None:
+    """Record every tool call's tokens from crewai tool events (once per process)."""
+    global _handlers_installed
+    with _handlers_lock:
+        if _handlers_installed:
+            return
+        _handlers_installed = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+
+    # Handlers run with a copy of the emitting thread's context, so this is the run's ledger
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        args = event.tool_args if isinstance(event.tool_args, str) else json.dumps(event.tool_args, default=str)
+        current_ledger().record_tool_call(event.tool_name, count_tokens(str(event.output or "")), count_tokens(args))
+
+
+def fit_tool_output(tool: str, text: str, query: str = "") -> str:
+    """Count a tool's output and compact it if it exceeds the tool's budget."""
+    original = count_tokens(text)
+    sent = text
+    if ENABLED and original > get_budgets().tool_limit(tool):
+        sent = compress(text, get_budgets().tool_limit(tool), query)
+    current_ledger().record_tool(tool, original, count_tokens(sent) if sent is not text else original)
+    return sent
+
+
+def fit_context(task: str, outputs: List[str], query: str = "") -> str:
+    """
+    Join upstream task outputs into one context string within the task's budget.
+    Each output gets an equal share; shares unused by short outputs go to the longer ones.
+    """
+    sizes = [count_tokens(output) for output in outputs]
+    original = sum(sizes)
+    limit = get_budgets().context_limit(task)
+    if not ENABLED or original <= limit or not outputs:
+        current_ledger().record_context(task, original, original)
+        return CONTEXT_DIVIDER.join(outputs)
+
+    shares = [0] * len(outputs)
+    remaining, pending = limit, sorted(range(len(outputs)), key=lambda i: sizes[i])
+    while pending:
+        share = remaining // len(pending)
+        index = pending.pop(0)
+        shares[index] = min(sizes[index], share)
+        remaining -= shares[index]
+    fitted = [
+        output if shares[i] >= sizes[i] else compress(output, shares[i], query)
+        for i, output in enumerate(outputs)
+    ]
+    current_ledger().record_context(task, original, sum(count_tokens(output) for output in fitted))
+    return CONTEXT_DIVIDER.join(fitted)
@@ -0,0 +1,148 @@
+"""
+Task-level checkpoints for crew runs.
+Every finished task output is written to disk under its run ID and a hash of
+the run inputs, so a failed run can be resumed without redoing upstream tasks.
+
+Outputs are also indexed by a per-task input fingerprint so a later run whose
+relevant inputs did not change can reuse them (incremental re-analysis).
+
+Layout: <cache dir>/checkpoints/<run_id>/run.json
+        <cache dir>/checkpoints/<run_id>/<inputs hash>/<task name>.json
+        <cache dir>/checkpoints/by_fingerprint/<fingerprint>.json
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from product.tools.cache import cache_dir
+
+if TYPE_CHECKING:
+    from crewai.tasks.task_output import TaskOutput
+
+
+def hash_inputs(inputs: Optional[dict]) -> str:
+    raw = json.dumps(inputs or {}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def load_output(data: dict) -> "TaskOutput":
+    """TaskOutput (with its typed model) from a dict written by dump_output."""
+    # crewai is imported lazily so `replay` (listing runs) starts instantly
+    from crewai.tasks.task_output import TaskOutput
+    from product.schemas import SCHEMAS
+    data = dict(data)
+    schema, typed = data.pop("schema", None), data.pop("typed", None)
+    output = TaskOutput(**data)
+    if schema in SCHEMAS and typed is not None:
+        output.pydantic = SCHEMAS[schema].model_validate(typed)
+    return output
+
+
+def dump_output(output: "TaskOutput") -> dict:
+    """JSON-safe dict of a TaskOutput, including its typed model if any."""
+    # The live pydantic object is stored as schema name + data and rebuilt on load
+    data = output.model_dump(mode="json", exclude={"pydantic", "messages"})
+    if output.pydantic is not None:
+        data["schema"] = type(output.pydantic).__name__
+        data["typed"] = output.pydantic.model_dump(mode="json")
+    return data
+
+
+def _write_json(path: Path, data: dict) -> None:
+    # Write-then-rename so a crash never leaves a half-written checkpoint. The temp
+    # name is unique, since concurrent runs can save the same fingerprint at once.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp.write(json.dumps(data, indent=2, default=str))
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
+
+
+class CheckpointStore:
+    """Reads and writes per-task outputs for crew runs."""
+
+    def __init__(self, root: Optional[Path] = None, reuse_ttl: Optional[float] = None):
+        self.root = Path(root) if root else cache_dir() / "checkpoints"
+        self.root.mkdir(parents=True, exist_ok=True)
+        # How long an output may be reused by fingerprint (results depend on live data)
+        if reuse_ttl is None:
+            reuse_ttl = float(os.getenv("PRODUCT_TASK_REUSE_TTL", str(24 * 60 * 60)))
+        self.reuse_ttl = reuse_ttl
+
+    def start_run(self, run_id: str, inputs: dict) -> str:
+        """Record the run's inputs (idempotent); returns the inputs hash."""
+        inputs_hash = hash_inputs(inputs)
+        path = self.root / run_id / "run.json"
+        if not path.exists():
+            _write_json(path, {
+                "run_id": run_id,
+                "inputs": inputs,
+                "inputs_hash": inputs_hash,
+                "created_at": time.time(),
+            })
+        return inputs_hash
+
+    def load_run(self, run_id: str) -> dict:
+        path = self.root / run_id / "run.json"
+        if not path.exists():
+            raise KeyError(f"No checkpointed run with ID '{run_id}'")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def save_fingerprint(self, fingerprint: str, name: str, output: "TaskOutput") -> None:
+        _write_json(self.root / "by_fingerprint" / f"{fingerprint}.json", {
+            "task": name,
+            "saved_at": time.time(),
+            "output": dump_output(output),
+        })
+
+    def load_fingerprint(self, fingerprint: str) -> Optional["TaskOutput"]:
+        path = self.root / "by_fingerprint" / f"{fingerprint}.json"
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if time.time() - data["saved_at"] > self.reuse_ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return load_output(data["output"])
+
+    def list_runs(self) -> List[dict]:
+        """All recorded runs, newest first."""
+        runs = []
+        for path in self.root.glob("*/run.json"):
+            run = json.loads(path.read_text(encoding="utf-8"))
+            run["completed_tasks"] = self.completed_tasks(run["run_id"], run["inputs_hash"])
+            runs.append(run)
+        return sorted(runs, key=lambda run: run["created_at"], reverse=True)
+
+    def save(self, run_id: str, inputs_hash: str, name: str, output: "TaskOutput") -> None:
+        _write_json(self.root / run_id / inputs_hash / f"{name}.json", {
+            "task": name,
+            "saved_at": time.time(),
+            "output": dump_output(output),
+        })
+
+    def load(self, run_id: str, inputs_hash: str, name: str) -> Optional["TaskOutput"]:
+        path = self.root / run_id / inputs_hash / f"{name}.json"
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return load_output(data["output"])
+
+    def completed_tasks(self, run_id: str, inputs_hash: str) -> List[str]:
+        return sorted(path.stem for path in (self.root / run_id / inputs_hash).glob("*.json"))
@@ -1,8 +1,15 @@
+import os
 from crewai import Agent, Task, Crew
 from crewai.project import CrewBase, agent, task, crew
-from product.tools.reddit_tool import RedditJSONTool, RedditRSSTool, SerperRedditTool
-from product.tools.serper_tool import serper_search
-from crewai_tools import WebsiteSearchTool
+from product import llm_cache
+from product.checkpoints import CheckpointStore
+from product.pipeline import BudgetedCrew, ParallelCrew
+from product.schemas import get_schema
+from product.tools.post_store import RedditIndexSearchTool
+from product.tools.reddit_ingest import RedditIngestTool
+from product.tools.reddit_tool import RedditFanoutTool, RedditJSONTool, RedditRSSTool, SerperRedditTool
+from product.tools.serper_tool import get_serper_search
+from product.tools.website_tool import CachedWebsiteSearchTool
 
 @CrewBase
 class ProductDiscoveryCrew():
@@ -15,7 +22,7 @@ class ProductDiscoveryCrew():
     def market_landscape_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["market_landscape_agent"],
-            tools=[serper_search]  # Web search for competitor research
+            tools=[get_serper_search()]  # Web search for competitor research
         )
 
     @agent
@@ -23,6 +30,9 @@ class ProductDiscoveryCrew():
         return Agent(
             config=self.agents_config["customer_pain_agent"],
             tools=[
+                RedditFanoutTool(),      # Many subreddits x keywords in one call
+                RedditIngestTool(),      # Paginated search + comment trees for deep mining
+                RedditIndexSearchTool(), # Offline full-text search over posts collected so far
                 SerperRedditTool(),      # Google search for Reddit
                 RedditJSONTool(),        # Direct Reddit JSON API
                 RedditRSSTool()          # Reddit RSS feeds
@@ -34,8 +44,8 @@ class ProductDiscoveryCrew():
         return Agent(
             config=self.agents_config["opportunity_sizing_agent"],
             tools=[
-                serper_search,         # Search for market size data
-                WebsiteSearchTool()    # Scrape industry sites
+                get_serper_search(),        # Search for market size data
+                CachedWebsiteSearchTool()   # Scrape industry sites (cached pages + embeddings)
             ]
         )
 
@@ -51,31 +61,58 @@ class ProductDiscoveryCrew():
 
     @task
     def market_landscape_task(self) -> Task:
-        return Task(config=self.tasks_config["market_landscape_task"])
+        return Task(
+            config=self.tasks_config["market_landscape_task"],
+            output_pydantic=self.output_schema("market_landscape_task"),
+        )
 
     @task
     def subreddit_discovery_task(self) -> Task:
-        return Task(config=self.tasks_config["subreddit_discovery_task"])
+        return Task(
+            config=self.tasks_config["subreddit_discovery_task"],
+            output_pydantic=self.output_schema("subreddit_discovery_task"),
+        )
 
     @task
     def customer_pain_task(self) -> Task:
         return Task(
             config=self.tasks_config["customer_pain_task"],
+            output_pydantic=self.output_schema("customer_pain_task"),
             context=[self.subreddit_discovery_task()]  
         )
 
     @task
     def opportunity_sizing_task(self) -> Task:
-        return Task(config=self.tasks_config["opportunity_sizing_task"])
+        return Task(
+            config=self.tasks_config["opportunity_sizing_task"],
+            output_pydantic=self.output_schema("opportunity_sizing_task"),
+            context=[self.market_landscape_task(), self.customer_pain_task()]
+        )
 
     @task
     def risk_assumptions_task(self) -> Task:
-        return Task(config=self.tasks_config["risk_assumptions_task"])
+        return Task(
+            config=self.tasks_config["risk_assumptions_task"],
+            output_pydantic=self.output_schema("risk_assumptions_task"),
+            context=[
+                self.market_landscape_task(),
+                self.customer_pain_task(),
+                self.opportunity_sizing_task(),
+            ]
+        )
 
     @task
     def final_strategy_task(self) -> Task:
-        return Task(config=self.tasks_config["final_strategy_task"])
-        
+        return Task(
+            config=self.tasks_config["final_strategy_task"],
+            output_pydantic=self.output_schema("final_strategy_task"),
+            context=[
+                self.market_landscape_task(),
+                self.customer_pain_task(),
+                self.opportunity_sizing_task(),
+                self.risk_assumptions_task(),
+            ]
+        )
 
     # -------- Crew --------
 
@@ -83,10 +120,55 @@ class ProductDiscoveryCrew():
     def crew(self) -> Crew:
         """
         Defines the execution order of the product discovery pipeline.
+        Upstream context is kept within config/budgets.yaml.
         """
-        return Crew(
+        crew = BudgetedCrew(
             agents=self.agents,
             tasks=self.tasks,
             process="sequential",
             verbose=True,
         )
+        if llm_cache.ENABLED:
+            llm_cache.install(crew)
+        return crew
+
+    def pipeline(self, mode: str = None, run_id: str = None, incremental: bool = False, on_output=None):
+        """
+        Returns the runner for the chosen execution mode (PRODUCT_EXECUTION_MODE):
+        "sequential" runs the crew as-is, "parallel" runs independent task
+        branches concurrently based on each task's context.
+        Passing a run_id checkpoints every task output under that ID, and
+        incremental=True reuses outputs of tasks whose inputs did not change
+        (sequential runs then go through the task graph one task at a time).
+        on_output(name, output) is called with each task output as it becomes
+        available.
+        Both expose kickoff(inputs=...).
+        """
+        mode = (mode or os.getenv("PRODUCT_EXECUTION_MODE", "sequential")).lower()
+        if mode not in ("sequential", "parallel"):
+            raise ValueError(f"Unknown execution mode '{mode}' (expected 'sequential' or 'parallel')")
+        if mode == "sequential" and run_id is None and not incremental and on_output is None:
+            return self.crew()
+        return ParallelCrew(
+            self.crew(),
+            max_workers=1 if mode == "sequential" else None,
+            checkpoints=CheckpointStore() if run_id else None,
+            run_id=run_id,
+            incremental=incremental,
+            templates=self.task_templates(),
+            on_output=on_output,
+        )
+
+    def task_templates(self) -> dict:
+        """Raw (un-interpolated) text of each task, used to find its {placeholders}."""
+        return {
+            name: (
+                f"{config.get('description', '')}\n{config.get('expected_output', '')}"
+                f"\n{config.get('output_schema', '')}"
+            )
+            for name, config in self.tasks_config.items()
+        }
+
+    def output_schema(self, name: str):
+        """Pydantic model declared by `output_schema` in tasks.yaml, if any."""
+        return get_schema(self.tasks_config[name].get("output_schema"))
@@ -0,0 +1,78 @@
+"""
+Pool of pre-built crews.
+Building ProductDiscoveryCrew parses the YAML configs, creates five agents and
+constructs every tool (including WebsiteSearchTool's RAG setup). The pool does
+that ahead of time and hands out ready instances, resetting them after each run.
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from product.tools.cache import get_tool_cache
+
+
+class CrewPool:
+    """Thread-safe pool of warm ProductDiscoveryCrew instances."""
+
+    def __init__(self, size: Optional[int] = None, factory: Optional[Callable] = None):
+        self.size = size or int(os.getenv("PRODUCT_CREW_POOL_SIZE", "2"))
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self.created = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def _build(self):
+        if self.factory is None:
+            # Deferred so creating the pool (e.g. at app import) stays cheap
+            from product.crew import ProductDiscoveryCrew
+            self.factory = ProductDiscoveryCrew
+        instance = self.factory()
+        # Instantiates (and memoizes) agents, tools and tasks
+        instance.crew()
+        with self._lock:
+            self.created += 1
+        return instance
+
+    def warmup(self, count: Optional[int] = None) -> None:
+        """Fill the pool and open shared resources so the first run starts immediately."""
+        from product.tools.http_client import get_session
+        get_session()
+        get_tool_cache()
+        missing = (count or self.size) - self._idle.qsize()
+        for _ in range(max(missing, 0)):
+            self._idle.put(self._build())
+
+    def warmup_async(self, count: Optional[int] = None) -> threading.Thread:
+        """Warm up in the background (e.g. while the web UI starts)."""
+        thread = threading.Thread(target=self.warmup, args=(count,), name="crew-pool-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a crew for one run; builds a fresh one if none is idle."""
+        try:
+            instance = self._idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+        except queue.Empty:
+            instance = self._build()
+        try:
+            yield instance
+        finally:
+            self._reset(instance)
+            if self._idle.qsize() < self.size:
+                self._idle.put(instance)
+
+    @staticmethod
+    def _reset(instance) -> None:
+        # Drop outputs so nothing from the previous run leaks into context
+        for task in instance.crew().tasks:
+            task.output = None
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": self._idle.qsize(), "created": self.created, "reused": self.reused}
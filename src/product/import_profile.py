@@ -0,0 +1,58 @@
+"""
+Import-time profiler for cold starts.
+Runs `python -X importtime` on the given modules in a fresh interpreter and
+reports the slowest imports, so heavy dependencies can be found and deferred.
+
+Usage: import_profile [module ...] [--top N]
+       (defaults to the CLI, the dashboard's crew pool and the crew itself)
+"""
+
+import argparse
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["product.main", "product.crew_pool", "product.crew"]
+
+
+def profile_imports(module: str) -> list:
+    """Return (cumulative_us, self_us, name) for every import made by `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # Format: "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the slowest imports of product modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15, help="How many imports to list per module")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            rows = profile_imports(module)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            continue
+        total = next((cumulative for cumulative, _, name in rows if name.strip() == module), 0)
+        print(f"\n⏱️  import {module}: {total / 1000:.0f} ms total")
+        print(f"{'cumulative':>12} {'self':>10}  module")
+        for cumulative, self_us, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"{cumulative / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
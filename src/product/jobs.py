@@ -0,0 +1,336 @@
+"""
+Asynchronous analysis jobs.
+Submitting inputs returns a job ID immediately; a fixed number of worker
+threads run queued jobs on warm crews. Admission is bounded: once
+PRODUCT_MAX_QUEUE_SIZE jobs are waiting, new submissions are rejected with
+JobQueueFull instead of piling up.
+
+Jobs, their progress events (task/tool spans, each task output as it
+finishes) and their results live in <cache dir>/jobs.sqlite3, and each job's
+crew log in <cache dir>/jobs/<id>.log, so clients can disconnect and poll
+again later and results survive restarts. Jobs that were queued or running
+when the process stopped are queued again at startup and resume from their
+task checkpoints (the job ID is the run ID).
+
+One job service (dashboard or API) should own a cache directory at a time.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from product import telemetry
+from product.results import DEFAULTS, INPUT_FIELDS, FileSink, result_record
+from product.checkpoints import dump_output
+from product.log_capture import capture_to
+from product.tools.cache import cache_dir
+
+# Analyses run at once per process, and how many may wait in the queue
+MAX_CONCURRENT_RUNS = int(os.getenv("PRODUCT_MAX_CONCURRENT_RUNS", "4"))
+MAX_QUEUE_SIZE = int(os.getenv("PRODUCT_MAX_QUEUE_SIZE", "32"))
+
+FINISHED = ("succeeded", "failed", "cancelled")
+# Span kinds recorded as job events (HTTP spans would flood the event log)
+_EVENT_SPANS = ("task", "tool", "llm")
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when the queue is at PRODUCT_MAX_QUEUE_SIZE."""
+
+
+def job_inputs(raw: dict) -> dict:
+    """Crew inputs from submitted fields, with the usual defaults for optional ones."""
+    inputs = {field: str(raw.get(field) or "").strip() for field in INPUT_FIELDS}
+    if not inputs["product_idea"] or not inputs["target_customer"]:
+        raise ValueError("product_idea and target_customer are required")
+    for field, default in DEFAULTS.items():
+        inputs[field] = inputs[field] or default
+    return inputs
+
+
+def new_job_id() -> str:
+    return f"job-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class JobStore:
+    """SQLite store of jobs and their progress events."""
+
+    def __init__(self, path):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                inputs TEXT NOT NULL,
+                mode TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT,
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+            CREATE TABLE IF NOT EXISTS job_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                at REAL NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, seq);
+            """
+        )
+
+    def create(self, job_id: str, inputs: dict, mode: Optional[str]) -> dict:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, inputs, mode, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(inputs), mode, time.time()),
+            )
+            self.add_event(job_id, "status", {"status": "queued"})
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            row = cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["inputs"] = json.loads(job["inputs"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def recent(self, limit: int = 20, status: Optional[str] = None) -> List[dict]:
+        """Most recent jobs first (without their results)."""
+        sql = "SELECT id FROM jobs"
+        params: list = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(sql, (*params, limit))]
+        jobs = [self.get(job_id) for job_id in ids]
+        for job in jobs:
+            job.pop("result", None)
+        return jobs
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None, result: Optional[dict] = None) -> None:
+        now = time.time()
+        with self._lock:
+            if status == "running":
+                self._conn.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (status, now, job_id))
+            elif status in FINISHED:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ?, result = ? WHERE id = ?",
+                    (status, now, error, json.dumps(result, default=str) if result else None, job_id),
+                )
+            else:
+                self._conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (status, job_id))
+            self.add_event(job_id, "status", {"status": status, "error": error})
+
+    def add_event(self, job_id: str, event_type: str, data: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, at, type, data) VALUES (?, ?, ?, ?)",
+                (job_id, time.time(), event_type, json.dumps(data, default=str)),
+            )
+
+    def events(self, job_id: str, after: int = 0, types: Optional[tuple] = None) -> List[dict]:
+        """Events of a job with seq > `after`, oldest first."""
+        sql = "SELECT seq, at, type, data FROM job_events WHERE job_id = ? AND seq > ?"
+        params: list = [job_id, after]
+        if types:
+            sql += f" AND type IN ({', '.join('?' * len(types))})"
+            params.extend(types)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY seq", params).fetchall()
+        return [
+            {"seq": seq, "at": at, "type": event_type, "data": json.loads(data)}
+            for seq, at, event_type, data in rows
+        ]
+
+    def task_outputs(self, job_id: str) -> dict:
+        """Latest output of every task finished so far, by task name (dump_output dicts)."""
+        return {event["data"]["task"]: event["data"]["output"] for event in self.events(job_id, types=("task",))}
+
+    def unfinished(self) -> List[str]:
+        """Jobs queued or running, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+def log_path(job_id: str) -> Path:
+    return cache_dir() / "jobs" / f"{job_id}.log"
+
+
+class JobManager:
+    """Bounded job queue in front of a fixed pool of worker threads and warm crews."""
+
+    def __init__(self, store: Optional[JobStore] = None, workers: Optional[int] = None,
+                 max_queue: Optional[int] = None):
+        from product.crew_pool import CrewPool
+
+        self.store = store or JobStore(cache_dir() / "jobs.sqlite3")
+        self.workers = max(workers or MAX_CONCURRENT_RUNS, 1)
+        self.max_queue = max_queue or MAX_QUEUE_SIZE
+        self.pool = CrewPool(size=self.workers)
+        self._queue: queue.Queue = queue.Queue()
+        self._waiting: List[str] = []
+        self._running = set()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Re-queue unfinished jobs, start the workers and warm up the crews in the background (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return
+            for job_id in self.store.unfinished():
+                # Restarted jobs resume from their checkpoints; recovered jobs may exceed max_queue
+                self.store.set_status(job_id, "queued")
+                self._waiting.append(job_id)
+                self._queue.put(job_id)
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self.pool.warmup_async()
+
+    def submit(self, inputs: dict, mode: Optional[str] = None) -> dict:
+        """Queue an analysis; raises JobQueueFull when max_queue jobs are already waiting."""
+        inputs = job_inputs(inputs)
+        if mode not in (None, "sequential", "parallel"):
+            raise ValueError(f"Unknown execution mode '{mode}' (expected 'sequential' or 'parallel')")
+        with self._lock:
+            if len(self._waiting) >= self.max_queue:
+                raise JobQueueFull(f"{len(self._waiting)} analyses are already waiting; try again later")
+            job = self.store.create(new_job_id(), inputs, mode)
+            self._waiting.append(job["id"])
+        self._queue.put(job["id"])
+        return self.describe(job)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet."""
+        with self._lock:
+            if job_id not in self._waiting:
+                return False
+            self._waiting.remove(job_id)
+            self.store.set_status(job_id, "cancelled")
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self.store.get(job_id)
+        return self.describe(job) if job else None
+
+    def describe(self, job: dict) -> dict:
+        """Job record plus its queue position (1 = next to start) while waiting."""
+        with self._lock:
+            position = self._waiting.index(job["id"]) + 1 if job["id"] in self._waiting else None
+        return {**job, "queue_position": position}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "queued": len(self._waiting),
+                "max_queue": self.max_queue,
+            }
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                if job_id not in self._waiting:
+                    # Cancelled while queued
+                    continue
+                self._waiting.remove(job_id)
+                self._running.add(job_id)
+            try:
+                job = self.store.get(job_id)
+                if job is None:
+                    raise KeyError(f"job {job_id} is missing from the store")
+                self._run(job)
+            except Exception as e:
+                # Failures outside the crew run (store, log file...) must not kill the worker
+                print(f"❌ Job {job_id} could not run: {type(e).__name__}: {e}", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                try:
+                    self.store.set_status(job_id, "failed", error=f"{type(e).__name__}: {e}")
+                except Exception:
+                    pass
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+    def _run(self, job: dict) -> None:
+        job_id = job["id"]
+        store = self.store
+        store.set_status(job_id, "running")
+
+        def on_span(event: str, span) -> None:
+            if span.kind in _EVENT_SPANS and (span.kind != "llm" or span.status == "error"):
+                store.add_event(job_id, "span", {"event": event, **span.to_dict()})
+
+        def on_output(name: str, output) -> None:
+            store.add_event(job_id, "task", {"task": name, "output": dump_output(output)})
+
+        sink = FileSink(log_path(job_id))
+        tracer = telemetry.Tracer(job_id)
+        tracer.add_listener(on_span)
+        start = time.perf_counter()
+        try:
+            with capture_to(sink), telemetry.trace(tracer):
+                try:
+                    with self.pool.acquire() as discovery:
+                        # The job ID doubles as run ID: a restarted job resumes from its checkpoints
+                        pipeline = discovery.pipeline(
+                            mode=job["mode"], run_id=job_id, incremental=True, on_output=on_output
+                        )
+                        result = pipeline.kickoff(inputs=job["inputs"])
+                    record = result_record(job, job_id, result, time.perf_counter() - start)
+                    store.set_status(job_id, "succeeded", result=record)
+                except Exception as e:
+                    store.set_status(job_id, "failed", error=f"{type(e).__name__}: {e}")
+                finally:
+                    tracer.finish()
+                    print(f"\n⏱️ Where the time went (trace {tracer.export()}):")
+                    ranked = sorted(tracer.summary().items(), key=lambda item: -item[1]["total_s"])
+                    for name, entry in ranked[:10]:
+                        print(f"   {name:<50} {entry['total_s']:>8.1f}s  x{entry['count']}  errors {entry['errors']}")
+        finally:
+            sink.close()
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager, started on first use."""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                manager = JobManager()
+                manager.start()
+                _job_manager = manager
+    return _job_manager
@@ -0,0 +1,171 @@
+"""
+Exact-match cache for agent LLM calls (opt-in with PRODUCT_LLM_CACHE=on).
+Each agent's LLM is wrapped so a call whose model, generation parameters and
+messages match an earlier one returns the stored reply instead of hitting the
+API. Replies live in a local SQLite file with a TTL and LRU size bound, so
+re-running an analysis (or a benchmark) with the same inputs replays the same
+answers almost instantly.
+
+Calls that let the LLM execute tools itself (native function calling) are
+never cached, since replaying them would skip the tool side effects.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, List, Optional
+
+from crewai.llms.base_llm import BaseLLM
+
+from product import telemetry
+from product.tools.cache import ResponseCache, cache_dir
+
+ENABLED = os.getenv("PRODUCT_LLM_CACHE", "off").lower() in ("1", "on", "true", "yes")
+SOURCE = "llm"
+DEFAULT_TTL = 7 * 24 * 60 * 60
+# Generation settings that change the reply, read from the wrapped LLM when present
+_PARAMS = (
+    "temperature", "top_p", "max_tokens", "max_completion_tokens", "seed", "stop",
+    "presence_penalty", "frequency_penalty", "reasoning_effort", "response_format",
+)
+
+
+def _normalize(content: Any) -> str:
+    """Message content with line endings and trailing whitespace made uniform."""
+    if not isinstance(content, str):
+        return json.dumps(content, sort_keys=True, default=str)
+    return "\n".join(line.rstrip() for line in content.splitlines()).strip()
+
+
+def _schema(model: Any) -> Optional[str]:
+    if model is None:
+        return None
+    try:
+        return json.dumps(model.model_json_schema(), sort_keys=True)
+    except AttributeError:
+        return repr(model)
+
+
+def cache_key(llm: BaseLLM, messages: List[dict], tools: Optional[list] = None, response_model: Any = None) -> str:
+    """sha256 over the model, its generation parameters and the normalized conversation."""
+    params = {name: getattr(llm, name, None) for name in _PARAMS}
+    params["stop"] = sorted(params["stop"] or [])
+    raw = json.dumps(
+        {
+            "model": llm.model,
+            "params": params,
+            "extra": getattr(llm, "additional_params", None) or {},
+            "messages": [[m.get("role", ""), _normalize(m.get("content", ""))] for m in messages],
+            "tools": tools or None,
+            "response_model": _schema(response_model),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CachedLLM(BaseLLM):
+    """Wraps an agent's LLM and answers repeated prompts from the LLM cache."""
+
+    def __init__(self, llm: BaseLLM, cache: Optional[ResponseCache] = None):
+        # Set first: BaseLLM.__init__ assigns `stop`, which is forwarded to the wrapped LLM
+        self.llm = llm
+        super().__init__(
+            model=llm.model, temperature=getattr(llm, "temperature", None), stop=list(getattr(llm, "stop", None) or [])
+        )
+        self.is_litellm = getattr(llm, "is_litellm", False)
+        self.cache = cache or get_llm_cache()
+
+    # The executor sets stop words on the agent's LLM; they belong to the wrapped one
+    @property
+    def stop(self) -> List[str]:
+        return self.llm.stop
+
+    @stop.setter
+    def stop(self, value: List[str]) -> None:
+        self.llm.stop = value
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the wrapper does not define (provider-specific settings)
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        # Cache hits cost no tokens, so usage is whatever the wrapped LLM actually spent
+        return self.llm.get_token_usage_summary()
+
+    def _lookup(self, messages, tools, available_functions, response_model):
+        if available_functions:
+            return None, None
+        messages = self._format_messages(messages)
+        key = cache_key(self.llm, messages, tools, response_model)
+        reply = self.cache.get(SOURCE, key)
+        telemetry.record_cache(SOURCE, hit=reply is not None)
+        return key, reply
+
+    def _store(self, key: Optional[str], reply: Any) -> None:
+        # Structured (pydantic) replies are rebuilt by the caller from text anyway; keep text only
+        if key is not None and isinstance(reply, str) and reply:
+            self.cache.set(SOURCE, key, reply)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None) -> Any:
+        key, reply = self._lookup(messages, tools, available_functions, response_model)
+        if reply is not None:
+            return reply
+        reply = self.llm.call(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, response_model=response_model,
+        )
+        self._store(key, reply)
+        return reply
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None) -> Any:
+        key, reply = self._lookup(messages, tools, available_functions, response_model)
+        if reply is not None:
+            return reply
+        reply = await self.llm.acall(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, response_model=response_model,
+        )
+        self._store(key, reply)
+        return reply
+
+
+def install(crew: Any, cache: Optional[ResponseCache] = None) -> None:
+    """Wrap the LLM of every agent in a built crew (agents already wrapped are left alone)."""
+    for agent in crew.agents:
+        if isinstance(agent.llm, BaseLLM) and not isinstance(agent.llm, CachedLLM):
+            agent.llm = CachedLLM(agent.llm, cache)
+
+
+_llm_cache: Optional[ResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> ResponseCache:
+    """Process-wide LLM reply store (PRODUCT_CACHE_TTL_LLM / PRODUCT_LLM_CACHE_MAX_MB to tune)."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = ResponseCache(
+                    cache_dir() / "llm_cache.sqlite3",
+                    max_entries=int(os.getenv("PRODUCT_LLM_CACHE_MAX_ENTRIES", "20000")),
+                    max_bytes=int(float(os.getenv("PRODUCT_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+                    ttls={SOURCE: DEFAULT_TTL},
+                )
+    return _llm_cache
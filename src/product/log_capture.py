@@ -0,0 +1,63 @@
+"""
+Per-run capture of crew output.
+sys.stdout is replaced once, process-wide, by a router that sends each write
+to the queue of the run active in the current context (contextvars) and
+falls back to the real stdout otherwise. Concurrent runs never see each
+other's output and nobody has to restore sys.stdout afterwards.
+
+Threads do not inherit context: start worker threads through
+`contextvars.copy_context().run` (as ParallelCrew does) to keep routing.
+Output from threads outside any run (server threads, background syncs)
+always goes to the real stdout.
+"""
+
+import contextvars
+import sys
+import threading
+from contextlib import contextmanager
+
+_current_sink = contextvars.ContextVar("product_log_sink", default=None)
+_lock = threading.Lock()
+
+
+class StdoutRouter:
+    """File-like object that dispatches writes to the current run's queue."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, data):
+        sink = _current_sink.get()
+        if sink is None:
+            return self.fallback.write(data)
+        if data:
+            sink.put(data)
+        return len(data)
+
+    def flush(self):
+        if _current_sink.get() is None:
+            self.fallback.flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+def install() -> None:
+    """Route sys.stdout through StdoutRouter (idempotent)."""
+    with _lock:
+        if not isinstance(sys.stdout, StdoutRouter):
+            sys.stdout = StdoutRouter(sys.stdout)
+
+
+@contextmanager
+def capture_to(sink):
+    """Send everything printed in this context (and copied contexts) to `sink.put`."""
+    install()
+    token = _current_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _current_sink.reset(token)
@@ -1,4 +1,31 @@
-from product.crew import ProductDiscoveryCrew
+import json
+import sys
+
+from product.checkpoints import CheckpointStore, new_run_id
+
+# product.crew (crewai, crewai_tools, every tool) is imported inside each entry
+# point, so prompts and `replay` listings appear without waiting on it
+
+# Inputs used by the non-interactive entry points (train/test)
+SAMPLE_INPUTS = {
+    "product_idea": "AI-powered meal planning app for people with Type 2 diabetes",
+    "target_customer": "Adults aged 40-65 diagnosed with Type 2 diabetes, struggling with dietary management",
+    "constraints": "Need to ensure FDA compliance, 6-month development window",
+    "industry": "healthcare tech",
+    "vertical": "B2C SaaS"
+}
+
+
+def _print_result(result, run_id: str = None):
+    from product.schemas import render
+    print("\n" + "=" * 80)
+    print("FINAL PRODUCT RECOMMENDATION")
+    print("=" * 80 + "\n")
+    # Typed outputs print as markdown rather than the model's repr
+    print(render(result))
+    if run_id:
+        print(f"\nRun ID: {run_id}")
+
 
 def run():
     """
@@ -6,17 +33,17 @@ def run():
     For production, use the Gradio app (app.py or app_basic.py).
     """
     print("\n=== Product Discovery AI - CLI Mode ===\n")
-    
+
     product_idea = input("Product Idea: ").strip()
     target_customer = input("Target Customer: ").strip()
     constraints = input("Constraints (optional, press Enter to skip): ").strip()
     industry = input("Industry (e.g., fintech, healthcare, edtech): ").strip()
     vertical = input("Business Model (e.g., B2C SaaS, B2B Enterprise): ").strip()
-    
+
     if not product_idea or not target_customer:
         print("❌ Error: Product idea and target customer are required.")
         return
-    
+
     inputs = {
         "product_idea": product_idea,
         "target_customer": target_customer,
@@ -25,15 +52,132 @@ def run():
         "vertical": vertical or "Not specified"
     }
 
-    print("\n⏳ Running analysis... This may take 3-5 minutes.\n")
-    
-    crew = ProductDiscoveryCrew().crew()
-    result = crew.kickoff(inputs=inputs)
-    
-    print("\n" + "=" * 80)
-    print("FINAL PRODUCT RECOMMENDATION")
-    print("=" * 80 + "\n")
-    print(result)
+    run_id = new_run_id()
+    print(f"\n⏳ Running analysis (run ID {run_id})... This may take 3-5 minutes.")
+    print(f"   If it fails, resume with: replay {run_id}\n")
+
+    from product import telemetry
+    from product.crew import ProductDiscoveryCrew
+    crew = ProductDiscoveryCrew().pipeline(run_id=run_id)
+    tracer = telemetry.Tracer(run_id)
+    try:
+        with telemetry.trace(tracer):
+            result = crew.kickoff(inputs=inputs)
+    finally:
+        tracer.finish()
+        print(f"\n⏱️ Trace written to {tracer.export()}")
+
+    _print_result(result, run_id)
+
+
+def replay():
+    """
+    Resume a checkpointed run.
+    Usage: replay                      -> list recent runs
+           replay <run_id>             -> re-run only the tasks without a checkpoint
+           replay <run_id> <task_name> -> re-run <task_name> and every task that depends on it
+    """
+    store = CheckpointStore()
+    if len(sys.argv) < 2:
+        runs = store.list_runs()[:10]
+        if not runs:
+            print("No checkpointed runs found.")
+            return
+        print("Recent runs:")
+        for run in runs:
+            idea = run["inputs"].get("product_idea", "")[:50]
+            print(f"  {run['run_id']}  [{len(run['completed_tasks'])} tasks done]  {idea}")
+        return
+
+    run_id = sys.argv[1]
+    resume_from = sys.argv[2] if len(sys.argv) > 2 else None
+    from product.crew import ProductDiscoveryCrew
+    try:
+        run = store.load_run(run_id)
+        inputs = run["inputs"]
+        crew = ProductDiscoveryCrew().pipeline(run_id=run_id)
+        # Tasks without a checkpoint, plus the chosen task and its downstream consumers
+        done = set(store.completed_tasks(run_id, run["inputs_hash"]))
+        rerun = crew.graph.descendants(resume_from) if resume_from else set()
+        pending = [name for name in crew.graph.names if name in rerun or name not in done]
+        if pending:
+            print(f"🔁 Re-running {len(pending)} task(s): {', '.join(pending)}")
+        else:
+            print("✅ Every task is checkpointed; nothing to re-run")
+        result = crew.kickoff(inputs=inputs, resume_from=resume_from)
+    except Exception as e:
+        raise Exception(f"An error occurred while replaying the crew: {e}")
+
+    _print_result(result, run_id)
+
+
+def train():
+    """
+    Train the crew for a given number of iterations.
+    Usage: train <n_iterations> <filename>
+    """
+    from product.crew import ProductDiscoveryCrew
+    try:
+        ProductDiscoveryCrew().crew().train(
+            n_iterations=int(sys.argv[1]),
+            filename=sys.argv[2],
+            inputs=SAMPLE_INPUTS
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
+
+def test():
+    """
+    Test the crew execution and return the results.
+    Usage: test <n_iterations> <eval_llm>
+    """
+    from product.crew import ProductDiscoveryCrew
+    try:
+        ProductDiscoveryCrew().crew().test(
+            n_iterations=int(sys.argv[1]),
+            eval_llm=sys.argv[2],
+            inputs=SAMPLE_INPUTS
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
+
+def run_with_trigger():
+    """
+    Run the crew with a JSON trigger payload.
+    Usage: run_with_trigger '<json payload>'
+    The payload may carry any of the usual inputs (product_idea, target_customer, ...).
+    """
+    if len(sys.argv) < 2:
+        raise Exception("No trigger payload provided. Please provide JSON payload as argument.")
+
+    try:
+        trigger_payload = json.loads(sys.argv[1])
+    except json.JSONDecodeError:
+        raise Exception("Invalid JSON payload provided as argument")
+
+    inputs = {
+        "product_idea": trigger_payload.get("product_idea", ""),
+        "target_customer": trigger_payload.get("target_customer", ""),
+        "constraints": trigger_payload.get("constraints") or "No specific constraints",
+        "industry": trigger_payload.get("industry") or "Not specified",
+        "vertical": trigger_payload.get("vertical") or "Not specified",
+        "crewai_trigger_payload": trigger_payload,
+    }
+    if not inputs["product_idea"] or not inputs["target_customer"]:
+        raise Exception("Trigger payload must include product_idea and target_customer")
+
+    from product.crew import ProductDiscoveryCrew
+    run_id = new_run_id()
+    try:
+        result = ProductDiscoveryCrew().pipeline(run_id=run_id).kickoff(inputs=inputs)
+    except Exception as e:
+        raise Exception(f"An error occurred while running the crew with trigger: {e}")
+
+    _print_result(result, run_id)
+    return result
+
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,336 @@
+"""
+DAG-parallel execution of the product discovery tasks.
+Builds a dependency graph from each task's explicit `context` list and runs
+independent branches concurrently, joining before tasks that need them.
+Optionally checkpoints every task output so failed runs can be resumed, and
+reuses outputs of tasks whose relevant inputs did not change (incremental mode).
+Upstream context is fitted to each task's token budget (see product.budget).
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from crewai import Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+from pydantic import PrivateAttr
+
+from product import telemetry
+from product.budget import TokenLedger, active_ledger, fit_context, install_event_handlers, track
+from product.checkpoints import CheckpointStore
+from product.schemas import render
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def task_name(task: Task) -> str:
+    """Stable identifier for a task (the @task method name in crew.py)."""
+    return task.name or task.description.strip().splitlines()[0][:60]
+
+
+def agent_usage(agent) -> UsageMetrics:
+    """Cumulative token usage of an agent's LLM (same sources as Crew.calculate_usage_metrics)."""
+    llm = getattr(agent, "llm", None)
+    if hasattr(llm, "get_token_usage_summary"):
+        return llm.get_token_usage_summary()
+    if hasattr(agent, "_token_process"):
+        return agent._token_process.get_summary()
+    return UsageMetrics()
+
+
+def usage_delta(before: UsageMetrics, after: UsageMetrics) -> UsageMetrics:
+    return UsageMetrics(**{
+        field: getattr(after, field) - getattr(before, field)
+        for field in UsageMetrics.model_fields
+    })
+
+
+class BudgetedCrew(Crew):
+    """
+    Crew that fits each task's upstream context to its token budget before
+    prompting, and records each task's token usage. Usage goes to the ledger of
+    the run in progress, or to the crew's own `ledger` when kicked off outside one.
+    """
+
+    _ledger: TokenLedger = PrivateAttr(default_factory=TokenLedger)
+    _usage_seen: Dict[int, UsageMetrics] = PrivateAttr(default_factory=dict)
+
+    @property
+    def ledger(self) -> TokenLedger:
+        return self._ledger
+
+    def kickoff(self, inputs: Optional[dict] = None) -> CrewOutput:
+        install_event_handlers()
+        # Agent LLM counters are cumulative (across tasks and pooled runs), so
+        # each task's usage is measured from what its agent had used so far
+        agents = [*self.agents, *(task.agent for task in self.tasks), self.manager_agent]
+        self._usage_seen = {id(agent): agent_usage(agent) for agent in agents if agent is not None}
+        outer = active_ledger()
+        if outer is not None:
+            self._ledger = outer
+            return super().kickoff(inputs=inputs)
+        self._ledger = TokenLedger()
+        with track(self._ledger):
+            result = super().kickoff(inputs=inputs)
+        if self.verbose:
+            print(f"\n🧮 Token usage\n{self._ledger.report()}")
+        return result
+
+    def _process_task_result(self, task: Task, output: TaskOutput) -> None:
+        super()._process_task_result(task, output)
+        agent = self._get_agent_to_use(task)
+        if agent is None:
+            return
+        after = agent_usage(agent)
+        usage = usage_delta(self._usage_seen.get(id(agent), UsageMetrics()), after)
+        self._usage_seen[id(agent)] = after
+        self._ledger.record_task(
+            task_name(task), usage.prompt_tokens, usage.completion_tokens, usage.successful_requests
+        )
+
+    def _get_context(self, task: Task, task_outputs: List[TaskOutput]) -> str:
+        if not isinstance(task.context, list):
+            return super()._get_context(task, task_outputs)
+        # Typed outputs are passed as their compact markdown rendering, not the raw JSON
+        outputs = [render(dep.output) for dep in task.context if dep.output is not None]
+        return fit_context(task_name(task), outputs, query=task.description)
+
+
+class TaskGraph:
+    """
+    Dependency graph of tasks, derived from explicit `context` declarations.
+    `templates` maps task name -> raw config text (description + expected
+    output) and is used to find the {placeholders} each task reads.
+    """
+
+    def __init__(self, tasks: List[Task], templates: Optional[Dict[str, str]] = None):
+        self.tasks = {task_name(task): task for task in tasks}
+        self.names = list(self.tasks)
+        by_id = {id(task): task_name(task) for task in tasks}
+        self.deps: Dict[str, List[str]] = {}
+        for name, task in self.tasks.items():
+            # Tasks without an explicit context list are roots in DAG mode
+            context = task.context if isinstance(task.context, list) else []
+            self.deps[name] = [by_id[id(dep)] for dep in context if id(dep) in by_id]
+        self.order = self._topological_order()
+        self.templates = templates or {
+            name: f"{task.description}\n{task.expected_output}" for name, task in self.tasks.items()
+        }
+        self.placeholders = {
+            name: set(PLACEHOLDER.findall(self.templates.get(name, ""))) for name in self.names
+        }
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Task context cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.deps[name]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.names:
+            visit(name, [])
+        return order
+
+    def dependents(self, name: str) -> List[str]:
+        return [other for other, deps in self.deps.items() if name in deps]
+
+    def descendants(self, name: str) -> set:
+        """`name` plus every task that (transitively) consumes its output."""
+        if name not in self.tasks:
+            raise KeyError(f"Unknown task '{name}'. Tasks: {', '.join(self.names)}")
+        found, stack = {name}, [name]
+        while stack:
+            for child in self.dependents(stack.pop()):
+                if child not in found:
+                    found.add(child)
+                    stack.append(child)
+        return found
+
+    def fingerprints(self, inputs: Optional[dict]) -> Dict[str, str]:
+        """
+        Hash of everything a task's output depends on: its own template, the
+        input values it references and (recursively) its upstream tasks.
+        Changing an input only changes the fingerprints of tasks that use it.
+        """
+        inputs = inputs or {}
+        prints: Dict[str, str] = {}
+        for name in self.order:
+            used = {key: inputs.get(key) for key in sorted(self.placeholders[name])}
+            raw = json.dumps(
+                [name, self.templates.get(name, ""), used, [prints[dep] for dep in self.deps[name]]],
+                sort_keys=True,
+                default=str,
+            )
+            prints[name] = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+        return prints
+
+    def ready(self, done: set, started: set) -> List[str]:
+        """Tasks whose dependencies are all done and that have not started yet."""
+        return [
+            name for name in self.order
+            if name not in started and all(dep in done for dep in self.deps[name])
+        ]
+
+
+class ParallelCrew:
+    """
+    Runs a crew's tasks as a DAG instead of `process="sequential"`.
+    Each task executes as a single-task crew once everything in its context
+    has finished; context outputs are read from the upstream Task objects.
+    Exposes the same `kickoff(inputs=...)` -> CrewOutput interface as Crew.
+
+    With `checkpoints` and `run_id` set, each finished task is persisted and
+    tasks that already have a checkpoint for the same inputs are restored
+    instead of re-run. With `incremental=True` outputs are also reused across
+    runs when a task's fingerprint (see TaskGraph.fingerprints) is unchanged.
+    `on_output(name, output)` is called as each task finishes or is restored.
+    """
+
+    def __init__(
+        self,
+        crew: Crew,
+        max_workers: Optional[int] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        run_id: Optional[str] = None,
+        incremental: bool = False,
+        templates: Optional[Dict[str, str]] = None,
+        on_output: Optional[Callable[[str, TaskOutput], None]] = None,
+    ):
+        self.crew = crew
+        self.graph = TaskGraph(crew.tasks, templates)
+        self.max_workers = max_workers or int(os.getenv("PRODUCT_MAX_PARALLEL_TASKS", "4"))
+        self.checkpoints = checkpoints
+        self.run_id = run_id
+        self.incremental = incremental
+        self.on_output = on_output
+        if incremental and self.checkpoints is None:
+            self.checkpoints = CheckpointStore()
+        self.reused_tasks: List[str] = []
+        self.ledger = TokenLedger()
+        # Tasks sharing an agent must not run at the same time
+        self._agent_locks = {id(task.agent): threading.Lock() for task in crew.tasks}
+
+    def kickoff(self, inputs: Optional[dict] = None, resume_from: Optional[str] = None) -> CrewOutput:
+        """
+        Run the graph. `resume_from` forces that task and everything
+        downstream of it to re-run even if checkpoints exist.
+        """
+        outputs: Dict[str, TaskOutput] = {}
+        usage = UsageMetrics()
+        started, done = set(), set()
+        running = {}
+        rerun = self.graph.descendants(resume_from) if resume_from else set()
+        inputs_hash = None
+        if self.checkpoints and self.run_id:
+            inputs_hash = self.checkpoints.start_run(self.run_id, inputs or {})
+        prints = self.graph.fingerprints(inputs) if self.incremental else {}
+        self.reused_tasks = []
+        self.ledger = TokenLedger()
+
+        with track(self.ledger), ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while len(done) < len(self.graph.names):
+                for name in self.graph.ready(done, started):
+                    started.add(name)
+                    task = self.graph.tasks[name]
+                    restored = self._restore(name, inputs_hash, prints) if name not in rerun else None
+                    if restored is not None:
+                        # Downstream context reads the upstream Task's output
+                        task.output = restored
+                        outputs[name] = restored
+                        done.add(name)
+                        if self.on_output:
+                            self.on_output(name, restored)
+                        continue
+                    # Copy the caller's context so per-run log capture follows the task
+                    ctx = contextvars.copy_context()
+                    running[pool.submit(ctx.run, self._run_task, task, inputs)] = name
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        for pending in running:
+                            pending.cancel()
+                        raise
+                    outputs[name] = result.tasks_output[0]
+                    # The task's own BudgetedCrew already recorded it in self.ledger
+                    usage.add_usage_metrics(result.token_usage)
+                    done.add(name)
+                    if inputs_hash:
+                        self.checkpoints.save(self.run_id, inputs_hash, name, outputs[name])
+                    if prints:
+                        self.checkpoints.save_fingerprint(prints[name], name, outputs[name])
+                    if self.on_output:
+                        self.on_output(name, outputs[name])
+
+        if self.crew.verbose:
+            print(f"\n🧮 Token usage\n{self.ledger.report()}")
+        return self._build_output(outputs, usage)
+
+    def _restore(self, name: str, inputs_hash: Optional[str], prints: Dict[str, str]) -> Optional[TaskOutput]:
+        """Checkpoint from this run first, then an unchanged output from an earlier run."""
+        if inputs_hash:
+            output = self.checkpoints.load(self.run_id, inputs_hash, name)
+            if output is not None:
+                return output
+        if prints:
+            output = self.checkpoints.load_fingerprint(prints[name])
+            if output is not None:
+                if self.crew.verbose:
+                    print(f"♻️ Inputs unchanged for {name}, reusing previous output")
+                self.reused_tasks.append(name)
+                if inputs_hash:
+                    self.checkpoints.save(self.run_id, inputs_hash, name, output)
+                return output
+        return None
+
+    def _run_task(self, task: Task, inputs: Optional[dict]) -> CrewOutput:
+        single = BudgetedCrew(
+            agents=[task.agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=self.crew.verbose,
+            step_callback=self.crew.step_callback,
+            task_callback=self.crew.task_callback,
+        )
+        with self._agent_locks[id(task.agent)], telemetry.span("task", task_name(task)) as span:
+            # Agent LLM counters are cumulative (across tasks and pooled runs),
+            # so this task's usage is the difference around its own kickoff
+            before = agent_usage(task.agent)
+            result = single.kickoff(inputs=inputs)
+            result.token_usage = usage_delta(before, agent_usage(task.agent))
+            span.attrs.update(
+                prompt_tokens=result.token_usage.prompt_tokens,
+                completion_tokens=result.token_usage.completion_tokens,
+            )
+            return result
+
+    def _build_output(self, outputs: Dict[str, TaskOutput], usage: UsageMetrics) -> CrewOutput:
+        # Keep declaration order so callers can keep indexing tasks_output
+        tasks_output = [outputs[name] for name in self.graph.names]
+        final = tasks_output[-1]
+        return CrewOutput(
+            raw=final.raw,
+            pydantic=final.pydantic,
+            json_dict=final.json_dict,
+            tasks_output=tasks_output,
+            token_usage=usage,
+        )
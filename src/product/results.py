@@ -0,0 +1,62 @@
+"""
+Run inputs and results shared by the batch runner and the job service:
+input fields and their defaults, the JSON record of a finished run (decision,
+confidence, every task's typed output, token usage) and a log file sink for
+capture_to.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+INPUT_FIELDS = ("product_idea", "target_customer", "constraints", "industry", "vertical")
+DEFAULTS = {
+    "constraints": "No specific constraints",
+    "industry": "Not specified",
+    "vertical": "Not specified",
+}
+
+
+def _task_payload(output) -> dict:
+    if output.pydantic is not None:
+        return {"schema": type(output.pydantic).__name__, "data": output.pydantic.model_dump(mode="json")}
+    return {"raw": output.raw}
+
+
+def result_record(idea: dict, run_id: str, result, duration: float) -> dict:
+    """Record of a finished run (batch output line, job result): summary fields plus every task's (typed) output."""
+    tasks = {task.name: task for task in result.tasks_output}
+    final = tasks.get("final_strategy_task")
+    recommendation = getattr(final, "pydantic", None)
+    usage = result.token_usage
+    return {
+        "id": idea["id"],
+        "status": "ok",
+        "run_id": run_id,
+        "inputs": idea["inputs"],
+        "decision": recommendation.decision if recommendation is not None else None,
+        "confidence": recommendation.confidence if recommendation is not None else None,
+        "summary": recommendation.summary if recommendation is not None else result.raw[:500],
+        "tasks": {name: _task_payload(output) for name, output in tasks.items()},
+        "token_usage": {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "requests": usage.successful_requests,
+        },
+        "duration_s": round(duration, 2),
+        "completed_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+class FileSink:
+    """capture_to sink writing one run's crew output to its own log file."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Line-buffered so the log can be followed while the run is going
+        self.file = path.open("a", encoding="utf-8", buffering=1)
+
+    def put(self, data: str) -> None:
+        self.file.write(data)
+
+    def close(self) -> None:
+        self.file.close()
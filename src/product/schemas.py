@@ -0,0 +1,196 @@
+"""
+Typed task outputs.
+A task in config/tasks.yaml can declare `output_schema: <ModelName>`; the crew
+then asks the LLM for that model (crewai `output_pydantic`) instead of prose.
+Every model renders itself to markdown, which the dashboard, the CLI and
+downstream task context use instead of the raw LLM text.
+"""
+
+from typing import Dict, List, Literal, Optional, Type
+
+from pydantic import BaseModel, Field
+
+Level = Literal["low", "medium", "high"]
+
+
+def _bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items) if items else "- None noted"
+
+
+class Competitor(BaseModel):
+    name: str
+    url: Optional[str] = None
+    positioning: str = ""
+    key_features: List[str] = Field(default_factory=list, description="Top 3-5 features")
+    pricing_model: str = Field("", description="free / freemium / subscription / one-time, with prices if known")
+    strengths: List[str] = Field(default_factory=list)
+    gaps: List[str] = Field(default_factory=list)
+
+
+class CompetitorLandscape(BaseModel):
+    competitors: List[Competitor] = Field(default_factory=list, description="Up to five competitors or solution categories")
+    market_patterns: List[str] = Field(default_factory=list, description='e.g. "Most competitors use a freemium model"')
+
+    def to_markdown(self) -> str:
+        parts = []
+        for c in self.competitors:
+            title = f"### {c.name}" + (f" ({c.url})" if c.url else "")
+            parts.append(
+                f"{title}\n**Positioning:** {c.positioning}\n**Pricing:** {c.pricing_model}\n"
+                f"**Key features:**\n{_bullets(c.key_features)}\n"
+                f"**Strengths:**\n{_bullets(c.strengths)}\n**Gaps:**\n{_bullets(c.gaps)}"
+            )
+        parts.append(f"### Market Patterns\n{_bullets(self.market_patterns)}")
+        return "\n\n".join(parts)
+
+
+class PainQuote(BaseModel):
+    text: str
+    subreddit: str = ""
+    upvotes: Optional[int] = None
+    comments: Optional[int] = None
+    url: Optional[str] = None
+
+
+class PainTheme(BaseModel):
+    theme: str
+    description: str = ""
+    quotes: List[PainQuote] = Field(default_factory=list, description="Direct quotes with subreddit and engagement")
+    intensity: Level = "medium"
+    matching_posts: Optional[int] = Field(None, description="How many posts matched this theme")
+
+    @property
+    def total_upvotes(self) -> int:
+        return sum(q.upvotes or 0 for q in self.quotes)
+
+
+class PainAnalysis(BaseModel):
+    themes: List[PainTheme] = Field(default_factory=list, description="Five recurring pain themes")
+    subreddits: List[str] = Field(default_factory=list)
+    data_quality_note: str = ""
+
+    def to_markdown(self) -> str:
+        parts = []
+        for i, t in enumerate(self.themes, 1):
+            stats = f"intensity: {t.intensity}"
+            if t.matching_posts is not None:
+                stats += f", ~{t.matching_posts} posts"
+            quotes = "\n".join(
+                f'> "{q.text}" — r/{q.subreddit}'
+                + (f" ({q.upvotes} upvotes" + (f", {q.comments} comments)" if q.comments is not None else ")")
+                   if q.upvotes is not None else "")
+                for q in t.quotes
+            )
+            body = "\n\n".join(part for part in (t.description, quotes) if part)
+            parts.append(f"### {i}. {t.theme} ({stats})\n{body}".rstrip())
+        if self.subreddits:
+            parts.append("**Sources:** " + ", ".join(f"r/{s.removeprefix('r/')}" for s in self.subreddits))
+        parts.append(f"**Data Quality Note:** {self.data_quality_note}")
+        return "\n\n".join(parts)
+
+
+class MarketEstimate(BaseModel):
+    low: float = Field(..., description="Lower bound in USD")
+    high: float = Field(..., description="Upper bound in USD")
+    source: str = ""
+    assumptions: List[str] = Field(default_factory=list)
+
+    @property
+    def range_text(self) -> str:
+        return f"{_money(self.low)} - {_money(self.high)}"
+
+
+def _money(value: float) -> str:
+    for unit, size in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if abs(value) >= size:
+            return f"${value / size:,.1f}{unit}"
+    return f"${value:,.0f}"
+
+
+class MarketSizing(BaseModel):
+    tam: MarketEstimate
+    sam: MarketEstimate
+    som: MarketEstimate = Field(..., description="Realistic first-year capture (typically 1-5% of SAM)")
+    willingness_to_pay: str = ""
+    confidence: Level = "low"
+    evidence_gaps: List[str] = Field(default_factory=list)
+
+    def to_markdown(self) -> str:
+        parts = []
+        for label, est in (("TAM", self.tam), ("SAM", self.sam), ("SOM", self.som)):
+            source = f" (source: {est.source})" if est.source else ""
+            parts.append(f"**{label}:** {est.range_text}{source}\n{_bullets(est.assumptions)}")
+        parts.append(f"**Willingness to Pay:** {self.willingness_to_pay}")
+        parts.append(f"**Confidence:** {self.confidence}\n**Evidence gaps:**\n{_bullets(self.evidence_gaps)}")
+        return "\n\n".join(parts)
+
+
+class Risk(BaseModel):
+    risk: str
+    severity: Level
+    evidence_strength: Level = "medium"
+    invalidation_trigger: str = Field("", description="What would change the overall assessment")
+
+
+class RiskAssessment(BaseModel):
+    risks: List[Risk] = Field(default_factory=list)
+    critical_unknowns: List[str] = Field(default_factory=list)
+
+    @property
+    def top_risk(self) -> Optional[Risk]:
+        order = {"high": 0, "medium": 1, "low": 2}
+        return min(self.risks, key=lambda r: (order[r.severity], order[r.evidence_strength]), default=None)
+
+    def to_markdown(self) -> str:
+        rows = "\n".join(
+            f"| {r.risk} | {r.severity} | {r.evidence_strength} | {r.invalidation_trigger} |" for r in self.risks
+        )
+        table = f"| Risk | Severity | Evidence | Invalidation trigger |\n|---|---|---|---|\n{rows}"
+        return f"### Key Risks\n{table}\n\n### Critical Unknowns\n{_bullets(self.critical_unknowns)}"
+
+
+class Recommendation(BaseModel):
+    decision: Literal["proceed", "proceed with constraints", "do not proceed"]
+    summary: str = Field(..., description="One or two sentence recommendation")
+    confidence: Level
+    rationale: List[str] = Field(default_factory=list)
+    top_concerns: List[str] = Field(default_factory=list)
+    next_30_days: List[str] = Field(default_factory=list)
+    next_60_days: List[str] = Field(default_factory=list)
+    next_90_days: List[str] = Field(default_factory=list)
+
+    def to_markdown(self) -> str:
+        return (
+            f"## Product Recommendation: {self.decision.upper()}\n{self.summary}\n\n"
+            f"**Confidence Level:** {self.confidence}\n\n"
+            f"### Rationale\n{_bullets(self.rationale)}\n\n"
+            f"### Top Concerns\n{_bullets(self.top_concerns)}\n\n"
+            f"### Next Steps\n**30 days:**\n{_bullets(self.next_30_days)}\n"
+            f"**60 days:**\n{_bullets(self.next_60_days)}\n"
+            f"**90 days:**\n{_bullets(self.next_90_days)}"
+        )
+
+
+SCHEMAS: Dict[str, Type[BaseModel]] = {
+    model.__name__: model
+    for model in (CompetitorLandscape, PainAnalysis, MarketSizing, RiskAssessment, Recommendation)
+}
+
+
+def get_schema(name: Optional[str]) -> Optional[Type[BaseModel]]:
+    """Model class for a tasks.yaml `output_schema` value (None if not set)."""
+    if not name:
+        return None
+    if name not in SCHEMAS:
+        raise ValueError(f"Unknown output_schema '{name}'. Available: {', '.join(SCHEMAS)}")
+    return SCHEMAS[name]
+
+
+def render(output) -> str:
+    """Markdown for a TaskOutput/CrewOutput: the typed model if present, else the raw text."""
+    if output is None:
+        return ""
+    model = getattr(output, "pydantic", None)
+    if model is not None and hasattr(model, "to_markdown"):
+        return model.to_markdown()
+    return output.raw
@@ -0,0 +1,452 @@
+"""
+Tracing and metrics for crew runs.
+A Tracer collects spans (task, LLM call, tool call, HTTP request) with duration,
+tokens, bytes, cache hits and errors for one run; spans can be exported as JSON
+and observed live (the dashboard drives its agent badges from them). Process-wide
+counters and histograms are exposed in Prometheus text format.
+
+Task spans are opened by the pipeline, HTTP spans and cache counters by the
+tools; LLM and tool spans come from crewai's event bus, whose handlers run with
+the emitting thread's context, so every span lands in the right run's tracer.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+METRIC_HELP = {
+    "product_task_duration_seconds": ("histogram", "Wall time per crew task"),
+    "product_llm_call_duration_seconds": ("histogram", "Wall time per LLM call"),
+    "product_llm_tokens_total": ("counter", "Estimated LLM tokens by direction"),
+    "product_tool_call_duration_seconds": ("histogram", "Wall time per tool call"),
+    "product_tool_calls_total": ("counter", "Tool calls by outcome"),
+    "product_http_request_duration_seconds": ("histogram", "Wall time per outbound HTTP request (incl. retries)"),
+    "product_http_response_bytes_total": ("counter", "Response bytes received per host"),
+    "product_cache_requests_total": ("counter", "Tool cache lookups by result"),
+    "product_coalesced_calls_total": ("counter", "Calls that shared an identical in-flight fetch"),
+    "product_errors_total": ("counter", "Failed spans by kind"),
+    "product_ratelimit_queue_depth": ("gauge", "Requests waiting for a rate limit token per host"),
+    "product_ratelimit_wait_seconds_avg": ("gauge", "Mean wait for a rate limit token per host"),
+    "product_ratelimit_wait_seconds_max": ("gauge", "Longest wait for a rate limit token per host"),
+    "product_ratelimit_throttled_total": ("counter", "Times a host told us to back off (429 / Retry-After)"),
+}
+
+
+class Metrics:
+    """Thread-safe counters and fixed-bucket histograms with labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[tuple, float] = defaultdict(float)
+        self._histograms: Dict[tuple, list] = {}
+        # Callables yielding (name, labels, value) samples read at render time
+        self._collectors: List[Callable] = []
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            # [bucket counts..., sum, count]
+            hist = self._histograms.setdefault(self._key(name, labels), [0] * len(DURATION_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def add_collector(self, collector: Callable) -> None:
+        """Register a callable yielding (name, labels, value) samples of state owned elsewhere."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _collect(self) -> Dict[tuple, float]:
+        samples = {}
+        for collector in list(self._collectors):
+            for name, labels, value in collector():
+                samples[self._key(name, labels)] = value
+        return samples
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+        counters.update(self._collect())
+        lines, seen = [], set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = METRIC_HELP.get(name, ("counter", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines.append(f"{name}{fmt(labels)} {value:g}")
+        for (name, labels), hist in sorted(histograms.items()):
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = METRIC_HELP.get(name, ("histogram", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for bound, count in zip(DURATION_BUCKETS, hist):
+                lines.append(f"{name}_bucket{fmt(labels, [('le', f'{bound:g}')])} {count}")
+            lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {hist[-1]}")
+            lines.append(f"{name}_sum{fmt(labels)} {hist[-2]:.6f}")
+            lines.append(f"{name}_count{fmt(labels)} {hist[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+class Span:
+    def __init__(self, kind: str, name: str, parent_id: Optional[str] = None, **attrs):
+        self.id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.kind = kind
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.attrs = attrs
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.start,
+            "duration_s": round(self.duration, 4),
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """Spans of one run. Listeners are called as listener(event, span) with event "start" or "end"."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self._open: Dict[tuple, Span] = {}
+        # Event handlers run on a thread pool, so an end can arrive before its start
+        self._early_ends: Dict[tuple, dict] = {}
+        self._listeners: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, span: Span) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event, span)
+            except Exception:
+                # A broken UI listener must never fail the run
+                pass
+
+    def start_span(self, kind: str, name: str, key: Optional[tuple] = None, parent_id: Optional[str] = None,
+                   start: Optional[float] = None, **attrs) -> Span:
+        if parent_id is None:
+            parent = _current_span.get()
+            parent_id = parent.id if parent is not None else None
+        span = Span(kind, name, parent_id, **attrs)
+        if start is not None:
+            span.start = start
+        with self._lock:
+            self.spans.append(span)
+            early_end = self._early_ends.pop(key, None) if key is not None else None
+            if key is not None and early_end is None:
+                self._open[key] = span
+        self._notify("start", span)
+        if early_end is not None:
+            self.end_span(span, **early_end)
+        return span
+
+    def end_span(self, span: Optional[Span] = None, key: Optional[tuple] = None, error: Optional[str] = None,
+                 end: Optional[float] = None, **attrs) -> Optional[Span]:
+        with self._lock:
+            if key is not None:
+                span = self._open.pop(key, None) or span
+                if span is None:
+                    self._early_ends[key] = dict(error=error, end=end or time.time(), **attrs)
+                    return None
+        if span is None or span.end is not None:
+            return None
+        span.end = end or time.time()
+        span.attrs.update(attrs)
+        span.status = "error" if error else "ok"
+        span.error = error
+        _record_metrics(span)
+        self._notify("end", span)
+        return span
+
+    def finish(self) -> None:
+        """Close spans whose end event never arrived (e.g. the run was aborted)."""
+        with self._lock:
+            leftovers = list(self._open.values())
+            self._open.clear()
+            self._early_ends.clear()
+        for span in leftovers:
+            self.end_span(span, error="span was not closed")
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "duration_s": round(time.time() - self.started_at, 4),
+            "spans": spans,
+        }
+
+    def summary(self) -> Dict[str, dict]:
+        """Total time, count and errors per span kind and name."""
+        totals: Dict[str, dict] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            entry = totals.setdefault(f"{span.kind}:{span.name}", {"count": 0, "total_s": 0.0, "errors": 0})
+            entry["count"] += 1
+            entry["total_s"] = round(entry["total_s"] + span.duration, 4)
+            entry["errors"] += int(span.status == "error")
+        return totals
+
+    def export(self, path: Optional[Path] = None) -> Path:
+        from product.tools.cache import cache_dir
+
+        path = Path(path) if path else cache_dir() / "traces" / f"{self.run_id}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+        return path
+
+
+metrics = Metrics()
+_current_tracer: ContextVar[Optional[Tracer]] = ContextVar("product_tracer", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("product_span", default=None)
+_handlers_installed = False
+_handlers_lock = threading.Lock()
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+@contextmanager
+def trace(tracer: Tracer):
+    """Record spans of everything run in this context (and copies of it) into `tracer`."""
+    install_event_handlers()
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs):
+    """
+    Time a block as a child of the current span. Yields the span (or None when
+    no run is being traced) so the block can add attributes; metrics are
+    recorded either way.
+    """
+    tracer = _current_tracer.get()
+    current = tracer.start_span(kind, name, **attrs) if tracer else Span(kind, name, **attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        _current_span.reset(token)
+        _finish(tracer, current, error=f"{type(e).__name__}: {e}")
+        raise
+    _current_span.reset(token)
+    _finish(tracer, current)
+
+
+def _finish(tracer: Optional[Tracer], current: Span, error: Optional[str] = None) -> None:
+    if tracer:
+        tracer.end_span(current, error=error)
+    else:
+        current.end = time.time()
+        current.status = "error" if error else "ok"
+        _record_metrics(current)
+
+
+def add_attrs(**attrs) -> None:
+    """Add to numeric attributes of the current span (e.g. cache_hits=1)."""
+    current = _current_span.get()
+    if current is None:
+        return
+    for name, value in attrs.items():
+        current.attrs[name] = current.attrs.get(name, 0) + value
+
+
+def record_cache(source: str, hit: bool) -> None:
+    metrics.inc("product_cache_requests_total", source=source, result="hit" if hit else "miss")
+    add_attrs(**{"cache_hits" if hit else "cache_misses": 1})
+
+
+def record_coalesced(source: str) -> None:
+    metrics.inc("product_coalesced_calls_total", source=source)
+    add_attrs(coalesced_calls=1)
+
+
+def _rate_limit_samples():
+    # Imported here: the tools package imports this module
+    from product.tools.rate_limit import get_rate_limiter
+    for host, bucket in get_rate_limiter().metrics().items():
+        yield "product_ratelimit_queue_depth", {"host": host}, bucket["queue_depth"]
+        yield "product_ratelimit_wait_seconds_avg", {"host": host}, bucket["avg_wait_s"]
+        yield "product_ratelimit_wait_seconds_max", {"host": host}, bucket["max_wait_s"]
+        yield "product_ratelimit_throttled_total", {"host": host}, bucket["throttled"]
+
+
+metrics.add_collector(_rate_limit_samples)
+
+
+def _record_metrics(span: Span) -> None:
+    if span.kind == "task":
+        metrics.observe("product_task_duration_seconds", span.duration, task=span.name)
+    elif span.kind == "llm":
+        metrics.observe("product_llm_call_duration_seconds", span.duration, agent=span.attrs.get("agent", ""))
+        metrics.inc("product_llm_tokens_total", span.attrs.get("prompt_tokens", 0), direction="prompt")
+        metrics.inc("product_llm_tokens_total", span.attrs.get("completion_tokens", 0), direction="completion")
+    elif span.kind == "tool":
+        metrics.observe("product_tool_call_duration_seconds", span.duration, tool=span.name)
+        metrics.inc("product_tool_calls_total", tool=span.name, status=span.status)
+    elif span.kind == "http":
+        metrics.observe("product_http_request_duration_seconds", span.duration, host=span.name)
+        metrics.inc("product_http_response_bytes_total", span.attrs.get("bytes", 0), host=span.name)
+    if span.status == "error":
+        metrics.inc("product_errors_total", kind=span.kind)
+
+
+def install_event_handlers() -> None:
+    """Turn crewai LLM and tool events into spans (once per process)."""
+    global _handlers_installed
+    with _handlers_lock:
+        if _handlers_installed:
+            return
+        _handlers_installed = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+    from crewai.events.types.tool_usage_events import (
+        ToolUsageErrorEvent,
+        ToolUsageFinishedEvent,
+        ToolUsageStartedEvent,
+    )
+
+    from product.budget import count_tokens
+
+    # Handlers run with a copy of the emitting thread's context, so the run's
+    # tracer and the task span are visible here
+    def llm_key(event):
+        return ("llm", event.task_id or event.agent_id)
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        tracer = _current_tracer.get()
+        if tracer:
+            messages = event.messages if isinstance(event.messages, str) else json.dumps(event.messages or [], default=str)
+            tracer.start_span(
+                "llm", event.model or "llm", key=llm_key(event), start=event.timestamp.timestamp(),
+                agent=event.agent_role or "", prompt_tokens=count_tokens(messages),
+            )
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        tracer = _current_tracer.get()
+        if tracer:
+            tracer.end_span(
+                key=llm_key(event), end=event.timestamp.timestamp(),
+                completion_tokens=count_tokens(str(event.response or "")),
+            )
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        tracer = _current_tracer.get()
+        if tracer:
+            tracer.end_span(key=llm_key(event), end=event.timestamp.timestamp(), error=str(event.error))
+
+    def tool_key(event):
+        return ("tool", event.task_id or event.agent_id, event.tool_name)
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def on_tool_started(source, event):
+        tracer = _current_tracer.get()
+        if tracer:
+            tracer.start_span(
+                "tool", event.tool_name, key=tool_key(event), start=event.timestamp.timestamp(),
+                agent=event.agent_role or "",
+            )
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        tracer = _current_tracer.get()
+        if tracer:
+            output = str(event.output or "")
+            tracer.end_span(
+                key=tool_key(event), end=event.finished_at.timestamp(),
+                output_bytes=len(output.encode("utf-8")), from_cache=bool(event.from_cache),
+            )
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source, event):
+        tracer = _current_tracer.get()
+        if tracer:
+            tracer.end_span(key=tool_key(event), end=event.timestamp.timestamp(), error=str(event.error))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_metrics_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on PRODUCT_METRICS_PORT (no-op if unset or already running)."""
+    global _metrics_server
+    port = port or int(os.getenv("PRODUCT_METRICS_PORT", "0"))
+    if not port or _metrics_server is not None:
+        return _metrics_server
+    _metrics_server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    _metrics_server.daemon_threads = True
+    threading.Thread(target=_metrics_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _metrics_server
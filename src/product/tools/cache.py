@@ -0,0 +1,270 @@
+"""
+Persistent response cache for the Reddit and Serper tools.
+Results are stored in a local SQLite file so repeated analyses (and other
+processes on the same machine) reuse them instead of re-hitting the network.
+Misses are single-flight: identical fetches already in progress (from another
+agent or session) are joined instead of repeated.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from product import telemetry
+
+# How long (seconds) a cached response stays fresh, per source.
+# Override with PRODUCT_CACHE_TTL_<SOURCE>, e.g. PRODUCT_CACHE_TTL_SERPER=3600
+DEFAULT_TTLS = {
+    "reddit_json": 30 * 60,
+    "reddit_rss": 15 * 60,
+    "reddit_comments": 2 * 60 * 60,
+    # Feed copies kept for conditional GETs once the entries above expire
+    "reddit_rss_feed": 7 * 24 * 60 * 60,
+    "serper": 24 * 60 * 60,
+}
+DEFAULT_TTL = 30 * 60
+
+_MISS = object()
+
+
+def cache_dir() -> Path:
+    """Directory holding all on-disk caches (PRODUCT_CACHE_DIR to override)."""
+    path = Path(os.getenv("PRODUCT_CACHE_DIR", Path.home() / ".cache" / "product-discovery"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def normalize_key(tool: str, query: str, subreddit: str = "", limit: int = 0) -> str:
+    """Build a stable cache key so near-identical calls share one entry."""
+    query = " ".join(str(query).lower().split())
+    subreddit = str(subreddit).strip().lower()
+    if subreddit.startswith("r/"):
+        subreddit = subreddit[2:]
+    raw = json.dumps([tool, query, subreddit, int(limit)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """At most one call per key at a time; concurrent callers with the same key share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> tuple:
+        """
+        (result, shared): shared is True when another caller's in-flight call
+        was joined; joined callers receive a deep copy of the result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Each caller gets its own copy (as a cache hit would), so mutating a
+            # shared result cannot leak into another caller's data
+            return copy.deepcopy(call.value), True
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+
+class ResponseCache:
+    """SQLite-backed key/value cache with per-source TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 5000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttls: Optional[dict] = None,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+
+    def ttl_for(self, source: str) -> float:
+        override = os.getenv(f"PRODUCT_CACHE_TTL_{source.upper()}")
+        if override:
+            return float(override)
+        return self.ttls.get(source, DEFAULT_TTL)
+
+    def get(self, source: str, key: str, default: Any = None, count: bool = True) -> Any:
+        """
+        Return the cached value, or `default` when missing or expired.
+        count=False leaves the hit/miss stats alone (for lookups that are not
+        answering a request themselves, e.g. reading revalidation headers).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ? AND source = ?",
+                (key, source),
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if count:
+                    self.misses += 1
+                return default
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            if count:
+                self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, source: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value under `key`."""
+        now = time.time()
+        payload = json.dumps(value)
+        ttl = self.ttl_for(source) if ttl is None else ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, source, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, payload, len(payload), now + ttl, now),
+            )
+            self._evict(now)
+
+    def get_or_fetch(self, source: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Return the cached value or call `fetch()` (once across concurrent callers)
+        and cache its result. Callers that join an in-flight fetch count as
+        coalesced, not as misses.
+        """
+        value = self.get(source, key, _MISS, count=False)
+        if value is not _MISS:
+            self._count(source, hit=True)
+            return value
+
+        def fetch_and_store():
+            # Only runs for the caller that leads the flight
+            self._count(source, hit=False)
+            fetched = fetch()
+            self.set(source, key, fetched)
+            return fetched
+
+        return self.coalesce(source, key, fetch_and_store)
+
+    def _count(self, source: str, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        telemetry.record_cache(source, hit=hit)
+
+    def coalesce(self, source: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Call `fetch()` unless an identical call is in flight, then share its result (nothing is cached)."""
+        value, shared = self.flights.do(f"{source}:{key}", fetch)
+        if shared:
+            telemetry.record_coalesced(source)
+        return value
+
+    def _evict(self, now: float) -> None:
+        # Expired rows first, then least recently used until within bounds
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        while total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            total -= row[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self.hits = 0
+            self.misses = 0
+            self.flights.coalesced = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+            "coalesced": self.flights.coalesced,
+        }
+
+
+_tool_cache: Optional[ResponseCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ResponseCache:
+    """Process-wide cache shared by all search tools."""
+    global _tool_cache
+    if _tool_cache is None:
+        with _tool_cache_lock:
+            if _tool_cache is None:
+                _tool_cache = ResponseCache(
+                    cache_dir() / "tool_cache.sqlite3",
+                    max_entries=int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "5000")),
+                    max_bytes=int(float(os.getenv("PRODUCT_CACHE_MAX_MB", "64")) * 1024 * 1024),
+                )
+    return _tool_cache
@@ -0,0 +1,76 @@
+"""
+Streaming Atom/RSS parsing for the Reddit feed tool.
+Feeds are parsed chunk by chunk with expat's pull parser. Each entry is
+reduced to title/link/summary as soon as its closing tag arrives and then
+dropped from the tree. Parsing stops after `limit` entries, so the rest of
+the download is never read.
+"""
+
+import html
+import re
+from typing import Iterable, List
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+SUMMARY_CHARS = 300
+# Tags, entities and whitespace runs in a single pass
+_MARKUP = re.compile(r"(?:\s*<[^>]*>)+\s*|&(?:#\d+|#x[0-9a-fA-F]+|\w+);|\s+")
+
+
+def _replace_markup(match: re.Match) -> str:
+    token = match.group()
+    if token.startswith("&"):
+        return html.unescape(token)
+    return " "
+
+
+def strip_html(text: str) -> str:
+    """Visible text of an HTML fragment with whitespace collapsed."""
+    return _MARKUP.sub(_replace_markup, text).strip()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_feed(chunks: Iterable[bytes], limit: int) -> List[dict]:
+    """First `limit` entries of an Atom (or RSS 2.0) feed as {"title", "summary", "link"}."""
+    parser = XMLPullParser(events=("start", "end"))
+    entries = []
+    open_elements = []
+    started = False
+    for chunk in chunks:
+        parser.feed(chunk)
+        try:
+            events = list(parser.read_events())
+        except ParseError as e:
+            raise RuntimeError(f"could not parse feed: {e}") from None
+        for event, element in events:
+            if event == "start":
+                open_elements.append(element)
+                started = True
+                continue
+            open_elements.pop()
+            if _local(element.tag) not in ("entry", "item"):
+                continue
+            fields = {_local(child.tag): child for child in element}
+            link = fields.get("link")
+            href = (link.get("href") or link.text or "") if link is not None else ""
+            body = fields.get("content", fields.get("summary", fields.get("description")))
+            entries.append({
+                "title": (fields["title"].text or "").strip() if "title" in fields else "",
+                "summary": strip_html(body.text or "")[:SUMMARY_CHARS] if body is not None else "",
+                "link": href.strip(),
+            })
+            # Finished entries are detached so the tree never holds more than one
+            if open_elements:
+                open_elements[-1].remove(element)
+            if len(entries) >= limit:
+                return entries
+    if not started:
+        raise RuntimeError("could not parse feed: empty response")
+    # The whole feed was read: a truncated or malformed document must fail, not look short
+    try:
+        parser.close()
+    except ParseError as e:
+        raise RuntimeError(f"could not parse feed: {e}") from None
+    return entries
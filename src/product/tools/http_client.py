@@ -0,0 +1,122 @@
+"""
+Shared HTTP client for the search tools.
+One process-wide requests.Session with per-host keep-alive connection pools,
+so repeated tool calls reuse TCP/TLS connections instead of re-handshaking.
+"""
+
+import os
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from product import telemetry
+from product.tools.rate_limit import RateLimitError, backoff_delay, get_rate_limiter, retry_after_seconds
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) ProductDiscovery/1.0"
+DEFAULT_TIMEOUT = 10
+MAX_RETRIES = int(os.getenv("PRODUCT_HTTP_MAX_RETRIES", "3"))
+RETRY_STATUSES = {429, 502, 503, 504}
+# Longer server-requested waits fail fast instead of parking a worker thread
+MAX_RETRY_WAIT = float(os.getenv("PRODUCT_HTTP_MAX_RETRY_WAIT", "60"))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    # pool_connections = number of hosts kept, pool_maxsize = sockets per host
+    adapter = HTTPAdapter(
+        pool_connections=int(os.getenv("PRODUCT_HTTP_POOL_HOSTS", "10")),
+        pool_maxsize=int(os.getenv("PRODUCT_HTTP_POOL_SIZE", "20")),
+        max_retries=0,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def request(method: str, url: str, max_retries: int = MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session.
+    Waits for the host's rate-limit token first and retries 429/5xx answers
+    with Retry-After or jittered exponential backoff.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host = urlsplit(url).hostname or ""
+    with telemetry.span("http", host, method=method) as span:
+        response = _send(method, url, host, max_retries, **kwargs)
+        span.attrs.update(
+            status=response.status_code,
+            bytes=len(response.content) if not kwargs.get("stream") else 0,
+        )
+        return response
+
+
+def _send(method: str, url: str, host: str, max_retries: int, **kwargs) -> requests.Response:
+    bucket = get_rate_limiter().bucket(host)
+
+    for attempt in range(max_retries + 1):
+        telemetry.add_attrs(attempts=1)
+        bucket.acquire()
+        response = get_session().request(method, url, **kwargs)
+        bucket.observe(response.headers)
+        if response.status_code not in RETRY_STATUSES:
+            return response
+
+        delay = retry_after_seconds(response.headers)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        throttled = response.status_code == 429
+        if attempt == max_retries or delay > MAX_RETRY_WAIT:
+            if throttled:
+                response.close()
+                bucket.pause(min(delay, MAX_RETRY_WAIT), throttled=True)
+                raise RateLimitError(host, delay)
+            return response
+        response.close()
+        bucket.pause(delay, throttled=throttled)
+    return response
+
+
+def stream_chunks(response: requests.Response, chunk_size: int = 64 * 1024):
+    """Body of a `stream=True` response in chunks, counted in the HTTP byte metrics."""
+    host = urlsplit(response.url).hostname or ""
+    for chunk in response.iter_content(chunk_size):
+        telemetry.metrics.inc("product_http_response_bytes_total", len(chunk), host=host)
+        yield chunk
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def close() -> None:
+    """Drop pooled connections (e.g. before forking worker processes)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
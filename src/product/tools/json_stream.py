@@ -0,0 +1,135 @@
+"""
+Incremental JSON parsing for large HTTP responses.
+`iter_values` scans a response chunk by chunk and yields only the values at
+the requested paths (ijson-style prefixes: object keys joined by ".", array
+elements as "item", e.g. "data.children.item"). Only the value currently being
+decoded is held in memory, so a multi-megabyte listing never exists as one
+parsed document.
+"""
+
+import codecs
+import json
+import re
+from typing import Iterable, Iterator, Tuple
+
+_SKIP = re.compile(r"[\s,:]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+# Characters that can still extend a number matched at the end of the buffer ("-0." + "5e-3")
+_NUMBER_TAIL = re.compile(r"[\d.eE+-]*")
+# Consumed text is dropped from the buffer once it grows past this many characters
+_COMPACT_AT = 1 << 16
+
+
+class _Frame:
+    __slots__ = ("is_object", "key", "expect_key")
+
+    def __init__(self, is_object: bool):
+        self.is_object = is_object
+        self.key = ""
+        self.expect_key = is_object
+
+
+def iter_values(chunks: Iterable[bytes], paths: Iterable[str]) -> Iterator[Tuple[str, object]]:
+    """
+    Yield (path, value) for every value whose path is in `paths`, in document
+    order. Containers at a matching path are decoded whole; everything else is
+    skipped without being decoded. Raises ValueError on malformed or truncated input.
+    """
+    paths = set(paths)
+    source = iter(chunks)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, eof = "", 0, False
+    stack = []
+    capture = None  # [start offset, depth, path] while a matching container is being read
+
+    def current_path() -> str:
+        return ".".join(frame.key if frame.is_object else "item" for frame in stack)
+
+    def value_done() -> None:
+        if stack and stack[-1].is_object:
+            stack[-1].expect_key = True
+
+    while True:
+        need_more = False
+        if capture is not None:
+            found = _STRUCTURAL.search(buf, pos)
+            if found is None:
+                pos = len(buf)
+                need_more = True
+            elif found.group() == '"':
+                string = _STRING.match(buf, found.start())
+                if string is None:
+                    pos = found.start()
+                    need_more = True
+                else:
+                    pos = string.end()
+            else:
+                capture[1] += 1 if found.group() in "{[" else -1
+                pos = found.end()
+                if capture[1] == 0:
+                    start, _, path = capture
+                    capture = None
+                    yield path, json.loads(buf[start:pos])
+                    value_done()
+        else:
+            if pos > _COMPACT_AT:
+                buf, pos = buf[pos:], 0
+            pos = _SKIP.match(buf, pos).end()
+            if pos >= len(buf):
+                if eof:
+                    if stack:
+                        raise ValueError("Truncated JSON document")
+                    return
+                need_more = True
+            else:
+                char = buf[pos]
+                frame = stack[-1] if stack else None
+                if char in "}]":
+                    if not stack:
+                        raise ValueError(f"Unexpected {char!r} in JSON document")
+                    stack.pop()
+                    pos += 1
+                    value_done()
+                elif frame is not None and frame.expect_key:
+                    key = _STRING.match(buf, pos)
+                    if key is None:
+                        need_more = True
+                    else:
+                        frame.key = json.loads(key.group())
+                        frame.expect_key = False
+                        pos = key.end()
+                elif char in "{[":
+                    path = current_path()
+                    if path in paths:
+                        # Keep the buffer from here on until the container closes
+                        buf, pos = buf[pos:], 0
+                        capture = [0, 1, path]
+                        pos = 1
+                    else:
+                        stack.append(_Frame(char == "{"))
+                        pos += 1
+                else:
+                    token = (_STRING if char == '"' else _SCALAR).match(buf, pos)
+                    # A number at the end of the buffer may continue in the next chunk
+                    if token is None or (not eof and _NUMBER_TAIL.fullmatch(buf, token.end())):
+                        if token is None and eof:
+                            raise ValueError(f"Invalid JSON near {buf[pos:pos + 40]!r}")
+                        need_more = True
+                    else:
+                        path = current_path()
+                        if path in paths:
+                            yield path, json.loads(token.group())
+                        pos = token.end()
+                        value_done()
+
+        if need_more:
+            if eof:
+                raise ValueError("Truncated JSON document")
+            chunk = next(source, None)
+            if chunk is None:
+                eof = True
+                buf += decoder.decode(b"", final=True)
+            else:
+                buf += decoder.decode(chunk)
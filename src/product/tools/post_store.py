@@ -0,0 +1,422 @@
+"""
+Local corpus of Reddit posts with a full-text index.
+Every post the Reddit tools fetch is written to a SQLite table with an FTS5
+index over title, body and comments. Subreddits are kept current by a sync
+(`uv run sync_reddit`, or opt-in in the background) that pages through /new
+only until it reaches the newest stored post ID. Each sync records how far
+back its pages reach. A subreddit is "warm" for a tool query when it was
+synced recently and the synced posts cover the query's whole time window;
+only then is the query answered from the index instead of a live search.
+
+PRODUCT_POST_STORE selects the mode: "auto" (index for warm subreddits, live
+fetch for cold ones), "offline" (index only, never fetch) or "off".
+"""
+
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from product.budget import fit_tool_output
+from product.tools.cache import cache_dir
+from product.tools.ranking import format_posts, from_reddit_json, rank_posts, tokenize
+
+MODE = os.getenv("PRODUCT_POST_STORE", "auto").lower()
+# A subreddit synced within this many seconds is answered from the index
+FRESH_SECONDS = float(os.getenv("PRODUCT_POST_STORE_FRESH_SECONDS", str(6 * 60 * 60)))
+SYNC_MAX_PAGES = int(os.getenv("PRODUCT_POST_SYNC_PAGES", "10"))
+# Queue a background /new sync for every cold subreddit a tool searches (competes with live calls)
+SYNC_IN_BACKGROUND = os.getenv("PRODUCT_POST_SYNC_BACKGROUND", "off").lower() in ("1", "on", "true", "yes")
+# Reddit stops listings after about this many posts, so reaching the end of a longer one proves nothing
+LISTING_CAP = 1000
+# Time windows of Reddit search (t=...) in seconds; None = all time
+WINDOWS = {
+    "hour": 60 * 60,
+    "day": 24 * 60 * 60,
+    "week": 7 * 24 * 60 * 60,
+    "month": 30 * 24 * 60 * 60,
+    "year": 365 * 24 * 60 * 60,
+    "all": None,
+}
+
+
+def _id_number(post_id: str) -> Optional[int]:
+    """Reddit IDs are base 36 and increase over time; None for non-Reddit IDs."""
+    try:
+        return int(post_id, 36)
+    except (TypeError, ValueError):
+        return None
+
+
+def match_query(query: str) -> str:
+    """FTS5 query matching any term of a free-text query (terms quoted, so no syntax errors)."""
+    terms = dict.fromkeys(tokenize(query))
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class PostStore:
+    """SQLite store of compact Reddit posts with an FTS5 index."""
+
+    def __init__(self, path):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                id TEXT PRIMARY KEY,
+                id_number INTEGER,
+                subreddit TEXT NOT NULL COLLATE NOCASE,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                comments TEXT NOT NULL DEFAULT '',
+                score INTEGER,
+                num_comments INTEGER,
+                created_utc REAL,
+                permalink TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_posts_subreddit ON posts(subreddit, id_number);
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, body, comments, content='posts', content_rowid='rowid'
+            );
+            CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts(rowid, title, body, comments)
+                VALUES (new.rowid, new.title, new.body, new.comments);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts(posts_fts, rowid, title, body, comments)
+                VALUES ('delete', old.rowid, old.title, old.body, old.comments);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+                INSERT INTO posts_fts(posts_fts, rowid, title, body, comments)
+                VALUES ('delete', old.rowid, old.title, old.body, old.comments);
+                INSERT INTO posts_fts(rowid, title, body, comments)
+                VALUES (new.rowid, new.title, new.body, new.comments);
+            END;
+            CREATE TABLE IF NOT EXISTS subreddits (
+                name TEXT PRIMARY KEY COLLATE NOCASE,
+                newest_id INTEGER,
+                synced_at REAL NOT NULL
+            );
+            """
+        )
+        # Creation time the synced posts reach back to without gaps (0 = the whole subreddit)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(subreddits)")}
+        if "covered_since" not in columns:
+            self._conn.execute("ALTER TABLE subreddits ADD COLUMN covered_since REAL")
+
+    def add_posts(self, posts: Iterable[dict]) -> int:
+        """
+        Insert or refresh compact post dicts (the JSON tool's shape, optionally
+        with "comments"). Engagement and comments already stored are kept when
+        the new record lacks them (e.g. RSS entries).
+        """
+        now = time.time()
+        rows = []
+        for post in posts:
+            if not post.get("id") or not post.get("subreddit"):
+                continue
+            # One comment per line
+            comments = "\n".join(" ".join(c["body"].split()) for c in post.get("comments") or [])
+            rows.append((
+                post["id"].lower(), _id_number(post["id"]), post["subreddit"], post.get("title", ""),
+                post.get("selftext", ""), comments, post.get("score"), post.get("num_comments"),
+                post.get("created_utc"), post.get("permalink", ""), now,
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                """
+                INSERT INTO posts (id, id_number, subreddit, title, body, comments, score,
+                                   num_comments, created_utc, permalink, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    body = CASE WHEN length(excluded.body) > length(posts.body) THEN excluded.body ELSE posts.body END,
+                    comments = CASE WHEN excluded.comments != '' THEN excluded.comments ELSE posts.comments END,
+                    score = COALESCE(excluded.score, posts.score),
+                    num_comments = COALESCE(excluded.num_comments, posts.num_comments),
+                    created_utc = COALESCE(excluded.created_utc, posts.created_utc),
+                    permalink = CASE WHEN excluded.permalink != '' THEN excluded.permalink ELSE posts.permalink END,
+                    stored_at = excluded.stored_at
+                """,
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def search(
+        self,
+        query: str,
+        subreddits: Optional[List[str]] = None,
+        min_score: int = 0,
+        min_comments: int = 0,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+    ) -> List[dict]:
+        """Best BM25 matches as compact post dicts, filtered by subreddit, engagement and creation time."""
+        terms = match_query(query)
+        if not terms:
+            return []
+        sql = [
+            "SELECT p.id, p.subreddit, p.title, p.body, p.comments, p.score, p.num_comments,",
+            "       p.created_utc, p.permalink",
+            "FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid",
+            "WHERE posts_fts MATCH ?",
+        ]
+        params: list = [terms]
+        if subreddits:
+            sql.append(f"AND p.subreddit IN ({', '.join('?' * len(subreddits))})")
+            params += subreddits
+        if min_score:
+            sql.append("AND COALESCE(p.score, 0) >= ?")
+            params.append(min_score)
+        if min_comments:
+            sql.append("AND COALESCE(p.num_comments, 0) >= ?")
+            params.append(min_comments)
+        if since is not None:
+            sql.append("AND p.created_utc >= ?")
+            params.append(since)
+        if until is not None:
+            sql.append("AND p.created_utc < ?")
+            params.append(until)
+        # Title matches weigh more than body and comment matches
+        sql.append("ORDER BY bm25(posts_fts, 3.0, 1.0, 0.5) LIMIT ?")
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute("\n".join(sql), params).fetchall()
+        return [
+            {
+                "id": post_id, "subreddit": subreddit, "title": title, "selftext": body,
+                "comments": [{"body": line} for line in comments.splitlines() if line],
+                "score": score, "num_comments": num_comments, "created_utc": created_utc,
+                "permalink": permalink,
+            }
+            for post_id, subreddit, title, body, comments, score, num_comments, created_utc, permalink in rows
+        ]
+
+    def newest_id(self, subreddit: str) -> Optional[int]:
+        """Newest post seen by the last /new sync (search results can be newer, but leave gaps)."""
+        with self._lock:
+            row = self._conn.execute("SELECT newest_id FROM subreddits WHERE name = ?", (subreddit,)).fetchone()
+        return row[0] if row else None
+
+    def covered_since(self, subreddit: str) -> Optional[float]:
+        """Creation time back to which synced posts are complete (0 = all of them), None if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT covered_since FROM subreddits WHERE name = ?", (subreddit,)).fetchone()
+        return row[0] if row else None
+
+    def is_warm(self, subreddit: str, since: Optional[float] = None) -> bool:
+        """
+        Synced recently, and the synced posts reach back to `since` (None = all
+        time), so the index holds everything a live search over that window sees.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at, covered_since FROM subreddits WHERE name = ?", (subreddit,)
+            ).fetchone()
+        if row is None or row[1] is None or time.time() - row[0] >= FRESH_SECONDS:
+            return False
+        return row[1] <= (since or 0)
+
+    def sync(self, subreddit: str, max_pages: int = SYNC_MAX_PAGES) -> int:
+        """Store posts newer than the newest stored one, paging /new until it is reached."""
+        # Imported here: reddit_tool itself reads and writes through this store
+        from product.tools.reddit_tool import fetch_listing
+
+        newest = self.newest_id(subreddit)
+        seen = newest
+        added, after, fetched = 0, None, 0
+        oldest, joined = None, False
+        for _ in range(max_pages):
+            posts, after = fetch_listing(f"/r/{subreddit}/new.json", {"limit": 100}, after=after)
+            numbers = [_id_number(p["id"]) or 0 for p in posts]
+            fresh = [p for p, number in zip(posts, numbers) if newest is None or number > newest]
+            added += self.add_posts(fresh)
+            fetched += len(posts)
+            seen = max([seen or 0] + numbers)
+            created = [p["created_utc"] for p in posts if p.get("created_utc")]
+            if created:
+                oldest = min(created) if oldest is None else min(oldest, *created)
+            joined = len(fresh) < len(posts)
+            if joined or not after:
+                break
+
+        # How far back the index is now complete: reaching the previous sync's newest post
+        # continues its coverage, the end of a short listing covers everything, and running
+        # out of pages leaves a gap before the oldest post read
+        previous = self.covered_since(subreddit)
+        if joined and previous is not None:
+            covered = min(previous, oldest) if oldest is not None else previous
+        elif not after and fetched < LISTING_CAP:
+            covered = 0.0
+        else:
+            covered = oldest
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subreddits (name, newest_id, synced_at, covered_since) VALUES (?, ?, ?, ?)",
+                (subreddit, seen, time.time(), covered),
+            )
+        return added
+
+    def stats(self) -> dict:
+        with self._lock:
+            posts = self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+            subreddits = self._conn.execute("SELECT COUNT(*) FROM subreddits").fetchone()[0]
+        return {"posts": posts, "synced_subreddits": subreddits}
+
+
+class PostSyncer:
+    """Background thread syncing subreddits queued by the tools, one at a time."""
+
+    def __init__(self, store: PostStore):
+        self.store = store
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, subreddit: str) -> None:
+        key = subreddit.lower()
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="post-sync", daemon=True)
+                self._thread.start()
+        self._queue.put(subreddit)
+
+    def _work(self) -> None:
+        while True:
+            subreddit = self._queue.get()
+            try:
+                self.store.sync(subreddit)
+            except Exception:
+                # Stays cold; the next live query schedules it again
+                pass
+            finally:
+                with self._lock:
+                    self._pending.discard(subreddit.lower())
+
+
+_post_store: Optional[PostStore] = None
+_post_syncer: Optional[PostSyncer] = None
+_post_store_lock = threading.Lock()
+
+
+def get_post_store() -> PostStore:
+    """Process-wide post store shared by all Reddit tools."""
+    global _post_store, _post_syncer
+    if _post_store is None:
+        with _post_store_lock:
+            if _post_store is None:
+                _post_syncer = PostSyncer(PostStore(cache_dir() / "posts.sqlite3"))
+                _post_store = _post_syncer.store
+    return _post_store
+
+
+def indexed_posts(query: str, subreddit: str, limit: int, window: str = "all") -> Optional[List[dict]]:
+    """
+    Index answer for a single-subreddit tool query over a Reddit time window
+    ("month", "all", ...), or None when the caller should search live: store
+    off, or in "auto" mode a subreddit whose sync is stale or does not reach
+    back over the whole window. With PRODUCT_POST_SYNC_BACKGROUND=on cold
+    subreddits are queued for a background sync.
+    """
+    if MODE == "off":
+        return None
+    seconds = WINDOWS.get(window)
+    since = time.time() - seconds if seconds else None
+    store = get_post_store()
+    if MODE != "offline" and not store.is_warm(subreddit, since):
+        if SYNC_IN_BACKGROUND:
+            _post_syncer.schedule(subreddit)
+        return None
+    return store.search(query, [subreddit], since=since, limit=limit)
+
+
+def store_posts(posts: Iterable[dict]) -> None:
+    """Write live results into the corpus (no-op when the store is off)."""
+    if MODE != "off":
+        get_post_store().add_posts(posts)
+
+
+class RedditIndexSearchInput(BaseModel):
+    """Input schema for local index search."""
+    query: str = Field(..., description="Keywords to search for in post titles, bodies and comments")
+    subreddits: List[str] = Field(default=[], description="Restrict to these subreddits (empty = all indexed)")
+    min_upvotes: int = Field(default=0, description="Only posts with at least this many upvotes")
+    min_comments: int = Field(default=0, description="Only posts with at least this many comments")
+    max_age_days: Optional[int] = Field(default=None, description="Only posts created within this many days")
+    min_age_days: Optional[int] = Field(default=None, description="Only posts older than this many days")
+
+
+class RedditIndexSearchTool(BaseTool):
+    name: str = "Reddit Local Index Search"
+    description: str = (
+        "Instant full-text search over every Reddit post collected so far (titles, bodies and "
+        "top comments), with upvote/comment thresholds and date ranges. No network calls. "
+        "Use it to re-query subreddits that were already searched, e.g. with different "
+        "keywords or stricter engagement filters."
+    )
+    args_schema: Type[BaseModel] = RedditIndexSearchInput
+    max_results: int = 20
+
+    def _run(self, query: str, subreddits: List[str] = None, min_upvotes: int = 0, min_comments: int = 0,
+             max_age_days: Optional[int] = None, min_age_days: Optional[int] = None) -> str:
+        """Search the index and format the top posts."""
+        now = time.time()
+        subreddits = [s.strip().strip("/").removeprefix("r/") for s in subreddits or [] if s.strip()]
+        try:
+            posts = get_post_store().search(
+                query,
+                subreddits or None,
+                min_score=min_upvotes,
+                min_comments=min_comments,
+                since=now - max_age_days * 86400 if max_age_days else None,
+                until=now - min_age_days * 86400 if min_age_days else None,
+                limit=200,
+            )
+        except Exception as e:
+            return f"Error searching the local Reddit index: {str(e)}"
+
+        if not posts:
+            scope = ", ".join(f"r/{s}" for s in subreddits) or "the index"
+            return f"No indexed posts match '{query}' in {scope}. Try a live Reddit search first."
+        ranked = rank_posts(
+            [from_reddit_json(p) for p in posts], query, top_k=self.max_results,
+            min_upvotes=min_upvotes, min_comments=min_comments,
+        )
+        output = format_posts(ranked, f"🗂️ Top {len(ranked)} of {len(posts)} indexed posts matching '{query}':")
+        return fit_tool_output(self.name, output, query)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync subreddits into the local Reddit index")
+    parser.add_argument("subreddits", nargs="+", help="Subreddit names, e.g. diabetes diabetes_t2")
+    parser.add_argument("--pages", type=int, default=SYNC_MAX_PAGES, help="Max /new pages per subreddit")
+    args = parser.parse_args()
+
+    store = get_post_store()
+    for subreddit in args.subreddits:
+        start = time.perf_counter()
+        added = store.sync(subreddit.removeprefix("r/"), max_pages=args.pages)
+        print(f"r/{subreddit}: {added} new posts in {time.perf_counter() - start:.1f}s")
+    print(json.dumps(store.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Post-processing for Reddit search results before they reach the LLM.
+Normalizes posts from the JSON, RSS and Serper tools into one record type,
+deduplicates them by post ID, filters on engagement and ranks the rest by a
+local BM25 relevance + engagement score, returning a compact top-K.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+TOP_K = int(os.getenv("PRODUCT_RANK_TOP_K", "15"))
+MIN_UPVOTES = int(os.getenv("PRODUCT_RANK_MIN_UPVOTES", "5"))
+MIN_COMMENTS = int(os.getenv("PRODUCT_RANK_MIN_COMMENTS", "2"))
+# Share of the final score that comes from text relevance (rest is engagement)
+RELEVANCE_WEIGHT = float(os.getenv("PRODUCT_RANK_RELEVANCE_WEIGHT", "0.6"))
+EXCERPT_CHARS = 200
+COMMENTS_SHOWN = 2
+
+_POST_ID = re.compile(r"/comments/([a-z0-9]+)", re.IGNORECASE)
+_SUBREDDIT = re.compile(r"/r/([A-Za-z0-9_]+)", re.IGNORECASE)
+_TOKEN = re.compile(r"[a-z0-9']+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "i",
+    "in", "is", "it", "my", "of", "on", "or", "so", "that", "the", "this", "to", "was", "with", "you",
+}
+
+
+class RedditPost(BaseModel):
+    """One Reddit thread, whichever tool found it."""
+    id: str
+    subreddit: str = ""
+    title: str = ""
+    body: str = ""
+    score: Optional[int] = None
+    num_comments: Optional[int] = None
+    created_utc: Optional[float] = None
+    url: str = ""
+    sources: List[str] = []
+    # Top comment bodies (bulk ingestion only)
+    comments: List[str] = []
+
+    @property
+    def has_engagement(self) -> bool:
+        return self.score is not None and self.num_comments is not None
+
+
+def post_id_from_url(url: str) -> str:
+    """Reddit base-36 post ID from a thread URL, or the normalized URL itself."""
+    match = _POST_ID.search(url or "")
+    if match:
+        return match.group(1).lower()
+    return (url or "").split("?")[0].rstrip("/").lower()
+
+
+def from_reddit_json(post: dict) -> RedditPost:
+    url = f"https://reddit.com{post.get('permalink', '')}"
+    return RedditPost(
+        id=(post.get("id") or post_id_from_url(url)).lower(),
+        subreddit=post.get("subreddit", ""),
+        title=post.get("title", ""),
+        body=post.get("selftext", ""),
+        score=post.get("score", 0),
+        num_comments=post.get("num_comments", 0),
+        created_utc=post.get("created_utc"),
+        url=url,
+        sources=["json"],
+        comments=[comment["body"] for comment in post.get("comments", [])],
+    )
+
+
+def from_rss(entry: dict) -> RedditPost:
+    link = entry.get("link", "")
+    subreddit = _SUBREDDIT.search(link)
+    return RedditPost(
+        id=post_id_from_url(link),
+        subreddit=subreddit.group(1) if subreddit else "",
+        title=entry.get("title", ""),
+        body=entry.get("summary", ""),
+        # Set when the entry was answered from the local post index
+        score=entry.get("score"),
+        num_comments=entry.get("num_comments"),
+        url=link,
+        sources=["rss"],
+    )
+
+
+def from_serper(result: dict) -> RedditPost:
+    link = result.get("link", "")
+    subreddit = _SUBREDDIT.search(link)
+    return RedditPost(
+        id=post_id_from_url(link),
+        subreddit=subreddit.group(1) if subreddit else "",
+        title=result.get("title", ""),
+        body=result.get("snippet", ""),
+        url=link,
+        sources=["serper"],
+    )
+
+
+def dedupe(posts: Iterable[RedditPost]) -> List[RedditPost]:
+    """Merge records of the same thread, keeping engagement data and the longest text."""
+    merged = {}
+    for post in posts:
+        existing = merged.get(post.id)
+        if existing is None:
+            merged[post.id] = post.model_copy()
+            continue
+        if not existing.has_engagement and post.has_engagement:
+            existing.score, existing.num_comments = post.score, post.num_comments
+        if len(post.body) > len(existing.body):
+            existing.body = post.body
+        if len(post.comments) > len(existing.comments):
+            existing.comments = post.comments
+        existing.subreddit = existing.subreddit or post.subreddit
+        existing.created_utc = existing.created_utc or post.created_utc
+        existing.sources = sorted(set(existing.sources) | set(post.sources))
+    return list(merged.values())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of every document for the query."""
+    terms = set(tokenize(query))
+    docs = [tokenize(doc) for doc in documents]
+    if not terms or not docs:
+        return [0.0] * len(documents)
+    avg_len = sum(len(doc) for doc in docs) / len(docs) or 1.0
+    doc_freq = Counter(term for doc in docs for term in set(doc) if term in terms)
+    scores = []
+    for doc in docs:
+        counts = Counter(doc)
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def _engagement(post: RedditPost) -> float:
+    if not post.has_engagement:
+        return 0.0
+    return math.log1p(max(post.score, 0)) + math.log1p(2 * max(post.num_comments, 0))
+
+
+def rank_posts(
+    posts: Iterable[RedditPost],
+    query: str,
+    top_k: int = TOP_K,
+    min_upvotes: int = MIN_UPVOTES,
+    min_comments: int = MIN_COMMENTS,
+) -> List[Tuple[float, RedditPost]]:
+    """
+    Dedupe, drop low-engagement posts (posts without engagement data are kept)
+    and return the top_k by combined relevance + engagement score.
+    """
+    posts = dedupe(posts)
+    engaged = [
+        p for p in posts
+        if not p.has_engagement or (p.score >= min_upvotes and p.num_comments >= min_comments)
+    ]
+    # Never return nothing just because a niche subreddit is quiet
+    candidates = engaged or posts
+    if not candidates:
+        return []
+
+    relevance = bm25_scores(query, [f"{p.title} {p.title} {p.body} {' '.join(p.comments)}" for p in candidates])
+    engagement = [_engagement(p) for p in candidates]
+    max_rel = max(relevance) or 1.0
+    max_eng = max(engagement) or 1.0
+    ranked = [
+        (RELEVANCE_WEIGHT * rel / max_rel + (1 - RELEVANCE_WEIGHT) * eng / max_eng, post)
+        for rel, eng, post in zip(relevance, engagement, candidates)
+    ]
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return ranked[:top_k]
+
+
+def format_posts(ranked: List[Tuple[float, RedditPost]], header: str) -> str:
+    """Compact, one-entry-per-post rendering for the agent's context."""
+    output = f"{header}\n\n"
+    for i, (_, post) in enumerate(ranked, 1):
+        tags = [f"r/{post.subreddit}"] if post.subreddit else []
+        if post.has_engagement:
+            tags.append(f"{post.score}↑ {post.num_comments}💬")
+        output += f"{i}. [{' '.join(tags)}] {post.title}\n"
+        excerpt = " ".join(post.body.split())[:EXCERPT_CHARS]
+        if len(excerpt) > 40:
+            output += f"   {excerpt}...\n"
+        for comment in post.comments[:COMMENTS_SHOWN]:
+            output += f"   💬 \"{' '.join(comment.split())[:EXCERPT_CHARS]}\"\n"
+        output += f"   {post.url}\n"
+    return output
@@ -0,0 +1,180 @@
+"""
+Per-host rate limiting for the search tools.
+A token bucket per host is shared by every tool instance and thread, and is
+slowed down by Retry-After / x-ratelimit-* headers sent back by the server.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# (requests per second, burst) per host; override with PRODUCT_RATE_LIMIT_<HOST>="rate/burst",
+# where <HOST> is upper-cased with dots and dashes as underscores (e.g. WWW_REDDIT_COM)
+DEFAULT_LIMITS = {
+    "www.reddit.com": (1.0, 5),
+    "oauth.reddit.com": (1.0, 5),
+    "google.serper.dev": (5.0, 10),
+}
+FALLBACK_LIMIT = (5.0, 10)
+
+
+class RateLimitError(Exception):
+    """Raised when a host keeps answering 429 after all retries."""
+
+    def __init__(self, host: str, retry_after: float):
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(
+            f"Rate limited by {host}; retries exhausted. "
+            f"Wait ~{retry_after:.0f}s before querying it again."
+        )
+
+
+class TokenBucket:
+    """Thread-safe token bucket that can also be paused by the server."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds waited."""
+        start = time.monotonic()
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self.blocked_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+                    self._cond.wait(delay)
+            finally:
+                self.waiting -= 1
+            waited = time.monotonic() - start
+            self.acquired += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def pause(self, seconds: float, throttled: bool = False) -> None:
+        """Stop handing out tokens for `seconds` (server asked us to back off)."""
+        with self._cond:
+            if throttled:
+                self.throttled += 1
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+            self._cond.notify_all()
+
+    def observe(self, headers) -> None:
+        """Respect x-ratelimit-remaining / x-ratelimit-reset (Reddit style)."""
+        remaining = _to_float(headers.get("x-ratelimit-remaining"))
+        reset = _to_float(headers.get("x-ratelimit-reset"))
+        if remaining is not None and reset is not None and remaining < 1:
+            self.pause(reset)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "queue_depth": self.waiting,
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "avg_wait_s": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+                "max_wait_s": round(self.max_wait, 4),
+            }
+
+
+class RateLimiter:
+    """Registry of one token bucket per host."""
+
+    def __init__(self, limits: Optional[dict] = None):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self._limit_for(host)
+                self._buckets[host] = TokenBucket(rate, burst)
+            return self._buckets[host]
+
+    def _limit_for(self, host: str) -> tuple:
+        env_name = "PRODUCT_RATE_LIMIT_" + host.upper().replace(".", "_").replace("-", "_")
+        override = os.getenv(env_name)
+        if override:
+            rate, _, burst = override.partition("/")
+            try:
+                rate, burst = float(rate), int(burst or 1)
+            except ValueError:
+                raise ValueError(f"{env_name}={override!r}: expected 'rate/burst', e.g. '0.5/3'") from None
+            if rate <= 0 or burst < 1:
+                raise ValueError(f"{env_name}={override!r}: rate must be > 0 and burst at least 1")
+            return rate, burst
+        return self.limits.get(host, FALLBACK_LIMIT)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: bucket.metrics() for host, bucket in buckets.items()}
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Parse Retry-After (seconds or HTTP date) or x-ratelimit-reset."""
+    value = headers.get("Retry-After")
+    if value:
+        seconds = _to_float(value)
+        if seconds is not None:
+            return max(seconds, 0.0)
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+    return _to_float(headers.get("x-ratelimit-reset"))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter: base * 2^attempt, scaled by 50-100%."""
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by all tools."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,221 @@
+"""
+Bulk Reddit ingestion for deep pain mining.
+Follows `after` cursors through several pages of search results per
+subreddit, keyword and time window, then reads the comment trees of the most
+discussed threads. Responses are parsed as they stream in and every post is
+reduced to a compact record (truncated text, top comments only) as soon as it
+is read, so thousands of posts fit in bounded memory.
+"""
+
+import contextvars
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from product.budget import fit_tool_output
+from product.tools import http_client
+from product.tools.cache import get_tool_cache, normalize_key
+from product.tools.json_stream import iter_values
+from product.tools.post_store import store_posts
+from product.tools.ranking import format_posts, from_reddit_json, rank_posts
+from product.tools.reddit_tool import REDDIT_BASE_URL, _clean_subreddit, fetch_search_page
+
+MAX_POSTS = int(os.getenv("PRODUCT_INGEST_MAX_POSTS", "2000"))
+MAX_PAGES = int(os.getenv("PRODUCT_INGEST_MAX_PAGES", "5"))
+TIME_WINDOWS = ("month", "year")
+TEXT_CHARS = 800
+# Comment trees are fetched for the most discussed posts only
+COMMENT_POSTS = int(os.getenv("PRODUCT_INGEST_COMMENT_POSTS", "20"))
+COMMENT_MIN_COMMENTS = int(os.getenv("PRODUCT_INGEST_COMMENT_MIN_COMMENTS", "10"))
+COMMENTS_PER_POST = 5
+COMMENT_CHARS = 400
+COMMENT_DEPTH = 3
+_SKIPPED_BODIES = {"[deleted]", "[removed]", ""}
+
+
+def _search_page(query: str, subreddit: str, window: str, after: Optional[str]) -> dict:
+    """One page of a cursor chain as {"posts", "after"}, cached like single searches."""
+
+    def fetch():
+        posts, next_after = fetch_search_page(
+            query, subreddit, limit=100, window=window, after=after, text_chars=TEXT_CHARS
+        )
+        return {"posts": posts, "after": next_after}
+
+    key = normalize_key(f"reddit_ingest/{window}/{after or ''}", query, subreddit, 100)
+    return get_tool_cache().get_or_fetch("reddit_json", key, fetch)
+
+
+def _flatten_comments(comment: dict, depth: int = 0):
+    """Yield (score, body) for a comment and its replies down to COMMENT_DEPTH."""
+    if comment.get("kind") != "t1":
+        return
+    data = comment.get("data", {})
+    body = (data.get("body") or "").strip()
+    if body not in _SKIPPED_BODIES:
+        yield data.get("score", 0), body[:COMMENT_CHARS]
+    replies = data.get("replies")
+    if depth + 1 < COMMENT_DEPTH and isinstance(replies, dict):
+        for reply in replies.get("data", {}).get("children", []):
+            yield from _flatten_comments(reply, depth + 1)
+
+
+def fetch_comments(subreddit: str, post_id: str, top_n: int = COMMENTS_PER_POST) -> List[dict]:
+    """The `top_n` highest-scored comments of a thread (replies included), cached."""
+
+    def fetch():
+        url = f"{REDDIT_BASE_URL}/r/{subreddit}/comments/{post_id}.json"
+        params = {"sort": "top", "limit": 100, "depth": COMMENT_DEPTH}
+        response = http_client.get(url, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            # The response is [post listing, comment listing]; keep a running top-N
+            # instead of the tree
+            best: List[Tuple[int, int, str]] = []
+            for _, child in iter_values(http_client.stream_chunks(response), ("item.data.children.item",)):
+                for score, body in _flatten_comments(child):
+                    entry = (score, -len(best), body)
+                    if len(best) < top_n:
+                        heapq.heappush(best, entry)
+                    else:
+                        heapq.heappushpop(best, entry)
+            return [{"score": score, "body": body} for score, _, body in sorted(best, reverse=True)]
+        finally:
+            response.close()
+
+    return get_tool_cache().get_or_fetch(
+        "reddit_comments", normalize_key("reddit_comments", post_id, subreddit, top_n), fetch
+    )
+
+
+def ingest(
+    subreddits: List[str],
+    queries: List[str],
+    windows: Tuple[str, ...] = TIME_WINDOWS,
+    max_pages: int = MAX_PAGES,
+    max_posts: int = MAX_POSTS,
+    comment_posts: int = COMMENT_POSTS,
+    max_workers: int = 8,
+) -> Tuple[List[dict], dict]:
+    """
+    Compact post records (deduplicated by ID, with a "comments" list on the
+    most discussed ones) and ingestion stats. Each subreddit/query/window
+    combination follows its own cursor chain; all chains stop once
+    `max_posts` distinct posts are collected.
+    """
+    posts: Dict[str, dict] = {}
+    stats = {"searches": 0, "pages": 0, "comment_threads": 0, "errors": []}
+    lock = threading.Lock()
+
+    def follow(subreddit: str, query: str, window: str) -> None:
+        after = None
+        for _ in range(max_pages):
+            with lock:
+                if len(posts) >= max_posts:
+                    return
+            page = _search_page(query, subreddit, window, after)
+            with lock:
+                stats["pages"] += 1
+                for post in page["posts"]:
+                    if len(posts) < max_posts:
+                        posts.setdefault(post["id"], post)
+            after = page["after"]
+            if not after:
+                return
+
+    chains = [(sub, query, window) for sub in subreddits for query in queries for window in windows]
+    stats["searches"] = len(chains)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Copied contexts keep the run's trace and log routing in the workers
+        futures = {pool.submit(contextvars.copy_context().run, follow, *chain): chain for chain in chains}
+        for future in as_completed(futures):
+            sub, query, window = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                stats["errors"].append(f"r/{sub} '{query}' ({window}): {e}")
+
+        discussed = sorted(
+            (post for post in posts.values() if post["num_comments"] >= COMMENT_MIN_COMMENTS),
+            key=lambda post: post["num_comments"],
+            reverse=True,
+        )[:comment_posts]
+        futures = {
+            pool.submit(contextvars.copy_context().run, fetch_comments, post["subreddit"], post["id"]): post
+            for post in discussed
+        }
+        for future in as_completed(futures):
+            post = futures[future]
+            try:
+                post["comments"] = future.result()
+                stats["comment_threads"] += 1
+            except Exception as e:
+                stats["errors"].append(f"comments of {post['id']}: {e}")
+
+    # Compact records (with comments) feed the local index as well
+    store_posts(posts.values())
+    return list(posts.values()), stats
+
+
+class RedditIngestInput(BaseModel):
+    """Input schema for bulk Reddit ingestion."""
+    subreddits: List[str] = Field(..., description="Subreddit names to mine, e.g. ['diabetes', 'diabetes_t2']")
+    keywords: List[str] = Field(..., description="Search queries to run in every subreddit")
+    time_windows: List[str] = Field(
+        default=list(TIME_WINDOWS),
+        description="Reddit time filters to page through: any of 'week', 'month', 'year', 'all'",
+    )
+    include_comments: bool = Field(default=True, description="Read the top comments of the most discussed threads")
+
+
+class RedditIngestTool(BaseTool):
+    name: str = "Reddit Bulk Ingest"
+    description: str = (
+        "Deep Reddit mining: pages through search results for SEVERAL subreddits and keywords "
+        "over longer time windows (hundreds to thousands of posts) and reads the top comments of "
+        "the most discussed threads. Returns the most relevant posts with quoted comments. "
+        "Slower than 'Reddit Multi-Subreddit Search'; use it when that returns too little "
+        "evidence or you need real user quotes from comments."
+    )
+    args_schema: Type[BaseModel] = RedditIngestInput
+    max_results: int = 25
+
+    def _run(self, subreddits: List[str], keywords: List[str], time_windows: List[str] = None,
+             include_comments: bool = True) -> str:
+        """Ingest, rank and format the top posts."""
+        subreddits = list(dict.fromkeys(_clean_subreddit(s) for s in subreddits if s.strip()))
+        keywords = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))
+        windows = tuple(w for w in (time_windows or TIME_WINDOWS) if w in ("hour", "day", "week", "month", "year", "all"))
+        if not subreddits or not keywords:
+            return "Error: provide at least one subreddit and one keyword."
+
+        try:
+            posts, stats = ingest(
+                subreddits, keywords, windows or TIME_WINDOWS,
+                comment_posts=COMMENT_POSTS if include_comments else 0,
+            )
+        except Exception as e:
+            return f"Error with Reddit bulk ingest: {str(e)}"
+
+        if not posts:
+            message = f"No posts found across {len(subreddits)} subreddits for {len(keywords)} keywords"
+            if stats["errors"]:
+                message += "\nErrors:\n" + "\n".join(stats["errors"][:10])
+            return message
+
+        query = " ".join(keywords)
+        ranked = rank_posts([from_reddit_json(p) for p in posts], query, top_k=self.max_results)
+        output = format_posts(
+            ranked,
+            f"📚 Top {len(ranked)} of {len(posts)} posts ingested from {stats['pages']} pages "
+            f"({stats['searches']} searches, {stats['comment_threads']} comment threads read) "
+            f"across {', '.join('r/' + s for s in subreddits)}:",
+        )
+        if stats["errors"]:
+            output += f"\n⚠️ {len(stats['errors'])} searches failed (e.g. {stats['errors'][0]})"
+        return fit_tool_output(self.name, output, query)
@@ -1,11 +1,32 @@
 from crewai.tools import BaseTool
-from typing import Type
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
+from typing import List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
-import requests
-import feedparser
 import os
 import time
-import re
+from urllib.parse import urlsplit
+
+from product import telemetry
+from product.budget import fit_tool_output
+from product.tools import http_client
+from product.tools.cache import get_tool_cache, normalize_key
+from product.tools.feeds import parse_feed
+from product.tools.json_stream import iter_values
+from product.tools.post_store import indexed_posts, store_posts
+from product.tools.ranking import (
+    TOP_K,
+    format_posts,
+    from_reddit_json,
+    from_rss,
+    from_serper,
+    post_id_from_url,
+    rank_posts,
+)
+
+# Overridable so the offline benchmark can point the tools at its stub server
+REDDIT_BASE_URL = os.getenv("PRODUCT_REDDIT_BASE_URL", "https://www.reddit.com").rstrip("/")
+SERPER_SEARCH_URL = os.getenv("PRODUCT_SERPER_SEARCH_URL", "https://google.serper.dev/search")
 
 
 class RedditSearchInput(BaseModel):
@@ -27,48 +48,107 @@ class RedditJSONTool(BaseTool):
     def _run(self, query: str, subreddit: str = "cscareerquestions", limit: int = 20) -> str:
         """Search Reddit using public JSON endpoint."""
         try:
-            url = f"https://www.reddit.com/r/{subreddit}/search.json"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) ProductDiscovery/1.0"
-            }
-            params = {
-                "q": query,
-                "limit": min(limit, 50),
-                "sort": "relevance",
-                "t": "month",
-                "restrict_sr": "1"
-            }
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            posts = data.get("data", {}).get("children", [])
+            posts = self.search(query, subreddit, limit)
             
             if not posts:
                 return f"No results found for '{query}' in r/{subreddit}"
             
-            output = f"📊 Found {len(posts)} Reddit posts for '{query}' in r/{subreddit}:\n\n"
-            
-            for i, post_data in enumerate(posts[:limit], 1):
-                post = post_data["data"]
-                
-                title = post.get("title", "")
-                body = post.get("selftext", "")[:350]
-                score = post.get("score", 0)
-                num_comments = post.get("num_comments", 0)
-                url = f"https://reddit.com{post.get('permalink', '')}"
-                
-                output += f"{i}. [{score}↑ {num_comments}💬] {title}\n"
-                if body and len(body) > 50:
-                    output += f"   Excerpt: {body}...\n"
-                output += f"   Link: {url}\n\n"
-            
-            return output
+            ranked = rank_posts([from_reddit_json(p) for p in posts], query, top_k=min(limit, TOP_K))
+            output = format_posts(
+                ranked,
+                f"📊 Top {len(ranked)} of {len(posts)} Reddit posts for '{query}' in r/{subreddit} (by relevance + engagement):",
+            )
+            return fit_tool_output(self.name, output, query)
             
         except Exception as e:
             return f"Error with Reddit JSON API: {str(e)}"
 
+    def search(self, query: str, subreddit: str, limit: int) -> list:
+        """
+        Return compact post dicts: from the local index for synced subreddits,
+        otherwise from the shared cache or a live search (stored in the index).
+        """
+        # Same window as the live search below
+        indexed = indexed_posts(query, subreddit, limit, window="month")
+        telemetry.record_cache("post_index", hit=indexed is not None)
+        if indexed is not None:
+            return indexed
+        return get_tool_cache().get_or_fetch(
+            "reddit_json",
+            normalize_key("reddit_json", query, subreddit, limit),
+            lambda: self._fetch(query, subreddit, limit),
+        )
+
+    def _fetch(self, query: str, subreddit: str, limit: int) -> list:
+        """Fetch one page of search results as compact post dicts."""
+        posts, _ = fetch_search_page(query, subreddit, limit=min(limit, 50), window="month")
+        store_posts(posts)
+        return posts
+
+
+def compact_post(post: dict, subreddit: str = "", text_chars: int = 2000) -> dict:
+    """The fields the tools use from a Reddit `t3` listing child."""
+    return {
+        "id": post.get("id", ""),
+        "subreddit": post.get("subreddit", subreddit),
+        "title": post.get("title", ""),
+        "selftext": (post.get("selftext") or "")[:text_chars],
+        "score": post.get("score", 0),
+        "num_comments": post.get("num_comments", 0),
+        "created_utc": post.get("created_utc", 0),
+        "permalink": post.get("permalink", ""),
+    }
+
+
+def fetch_search_page(query: str, subreddit: str, limit: int = 100, window: str = "month",
+                      after: Optional[str] = None, text_chars: int = 2000) -> Tuple[list, Optional[str]]:
+    """One page of subreddit search results (see fetch_listing)."""
+    params = {
+        "q": query,
+        "limit": min(limit, 100),
+        "sort": "relevance",
+        "t": window,
+        "restrict_sr": "1"
+    }
+    return fetch_listing(f"/r/{subreddit}/search.json", params, after=after, text_chars=text_chars)
+
+
+def fetch_listing(path: str, params: dict, after: Optional[str] = None,
+                  text_chars: int = 2000) -> Tuple[list, Optional[str]]:
+    """
+    One page of a Reddit listing as compact post dicts, plus the `after`
+    cursor of the next page (None on the last page). The listing is parsed
+    as it streams in, one post at a time.
+    """
+    params = dict(params, after=after) if after else params
+    subreddit = path.split("/")[2] if path.startswith("/r/") else ""
+    response = http_client.get(f"{REDDIT_BASE_URL}{path}", params=params, stream=True)
+    try:
+        response.raise_for_status()
+        posts, next_after = [], None
+        for value_path, value in iter_values(http_client.stream_chunks(response), ("data.children.item", "data.after")):
+            if value_path == "data.after":
+                next_after = value
+            elif value.get("kind") == "t3":
+                posts.append(compact_post(value.get("data", {}), subreddit, text_chars))
+        return posts, next_after
+    finally:
+        response.close()
+
+
+def _index_feed_entries(subreddit: str, entries: list) -> None:
+    """Add feed entries to the local post index (fresh downloads and revalidated copies alike)."""
+    store_posts(
+        {
+            "id": post_id_from_url(e["link"]),
+            "subreddit": subreddit,
+            "title": e["title"],
+            "selftext": e["summary"],
+            "permalink": urlsplit(e["link"]).path,
+        }
+        for e in entries
+    )
+
 
 class RedditRSSTool(BaseTool):
     name: str = "Reddit RSS Feed Search"
@@ -82,32 +162,166 @@ class RedditRSSTool(BaseTool):
     def _run(self, query: str, subreddit: str = "cscareerquestions", limit: int = 20) -> str:
         """Search Reddit using RSS feeds."""
         try:
-            url = f"https://www.reddit.com/r/{subreddit}/search.rss?q={query}&restrict_sr=1&limit={limit}"
+            entries = self.search(query, subreddit, limit)
             
-            feed = feedparser.parse(url)
-            
-            if not feed.entries:
+            if not entries:
                 return f"No RSS results found for '{query}' in r/{subreddit}"
             
-            output = f"📡 Found {len(feed.entries)} posts via RSS for '{query}' in r/{subreddit}:\n\n"
-            
-            for i, entry in enumerate(feed.entries[:limit], 1):
-                title = entry.get("title", "")
-                summary = entry.get("summary", "")[:300]
-                link = entry.get("link", "")
-                
-                output += f"{i}. {title}\n"
-                if summary:
-                    # Clean HTML tags from summary
-                    clean_summary = re.sub(r'<[^>]+>', '', summary)
-                    output += f"   Summary: {clean_summary[:250]}...\n"
-                output += f"   Link: {link}\n\n"
-            
-            return output
+            ranked = rank_posts([from_rss(e) for e in entries], query, top_k=min(limit, TOP_K))
+            output = format_posts(
+                ranked,
+                f"📡 Top {len(ranked)} of {len(entries)} posts via RSS for '{query}' in r/{subreddit}:",
+            )
+            return fit_tool_output(self.name, output, query)
             
         except Exception as e:
             return f"Error with Reddit RSS: {str(e)}"
 
+    def search(self, query: str, subreddit: str, limit: int) -> list:
+        """
+        Return compact entry dicts: from the local index for synced subreddits
+        (with engagement data), otherwise from the shared cache or the live feed.
+        """
+        # The search feed is not time-limited, so only a fully synced subreddit can answer it
+        indexed = indexed_posts(query, subreddit, limit, window="all")
+        telemetry.record_cache("post_index", hit=indexed is not None)
+        if indexed is not None:
+            return [
+                {
+                    "title": post["title"],
+                    "summary": post["selftext"][:300],
+                    "link": f"https://www.reddit.com{post['permalink']}",
+                    "score": post["score"],
+                    "num_comments": post["num_comments"],
+                }
+                for post in indexed
+            ]
+        return get_tool_cache().get_or_fetch(
+            "reddit_rss",
+            normalize_key("reddit_rss", query, subreddit, limit),
+            lambda: self._fetch(query, subreddit, limit),
+        )
+
+    def _fetch(self, query: str, subreddit: str, limit: int) -> list:
+        """
+        Fetch the search feed as compact entry dicts. The last copy of each
+        feed is kept with its ETag/Last-Modified validators, so an unchanged
+        feed costs a 304 instead of a download and a parse.
+        """
+        url = f"{REDDIT_BASE_URL}/r/{subreddit}/search.rss"
+        params = {"q": query, "restrict_sr": "1", "limit": limit}
+        cache = get_tool_cache()
+        key = normalize_key("reddit_rss_feed", query, subreddit, limit)
+        # Validators only: not a cache hit unless the server answers 304 (counted in telemetry below)
+        stored = cache.get("reddit_rss_feed", key, count=False)
+
+        headers = {}
+        if stored and stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored and stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+        response = http_client.get(url, params=params, headers=headers, stream=True)
+        try:
+            if response.status_code == 304 and stored:
+                telemetry.record_cache("reddit_rss_feed", hit=True)
+                cache.set("reddit_rss_feed", key, stored)
+                _index_feed_entries(subreddit, stored["entries"])
+                return stored["entries"]
+            response.raise_for_status()
+            # Stops reading the body once `limit` entries are parsed
+            entries = parse_feed(http_client.stream_chunks(response), limit)
+        finally:
+            response.close()
+
+        telemetry.record_cache("reddit_rss_feed", hit=False)
+        cache.set("reddit_rss_feed", key, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "entries": entries,
+        })
+        _index_feed_entries(subreddit, entries)
+        return entries
+
+
+class RedditFanoutInput(BaseModel):
+    """Input schema for multi-subreddit search."""
+    subreddits: List[str] = Field(..., description="Subreddit names to search, e.g. ['Tinder', 'dating_advice']")
+    keywords: List[str] = Field(..., description="Search queries to run in every subreddit")
+    limit: int = Field(default=10, description="Posts per subreddit/keyword search (max 50)")
+    sources: List[str] = Field(
+        default=["json"],
+        description="Where to search: any of 'json' (Reddit API, has upvotes/comments), 'rss', 'serper' (Google)",
+    )
+
+
+class RedditFanoutTool(BaseTool):
+    name: str = "Reddit Multi-Subreddit Search"
+    description: str = (
+        "Search SEVERAL subreddits for SEVERAL keywords in one call. "
+        "Runs every subreddit/keyword combination in parallel, removes duplicate posts "
+        "(also across sources) and returns one consolidated list ranked by relevance and engagement. "
+        "Prefer this over calling a single-subreddit tool once per subreddit."
+    )
+    args_schema: Type[BaseModel] = RedditFanoutInput
+    max_workers: int = 8
+    max_searches: int = 40
+    max_results: int = 25
+
+    def _run(self, subreddits: List[str], keywords: List[str], limit: int = 10, sources: List[str] = None) -> str:
+        """Run the subreddit x keyword (x source) cross product concurrently and merge results."""
+        subreddits = list(dict.fromkeys(_clean_subreddit(s) for s in subreddits if s.strip()))
+        keywords = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))
+        if not subreddits or not keywords:
+            return "Error: provide at least one subreddit and one keyword."
+        
+        searchers = {
+            "json": (RedditJSONTool().search, from_reddit_json),
+            "rss": (RedditRSSTool().search, from_rss),
+            "serper": (SerperRedditTool().search, from_serper),
+        }
+        sources = [src for src in dict.fromkeys(sources or ["json"]) if src in searchers] or ["json"]
+        searches = [(src, sub, kw) for src in sources for sub in subreddits for kw in keywords][:self.max_searches]
+        posts = []
+        errors = []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(searches))) as pool:
+            # Each search runs in a copy of the caller's context so its HTTP spans join the run's trace
+            futures = {
+                pool.submit(contextvars.copy_context().run, searchers[src][0], kw, sub, limit): (src, sub, kw)
+                for src, sub, kw in searches
+            }
+            for future in as_completed(futures):
+                src, sub, kw = futures[future]
+                try:
+                    posts.extend(searchers[src][1](item) for item in future.result())
+                except Exception as e:
+                    errors.append(f"{src} r/{sub} '{kw}': {e}")
+        
+        if not posts:
+            message = f"No results found across {len(subreddits)} subreddits for {len(keywords)} keywords"
+            if errors:
+                message += "\nErrors:\n" + "\n".join(errors)
+            return message
+        
+        ranked = rank_posts(posts, " ".join(keywords), top_k=self.max_results)
+        output = format_posts(
+            ranked,
+            f"📊 Top {len(ranked)} posts from {len(searches)} searches "
+            f"across {', '.join('r/' + s for s in subreddits)} (deduplicated, by relevance + engagement):",
+        )
+        
+        if errors:
+            output += f"\n⚠️ {len(errors)} searches failed:\n" + "\n".join(errors) + "\n"
+        
+        return fit_tool_output(self.name, output, " ".join(keywords))
+
+
+def _clean_subreddit(name: str) -> str:
+    name = name.strip().strip("/")
+    if name.lower().startswith("r/"):
+        name = name[2:]
+    return name
+
 
 class SerperRedditTool(BaseTool):
     name: str = "Google Search for Reddit Discussions"
@@ -125,43 +339,59 @@ class SerperRedditTool(BaseTool):
             if not api_key:
                 return "Error: SERPER_API_KEY not found in .env file. Please add it to use this tool."
             
-            # Construct search query
-            if subreddit == "all":
-                search_query = f"site:reddit.com {query}"
-            else:
-                search_query = f"site:reddit.com/r/{subreddit} {query}"
-            
-            url = "https://google.serper.dev/search"
-            headers = {
-                "X-API-KEY": api_key,
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "q": search_query,
-                "num": min(limit, 50)
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            organic_results = data.get("organic", [])
+            organic_results = self.search(query, subreddit, limit)
             
             if not organic_results:
                 return f"No Google results found for '{query}' on Reddit"
             
-            output = f"🔎 Found {len(organic_results)} Reddit discussions via Google:\n\n"
-            
-            for i, result in enumerate(organic_results[:limit], 1):
-                title = result.get("title", "")
-                snippet = result.get("snippet", "")
-                link = result.get("link", "")
-                
-                output += f"{i}. {title}\n"
-                output += f"   Preview: {snippet}\n"
-                output += f"   Link: {link}\n\n"
-            
-            return output
+            ranked = rank_posts([from_serper(r) for r in organic_results], query, top_k=min(limit, TOP_K))
+            output = format_posts(
+                ranked,
+                f"🔎 Top {len(ranked)} of {len(organic_results)} Reddit discussions via Google:",
+            )
+            return fit_tool_output(self.name, output, query)
             
         except Exception as e:
             return f"Error with Serper API: {str(e)}"
+
+    def search(self, query: str, subreddit: str, limit: int) -> list:
+        """Return organic results, served from the shared cache when fresh."""
+        api_key = os.getenv("SERPER_API_KEY")
+        if not api_key:
+            raise RuntimeError("SERPER_API_KEY not set")
+        return get_tool_cache().get_or_fetch(
+            "serper",
+            normalize_key("serper_reddit", query, subreddit, limit),
+            lambda: self._fetch(api_key, query, subreddit, limit),
+        )
+
+    def _fetch(self, api_key: str, query: str, subreddit: str, limit: int) -> list:
+        """Run the Google search and keep only the organic results."""
+        # Construct search query
+        if subreddit == "all":
+            search_query = f"site:reddit.com {query}"
+        else:
+            search_query = f"site:reddit.com/r/{subreddit} {query}"
+        
+        url = SERPER_SEARCH_URL
+        headers = {
+            "X-API-KEY": api_key,
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "q": search_query,
+            "num": min(limit, 50)
+        }
+        
+        response = http_client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        
+        return [
+            {
+                "title": result.get("title", ""),
+                "snippet": result.get("snippet", ""),
+                "link": result.get("link", ""),
+            }
+            for result in data.get("organic", [])
+        ]
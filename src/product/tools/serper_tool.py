@@ -1,14 +1,60 @@
 """
 Serper API Tools for Market Research
 Uses Serper.dev API for web search (2,500 free searches/month)
+
+The tool is created lazily on first use so importing this module stays cheap.
+Identical searches issued at the same time (e.g. by the market landscape and
+sizing agents, or by parallel sessions) share one request.
 """
 
-from crewai_tools import SerperDevTool
+import json
+import os
+import threading
+
+# Endpoint root the tool posts /search to (the offline benchmark points it at its stub server)
+SERPER_BASE_URL = os.getenv("PRODUCT_SERPER_BASE_URL")
+
+_serper_search = None
+_lock = threading.Lock()
+
+
+def _coalesced_tool_class():
+    from crewai_tools import SerperDevTool
+
+    from product.tools.cache import get_tool_cache, normalize_key
+
+    class CoalescedSerperDevTool(SerperDevTool):
+        """SerperDevTool whose concurrent identical searches share one in-flight request."""
+
+        def _run(self, **kwargs):
+            query = kwargs.get("search_query") or kwargs.get("query") or ""
+            options = {k: v for k, v in kwargs.items() if k not in ("search_query", "query")}
+            tool = f"serper_web/{getattr(self, 'search_type', 'search')}/{json.dumps(options, sort_keys=True, default=str)}"
+            key = normalize_key(tool, query, "", getattr(self, "n_results", 0))
+            parent_run = super()._run
+            return get_tool_cache().coalesce("serper_web", key, lambda: parent_run(**kwargs))
+
+    return CoalescedSerperDevTool
+
+
+def get_serper_search():
+    """General web search tool for any agent (shared instance, built on first call)."""
+    global _serper_search
+    if _serper_search is None:
+        with _lock:
+            if _serper_search is None:
+                tool_class = _coalesced_tool_class()
+                _serper_search = tool_class(base_url=SERPER_BASE_URL) if SERPER_BASE_URL else tool_class()
+    return _serper_search
+
 
-# General web search tool for any agent
-serper_search = SerperDevTool()
+def __getattr__(name):
+    # Keeps `from product.tools.serper_tool import serper_search` working
+    if name == "serper_search":
+        return get_serper_search()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # You can use this in agents like:
-# from product.tools.serper_tool import serper_search
+# from product.tools.serper_tool import get_serper_search
 # 
-# Agent(tools=[serper_search], ...)
+# Agent(tools=[get_serper_search()], ...)
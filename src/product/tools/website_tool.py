@@ -0,0 +1,407 @@
+"""
+Website search backed by a persistent page store and embedding index.
+Replaces crewai_tools' WebsiteSearchTool, which re-fetches, re-chunks and
+re-embeds every page on every run. Pages are re-validated with ETag /
+Last-Modified, and chunks are embedded once per content hash. Search queries
+are embedded once too, in a table of their own.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from html.parser import HTMLParser
+from typing import List, Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from product.budget import fit_tool_output
+from product.tools import http_client
+from product.tools.cache import cache_dir
+
+EMBEDDING_MODEL = os.getenv("PRODUCT_EMBEDDING_MODEL", "text-embedding-3-small")
+# Any OpenAI-compatible embeddings endpoint (defaults to OPENAI_BASE_URL / api.openai.com)
+EMBEDDING_BASE_URL = os.getenv("PRODUCT_EMBEDDING_BASE_URL")
+# Pages fetched more recently than this are used without re-validation
+RECHECK_SECONDS = float(os.getenv("PRODUCT_PAGE_RECHECK_SECONDS", str(6 * 60 * 60)))
+MAX_PAGE_AGE_SECONDS = float(os.getenv("PRODUCT_PAGE_MAX_AGE_DAYS", "30")) * 24 * 60 * 60
+MAX_STORE_BYTES = int(float(os.getenv("PRODUCT_PAGE_STORE_MAX_MB", "256")) * 1024 * 1024)
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MAX_QUERIES = 10_000
+CHUNK_CHARS = 1200
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, one block per paragraph-like element."""
+
+    SKIP = {"script", "style", "noscript", "svg", "head", "template"}
+    BLOCKS = {"p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "br", "td"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS) -> List[str]:
+    """Split on line boundaries into chunks of roughly `size` characters."""
+    chunks, current = [], ""
+    for line in text.splitlines():
+        if current and len(current) + len(line) + 1 > size:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+        while len(current) > size:
+            chunks.append(current[:size])
+            current = current[size:]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _cosine(a: array, b: array) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def similarities(query: array, blobs: List[bytes]) -> List[float]:
+    """Cosine similarity of `query` to each stored float32 vector."""
+    try:
+        import numpy as np
+    except ImportError:
+        # numpy is optional; the pure-Python scan gives the same scores, slower
+        vectors = []
+        for blob in blobs:
+            vector = array("f")
+            vector.frombytes(blob)
+            vectors.append(vector)
+        return [_cosine(query, vector) for vector in vectors]
+    matrix = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), -1)
+    target = np.frombuffer(query.tobytes(), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(target)
+    dots = matrix @ target
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0).tolist()
+
+
+def decode_page(response, body: bytes) -> str:
+    """
+    Page text in the charset the server declared, else UTF-8, else the detected
+    encoding (requests falls back to ISO-8859-1 for text/* without a charset).
+    """
+    if "charset=" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return body.decode(response.encoding, "replace")
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.reason == "unexpected end of data":
+            # A multi-byte character cut off by MAX_PAGE_BYTES
+            return body[:e.start].decode("utf-8")
+        return body.decode(response.apparent_encoding or "utf-8", "replace")
+
+
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def openai_embed(texts: List[str]) -> List[List[float]]:
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                # One client (and connection pool) for every embedding request
+                _openai_client = OpenAI(base_url=EMBEDDING_BASE_URL)
+    response = _openai_client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return [item.embedding for item in response.data]
+
+
+class PageStore:
+    """SQLite store of fetched pages, embedded chunks and embedded search queries."""
+
+    def __init__(self, path, embed=openai_embed):
+        self.embed = embed
+        self.embedded = 0
+        self.reused = 0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS page_chunks (
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                PRIMARY KEY (url, position)
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                chunk_hash TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS queries (
+                query_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (query_hash, model)
+            );
+            CREATE INDEX IF NOT EXISTS idx_page_chunks_hash ON page_chunks(chunk_hash);
+            """
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def search(self, url: str, query: str, top_k: int = 5) -> List[str]:
+        """Most relevant chunks of `url` for `query` (fetching/embedding only what changed)."""
+        self.refresh(url)
+        rows = self._query(
+            "SELECT c.text, c.embedding FROM page_chunks p JOIN chunks c ON c.chunk_hash = p.chunk_hash "
+            "WHERE p.url = ? ORDER BY p.position",
+            (url,),
+        )
+        if not rows:
+            return []
+        scores = similarities(self._query_embedding(query), [blob for _, blob in rows])
+        scored = sorted(zip(scores, (text for text, _ in rows)), key=lambda item: item[0], reverse=True)
+        return [text for _, text in scored[:top_k]]
+
+    def refresh(self, url: str) -> None:
+        """Fetch `url` unless recently checked; re-index only when its content changed."""
+        now = time.time()
+        rows = self._query(
+            "SELECT etag, last_modified, content_hash, checked_at FROM pages WHERE url = ?", (url,)
+        )
+        page = rows[0] if rows else None
+        if page and now - page[3] < RECHECK_SECONDS:
+            return
+
+        headers = {}
+        if page and page[0]:
+            headers["If-None-Match"] = page[0]
+        if page and page[1]:
+            headers["If-Modified-Since"] = page[1]
+        response = http_client.get(url, headers=headers, timeout=15)
+        if response.status_code == 304 and page:
+            self._touch(url, page[0], page[1], page[2], now)
+            return
+        response.raise_for_status()
+
+        text = html_to_text(decode_page(response, response.content[:MAX_PAGE_BYTES]))
+        content_hash = _sha(text)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if page and page[2] == content_hash:
+            self._touch(url, etag, last_modified, content_hash, now)
+            return
+
+        chunks = chunk_text(text)
+        chunk_hashes = [_sha(chunk) for chunk in chunks]
+        self._embeddings(chunks)
+        with self._lock:
+            self._conn.execute("DELETE FROM page_chunks WHERE url = ?", (url,))
+            self._conn.executemany(
+                "INSERT INTO page_chunks (url, position, chunk_hash) VALUES (?, ?, ?)",
+                [(url, i, h) for i, h in enumerate(chunk_hashes)],
+            )
+        self._touch(url, etag, last_modified, content_hash, now)
+        self.evict(now)
+
+    def _touch(self, url, etag, last_modified, content_hash, now) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, now),
+            )
+
+    def _query_embedding(self, query: str) -> array:
+        """
+        Embedding of a search query. Kept out of `chunks` so queries never
+        match as passages and never count toward the page store's size cap.
+        """
+        now = time.time()
+        query_hash = _sha(query)
+        rows = self._query(
+            "SELECT embedding FROM queries WHERE query_hash = ? AND model = ?", (query_hash, EMBEDDING_MODEL)
+        )
+        if rows:
+            vector = array("f")
+            vector.frombytes(rows[0][0])
+            self.reused += 1
+        else:
+            vector = array("f", self.embed([f"query: {query}"])[0])
+            self.embedded += 1
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (query_hash, model, embedding, used_at) VALUES (?, ?, ?, ?)",
+                (query_hash, EMBEDDING_MODEL, vector.tobytes(), now),
+            )
+        return vector
+
+    def _embeddings(self, texts: List[str]) -> List[array]:
+        """Embedding per text, computing only those not stored yet."""
+        now = time.time()
+        hashes = [_sha(text) for text in texts]
+        found = {}
+        for h in set(hashes):
+            rows = self._query(
+                "SELECT embedding FROM chunks WHERE chunk_hash = ? AND model = ?", (h, EMBEDDING_MODEL)
+            )
+            if rows:
+                vector = array("f")
+                vector.frombytes(rows[0][0])
+                found[h] = vector
+        self.reused += len(found)
+
+        missing = [(h, text) for h, text in dict(zip(hashes, texts)).items() if h not in found]
+        if missing:
+            vectors = self.embed([text for _, text in missing])
+            self.embedded += len(missing)
+            rows = []
+            for (h, text), vector in zip(missing, vectors):
+                found[h] = array("f", vector)
+                blob = found[h].tobytes()
+                rows.append((h, EMBEDDING_MODEL, text, blob, len(text) + len(blob), now))
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (chunk_hash, model, text, embedding, size, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        with self._lock:
+            self._conn.executemany("UPDATE chunks SET used_at = ? WHERE chunk_hash = ?", [(now, h) for h in found])
+        return [found[h] for h in hashes]
+
+    def evict(self, now: Optional[float] = None) -> None:
+        """Drop pages older than the max age, orphaned chunks and old queries, then LRU chunks over the size cap."""
+        now = now or time.time()
+        with self._lock:
+            stale = [row[0] for row in self._conn.execute(
+                "SELECT url FROM pages WHERE checked_at < ?", (now - MAX_PAGE_AGE_SECONDS,)
+            )]
+            for url in stale:
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._conn.execute("DELETE FROM page_chunks WHERE url = ?", (url,))
+            # Chunks of pages that changed or were dropped are no longer referenced
+            self._conn.execute(
+                "DELETE FROM chunks WHERE used_at < ? AND chunk_hash NOT IN (SELECT chunk_hash FROM page_chunks)",
+                (now - MAX_PAGE_AGE_SECONDS,),
+            )
+            self._conn.execute("DELETE FROM queries WHERE used_at < ?", (now - MAX_PAGE_AGE_SECONDS,))
+            self._conn.execute(
+                "DELETE FROM queries WHERE rowid NOT IN (SELECT rowid FROM queries ORDER BY used_at DESC LIMIT ?)",
+                (MAX_QUERIES,),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM chunks").fetchone()[0]
+            if total > MAX_STORE_BYTES:
+                for chunk_hash, size in self._conn.execute(
+                    "SELECT chunk_hash, size FROM chunks ORDER BY used_at ASC"
+                ).fetchall():
+                    if total <= MAX_STORE_BYTES:
+                        break
+                    self._conn.execute("DELETE FROM chunks WHERE chunk_hash = ?", (chunk_hash,))
+                    self._conn.execute(
+                        "DELETE FROM page_chunks WHERE url IN (SELECT url FROM page_chunks WHERE chunk_hash = ?)",
+                        (chunk_hash,),
+                    )
+                    total -= size
+                # Pages that lost chunks must be re-indexed on next use
+                self._conn.execute("DELETE FROM pages WHERE url NOT IN (SELECT DISTINCT url FROM page_chunks)")
+
+    def stats(self) -> dict:
+        pages = self._query("SELECT COUNT(*) FROM pages")[0][0]
+        chunks, size = self._query("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunks")[0]
+        queries = self._query("SELECT COUNT(*) FROM queries")[0][0]
+        return {
+            "pages": pages, "chunks": chunks, "queries": queries, "bytes": size,
+            "embedded": self.embedded, "reused": self.reused,
+        }
+
+
+_page_store: Optional[PageStore] = None
+_page_store_lock = threading.Lock()
+
+
+def get_page_store() -> PageStore:
+    """Process-wide page store shared by all website search tools."""
+    global _page_store
+    if _page_store is None:
+        with _page_store_lock:
+            if _page_store is None:
+                _page_store = PageStore(cache_dir() / "pages.sqlite3")
+    return _page_store
+
+
+class WebsiteSearchInput(BaseModel):
+    """Input schema for website search."""
+    website_url: str = Field(..., description="Full URL of the page to search, e.g. a pricing page or report")
+    search_query: str = Field(..., description="What to look for on that page")
+
+
+class CachedWebsiteSearchTool(BaseTool):
+    name: str = "Search in a specific website"
+    description: str = (
+        "Semantic search over the content of a specific web page "
+        "(competitor sites, pricing pages, industry reports). "
+        "Pages and their embeddings are cached, so repeated lookups are fast."
+    )
+    args_schema: Type[BaseModel] = WebsiteSearchInput
+    top_k: int = 5
+
+    def _run(self, website_url: str, search_query: str) -> str:
+        """Return the page passages most relevant to the query."""
+        try:
+            passages = get_page_store().search(website_url, search_query, self.top_k)
+
+            if not passages:
+                return f"No readable content found at {website_url}"
+
+            output = f"🌐 Most relevant passages from {website_url} for '{search_query}':\n\n"
+            for i, passage in enumerate(passages, 1):
+                output += f"{i}. {passage}\n\n"
+            return fit_tool_output(self.name, output, search_query)
+
+        except Exception as e:
+            return f"Error searching website: {str(e)}"
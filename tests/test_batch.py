@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from product.batch import BatchRunner, completed_ids, read_ideas
+from product.results import DEFAULTS
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    return path
+
+
+def test_jsonl_rows_get_defaults_and_sanitized_ids(tmp_path):
+    path = write_jsonl(tmp_path / "ideas.jsonl", [
+        {"id": "meal planner/v1", "product_idea": " Meal planner ", "target_customer": "Adults with T2D"},
+    ])
+    (idea,) = read_ideas(path)
+    assert idea["id"] == "meal_planner_v1"
+    assert idea["inputs"]["product_idea"] == "Meal planner"
+    assert idea["inputs"]["constraints"] == DEFAULTS["constraints"]
+
+
+def test_non_string_values_are_coerced_to_text(tmp_path):
+    path = write_jsonl(tmp_path / "ideas.jsonl", [
+        {"id": 42, "product_idea": "Meal planner", "target_customer": "Adults", "constraints": 5000,
+         "industry": ["health", "food"], "vertical": None},
+    ])
+    (idea,) = read_ideas(path)
+    assert idea["id"] == "42"
+    assert idea["inputs"]["constraints"] == "5000"
+    assert idea["inputs"]["industry"] == "['health', 'food']"
+    assert idea["inputs"]["vertical"] == DEFAULTS["vertical"]
+
+
+def test_csv_rows_without_id_are_identified_by_their_inputs(tmp_path):
+    path = tmp_path / "ideas.csv"
+    path.write_text("product_idea,target_customer\nMeal planner,Adults\nMeal planner,Adults\nDog walker,Owners\n")
+    first, duplicate, other = read_ideas(path)
+    assert first["id"] == duplicate["id"] != other["id"]
+    assert first["id"] == list(read_ideas(path))[0]["id"]
+
+
+@pytest.mark.parametrize("row", [{"product_idea": "Meal planner"}, ["Meal planner", "Adults"]])
+def test_invalid_rows_name_the_line(tmp_path, row):
+    path = write_jsonl(tmp_path / "ideas.jsonl", [{"product_idea": "a", "target_customer": "b"}, row])
+    with pytest.raises(ValueError, match=r"ideas.jsonl:2:"):
+        list(read_ideas(path))
+
+
+def test_completed_ids_ignore_failures_and_a_partial_last_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        json.dumps({"id": "a", "status": "ok"}) + "\n"
+        + json.dumps({"id": "b", "status": "error"}) + "\n"
+        + '{"id": "c", "stat'
+    )
+    assert completed_ids(path) == {"a"}
+    assert completed_ids(tmp_path / "missing.jsonl") == set()
+
+
+class IdlePool:
+    def warmup(self, count=None):
+        pass
+
+
+def test_restart_runs_only_ideas_without_an_ok_record(tmp_path, monkeypatch):
+    output = tmp_path / "results.jsonl"
+    runner = BatchRunner(output, workers=2)
+    runner.pool = IdlePool()
+    ran = []
+
+    def run_one(idea):
+        ran.append(idea["id"])
+        record = {"id": idea["id"], "status": "error" if idea["id"] == "b" else "ok", "duration_s": 1.0,
+                  "token_usage": {"prompt_tokens": 10, "completion_tokens": 5}}
+        runner._write(record)
+        return record
+
+    monkeypatch.setattr(runner, "run_one", run_one)
+    ideas = [{"id": name, "inputs": {}} for name in ("a", "b", "c")]
+
+    first = runner.run(ideas)
+    assert sorted(ran) == ["a", "b", "c"]
+    assert (first["completed"], first["failed"], first["skipped"]) == (2, 1, 0)
+
+    ran.clear()
+    second = runner.run(ideas)
+    assert ran == ["b"]
+    assert second["skipped"] == 2
@@ -0,0 +1,177 @@
+import time
+
+import pytest
+from crewai import Agent, Process, Task
+from crewai.tools import BaseTool
+
+from product import budget
+from product.benchmark.fake_llm import ScriptedLLM
+from product.budget import CONTEXT_DIVIDER, TokenLedger, compress, count_tokens, fit_context, track
+from product.pipeline import BudgetedCrew
+
+REPORT = "\n".join(
+    ["# Market", "Intro line about the market."]
+    + ["Filler sentence with nothing in it."] * 40
+    + ["Revenue grew 40% to $12M in 2024.", "## Pricing", "Meal planning apps charge $10 per month."]
+)
+
+
+class LimitedBudgets:
+    def __init__(self, context: int = 6000, tool: int = 2500):
+        self.context, self.tool = context, tool
+
+    def context_limit(self, task):
+        return self.context
+
+    def tool_limit(self, tool):
+        return self.tool
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    limits = LimitedBudgets()
+    monkeypatch.setattr(budget, "_budgets", limits)
+    monkeypatch.setattr(budget, "ENABLED", True)
+    return limits
+
+
+def test_compress_keeps_short_text_unchanged():
+    assert compress("Short text.", 100) == "Short text."
+
+
+def test_compress_keeps_headings_figures_and_query_lines_in_order():
+    compact = compress(REPORT, 60, query="meal planning")
+    lines = compact.splitlines()
+
+    assert count_tokens(compact) <= 60 + 5
+    assert lines[0] == "# Market"
+    for line in ("## Pricing", "Revenue grew 40% to $12M in 2024.", "Meal planning apps charge $10 per month."):
+        assert line in lines
+    assert lines.index("Revenue grew 40% to $12M in 2024.") < lines.index("## Pricing")
+    assert "…" in lines
+    assert lines[-1].startswith("[compacted from ~")
+
+
+def test_compress_is_deterministic():
+    assert compress(REPORT, 50, "pricing") == compress(REPORT, 50, "pricing")
+
+
+def test_fit_context_under_budget_joins_outputs_unchanged(budgets):
+    ledger = TokenLedger()
+    with track(ledger):
+        assert fit_context("strategy", ["first", "second"]) == f"first{CONTEXT_DIVIDER}second"
+    size = count_tokens("first") + count_tokens("second")
+    assert ledger.tasks["strategy"]["context_tokens"] == ledger.tasks["strategy"]["context_tokens_sent"] == size
+
+
+def test_fit_context_gives_short_outputs_their_full_share(budgets):
+    budgets.context = 120
+    ledger = TokenLedger()
+    with track(ledger):
+        fitted = fit_context("strategy", ["Short upstream output.", REPORT, REPORT], query="pricing")
+
+    short, long_1, long_2 = fitted.split(CONTEXT_DIVIDER)
+    assert short == "Short upstream output."
+    assert long_1 == long_2 != REPORT
+    entry = ledger.tasks["strategy"]
+    assert entry["context_tokens"] > entry["context_tokens_sent"]
+    assert ledger.summary()["tokens_saved"] == entry["context_tokens"] - entry["context_tokens_sent"]
+
+
+def test_budgets_off_counts_but_does_not_compact(budgets, monkeypatch):
+    budgets.context = budgets.tool = 10
+    monkeypatch.setattr(budget, "ENABLED", False)
+    ledger = TokenLedger()
+    with track(ledger):
+        assert budget.fit_tool_output("search", REPORT) == REPORT
+        assert fit_context("strategy", [REPORT]) == REPORT
+    assert ledger.tools["search"]["tokens"] == ledger.tools["search"]["tokens_sent"] == count_tokens(REPORT)
+    assert ledger.summary()["tokens_saved"] == 0
+
+
+def test_ledger_totals_tasks_and_reports_tool_calls():
+    ledger = TokenLedger()
+    ledger.record_task("research", 100, 20, requests=2)
+    ledger.record_task("research", 50, 10, requests=1)
+    ledger.record_task("strategy", 10, 5)
+    ledger.record_tool_call("search", prompt_tokens=300, completion_tokens=12)
+    ledger.record_tool_call("search", prompt_tokens=200, completion_tokens=8)
+    ledger.record_tool("search", original=900, sent=300)
+
+    summary = ledger.summary()
+    assert summary["tasks"]["research"]["requests"] == 3
+    assert (summary["prompt_tokens"], summary["completion_tokens"]) == (160, 35)
+    assert summary["tools"]["search"] == {
+        "calls": 2, "prompt_tokens": 500, "completion_tokens": 20,
+        "compacted": 1, "tokens": 900, "tokens_sent": 300,
+    }
+    assert summary["tokens_saved"] == 600
+    assert "Total: 160 prompt + 35 completion tokens, 600 tokens saved by budgets" in ledger.report()
+
+
+class LookupTool(BaseTool):
+    name: str = "Lookup"
+    description: str = "Look up facts about a topic."
+
+    def _run(self, topic: str) -> str:
+        return f"Facts about {topic}: adults want simple weekly meal plans."
+
+
+SCRIPT = [
+    {"match": "Research", "steps": [
+        {"action": "Lookup", "input": {"topic": "meal planning"}},
+        {"final": "Adults want simple weekly plans."},
+    ]},
+    {"match": "Recommend", "steps": [{"final": "Build the weekly planner."}]},
+]
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def make_crew() -> BudgetedCrew:
+    agent = Agent(
+        role="Analyst", goal="Answer", backstory="Analyst", llm=ScriptedLLM(SCRIPT, latency=0),
+        tools=[LookupTool()], verbose=False,
+    )
+    research = Task(name="research", description="Research meal planning", expected_output="Text", agent=agent)
+    strategy = Task(
+        name="strategy", description="Recommend a strategy", expected_output="Text", agent=agent, context=[research],
+    )
+    return BudgetedCrew(agents=[agent], tasks=[research, strategy], process=Process.sequential, verbose=False)
+
+
+def test_plain_kickoff_records_each_task_and_tool_call():
+    crew = make_crew()
+    result = crew.kickoff()
+    wait_for(lambda: "Lookup" in crew.ledger.tools)
+
+    summary = crew.ledger.summary()
+    assert list(summary["tasks"]) == ["research", "strategy"]
+    assert summary["tasks"]["research"]["requests"] == 2
+    assert summary["tasks"]["strategy"]["requests"] == 1
+    assert summary["prompt_tokens"] == result.token_usage.prompt_tokens
+    assert summary["completion_tokens"] == result.token_usage.completion_tokens
+    tool = summary["tools"]["Lookup"]
+    assert tool["calls"] == 1
+    assert tool["prompt_tokens"] == count_tokens("Facts about meal planning: adults want simple weekly meal plans.")
+    assert tool["completion_tokens"] > 0
+
+
+def test_kickoff_inside_a_tracked_run_records_into_that_run():
+    crew = make_crew()
+    # The agent's LLM counters are cumulative: a second kickoff must only count its own calls
+    first = crew.kickoff().token_usage
+    run = TokenLedger()
+    with track(run):
+        crew.kickoff()
+    wait_for(lambda: "Lookup" in run.tools)
+
+    assert crew.ledger is run
+    assert run.summary()["prompt_tokens"] == first.prompt_tokens
+    assert run.tasks["research"]["requests"] == 2
@@ -0,0 +1,130 @@
+import pytest
+
+from product.tools import cache as cache_module
+from product.tools.cache import ResponseCache
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs) -> ResponseCache:
+    return ResponseCache(tmp_path / "cache.sqlite3", ttls={"test": 60}, **kwargs)
+
+
+def test_value_round_trips_until_ttl_expires(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("test", "k", {"posts": [1, 2]})
+
+    clock.advance(59)
+    assert cache.get("test", "k") == {"posts": [1, 2]}
+
+    clock.advance(2)
+    assert cache.get("test", "k", "expired") == "expired"
+    assert cache.stats()["entries"] == 0
+
+
+def test_explicit_ttl_and_env_override(tmp_path, clock, monkeypatch):
+    cache = make_cache(tmp_path)
+    cache.set("test", "short", 1, ttl=5)
+    monkeypatch.setenv("PRODUCT_CACHE_TTL_TEST", "600")
+    cache.set("test", "long", 2)
+
+    clock.advance(120)
+    assert cache.get("test", "short") is None
+    assert cache.get("test", "long") == 2
+
+
+def test_sources_do_not_share_keys(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("test", "k", "value")
+    assert cache.get("other", "k") is None
+
+
+def test_hits_and_misses_are_counted(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("test", "k", "value")
+    cache.get("test", "k")
+    cache.get("test", "missing")
+    cache.get("test", "k", count=False)
+    cache.get("test", "missing", count=False)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_evicts_least_recently_used_beyond_max_entries(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=3)
+    for key in "abc":
+        cache.set("test", key, key)
+        clock.advance(1)
+    # Reading "a" makes "b" the least recently used entry
+    cache.get("test", "a")
+    clock.advance(1)
+
+    cache.set("test", "d", "d")
+    assert cache.get("test", "b") is None
+    assert [cache.get("test", key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.stats()["entries"] == 3
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(tmp_path, clock):
+    value = "x" * 98  # 100 bytes once JSON-encoded
+    cache = make_cache(tmp_path, max_bytes=250)
+    cache.set("test", "a", value)
+    clock.advance(1)
+    cache.set("test", "b", value)
+    clock.advance(1)
+    cache.get("test", "a")
+    clock.advance(1)
+
+    cache.set("test", "c", value)
+    assert cache.get("test", "b") is None
+    assert cache.get("test", "a") == value
+    assert cache.get("test", "c") == value
+    assert cache.stats()["bytes"] == 200
+
+
+def test_expired_entries_are_evicted_before_live_ones(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.set("test", "old", 1, ttl=1)
+    clock.advance(1)
+    cache.set("test", "live", 2)
+    clock.advance(5)
+
+    cache.set("test", "new", 3)
+    assert cache.get("test", "live") == 2
+    assert cache.get("test", "new") == 3
+
+
+def test_get_or_fetch_fetches_once_then_serves_from_cache(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return ["result"]
+
+    assert cache.get_or_fetch("test", "k", fetch) == ["result"]
+    assert cache.get_or_fetch("test", "k", fetch) == ["result"]
+    assert len(calls) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_cache_persists_across_instances(tmp_path, clock):
+    make_cache(tmp_path).set("test", "k", "value")
+    assert make_cache(tmp_path).get("test", "k") == "value"
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from crewai.tasks.task_output import TaskOutput
+
+from product.checkpoints import CheckpointStore, hash_inputs
+from product.schemas import RiskAssessment
+
+
+def make_output(raw: str = "All good", **kwargs) -> TaskOutput:
+    return TaskOutput(description="Assess risks", raw=raw, agent="Risk Analyst", **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(root=tmp_path)
+
+
+def test_task_outputs_round_trip_per_run_and_inputs(store):
+    inputs_hash = store.start_run("run-1", {"product_idea": "meal planner"})
+    store.save("run-1", inputs_hash, "risk_assumptions_task", make_output())
+
+    assert store.load("run-1", inputs_hash, "risk_assumptions_task").raw == "All good"
+    assert store.load("run-1", hash_inputs({"product_idea": "other"}), "risk_assumptions_task") is None
+    assert store.completed_tasks("run-1", inputs_hash) == ["risk_assumptions_task"]
+    assert store.load_run("run-1")["inputs"] == {"product_idea": "meal planner"}
+
+
+def test_typed_outputs_keep_their_model(store):
+    typed = RiskAssessment(risks=[], critical_unknowns=["Retention"])
+    store.save_fingerprint("fp", "risk_assumptions_task", make_output(pydantic=typed))
+
+    loaded = store.load_fingerprint("fp")
+    assert isinstance(loaded.pydantic, RiskAssessment)
+    assert loaded.pydantic.critical_unknowns == ["Retention"]
+
+
+def test_unknown_run_raises(store):
+    with pytest.raises(KeyError):
+        store.load_run("missing")
+
+
+def test_fingerprint_outputs_expire(tmp_path):
+    store = CheckpointStore(root=tmp_path, reuse_ttl=-1)
+    store.save_fingerprint("fp", "task", make_output())
+    assert store.load_fingerprint("fp") is None
+    assert not (tmp_path / "by_fingerprint" / "fp.json").exists()
+
+
+def test_concurrent_writers_of_one_fingerprint_do_not_collide(store):
+    def save(i):
+        store.save_fingerprint("shared", "market_landscape_task", make_output(f"writer {i}"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(save, range(200)))
+
+    assert store.load_fingerprint("shared").raw.startswith("writer ")
+    assert [path.name for path in (store.root / "by_fingerprint").iterdir()] == ["shared.json"]
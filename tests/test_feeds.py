@@ -0,0 +1,124 @@
+import io
+
+import pytest
+import requests
+
+from product.tools import cache as cache_module
+from product.tools import http_client, post_store
+from product.tools.cache import ResponseCache
+from product.tools.feeds import SUMMARY_CHARS, parse_feed, strip_html
+from product.tools.reddit_tool import RedditRSSTool
+
+ATOM = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>search results</title>
+  <entry>
+    <title>Meal planning with type 2</title>
+    <link href="https://www.reddit.com/r/diabetes/comments/a1/" />
+    <content type="html">&lt;p&gt;I &lt;b&gt;hate&lt;/b&gt; logging&amp;nbsp;carbs&lt;/p&gt;</content>
+  </entry>
+  <entry>
+    <title> Café menus </title>
+    <link href="https://www.reddit.com/r/diabetes/comments/a2/" />
+    <content type="html">&lt;div&gt;Too   many\n apps&lt;/div&gt;</content>
+  </entry>
+  <entry>
+    <title>Third</title>
+    <link href="https://www.reddit.com/r/diabetes/comments/a3/" />
+  </entry>
+</feed>
+""".encode("utf-8")
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>r/keto</title>
+  <item><title>Fat bombs</title><link>https://www.reddit.com/r/keto/comments/b1/</link>
+  <description>Recipes &amp; tips</description></item>
+</channel></rss>
+"""
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_atom_entries_are_reduced_to_title_summary_and_link():
+    assert parse_feed([ATOM], limit=10) == [
+        {"title": "Meal planning with type 2", "summary": "I hate logging\xa0carbs",
+         "link": "https://www.reddit.com/r/diabetes/comments/a1/"},
+        {"title": "Café menus", "summary": "Too many apps", "link": "https://www.reddit.com/r/diabetes/comments/a2/"},
+        {"title": "Third", "summary": "", "link": "https://www.reddit.com/r/diabetes/comments/a3/"},
+    ]
+
+
+def test_rss_items_are_parsed():
+    assert parse_feed([RSS], limit=10) == [
+        {"title": "Fat bombs", "summary": "Recipes & tips", "link": "https://www.reddit.com/r/keto/comments/b1/"},
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_small_chunks_give_the_same_entries(size):
+    assert parse_feed(chunked(ATOM, size), limit=10) == parse_feed([ATOM], limit=10)
+
+
+def test_parsing_stops_reading_after_limit_entries():
+    read = []
+
+    def chunks():
+        for chunk in chunked(ATOM, 32):
+            read.append(chunk)
+            yield chunk
+
+    assert [entry["title"] for entry in parse_feed(chunks(), limit=1)] == ["Meal planning with type 2"]
+    assert len(read) < len(chunked(ATOM, 32))
+
+
+def test_long_summaries_are_cut():
+    feed = b"<feed><entry><title>t</title><summary>" + b"word " * 200 + b"</summary></entry></feed>"
+    (entry,) = parse_feed([feed], limit=5)
+    assert len(entry["summary"]) == SUMMARY_CHARS
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"not xml at all",
+    ATOM[: ATOM.index(b"<entry>", ATOM.index(b"</entry>"))],
+    ATOM[:-20],
+], ids=["empty", "not-xml", "cut-between-entries", "cut-in-last-entry"])
+def test_empty_malformed_or_truncated_feeds_raise(data):
+    with pytest.raises(RuntimeError, match="could not parse feed"):
+        parse_feed(chunked(data, 50), limit=10)
+
+
+def test_strip_html_unescapes_entities_and_collapses_whitespace():
+    assert strip_html("<p>Fish &amp; chips</p>\n\n<p>&#8220;ok&#x201D;</p>") == "Fish & chips “ok”"
+
+
+def feed_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = "https://www.reddit.com/r/diabetes/search.rss"
+    response.raw = io.BytesIO(body)
+    return response
+
+
+@pytest.fixture
+def rss_tool(tmp_path, monkeypatch):
+    """RedditRSSTool with a fresh cache and no local post index."""
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(cache_module, "_tool_cache", cache)
+    monkeypatch.setattr(post_store, "MODE", "off")
+    return RedditRSSTool(), cache
+
+
+def test_truncated_feed_is_not_cached(rss_tool, monkeypatch):
+    tool, cache = rss_tool
+    bodies = [ATOM[:-20], ATOM]
+    monkeypatch.setattr(http_client, "get", lambda url, **kwargs: feed_response(bodies.pop(0)))
+
+    with pytest.raises(RuntimeError, match="could not parse feed"):
+        tool.search("meal planning", "diabetes", 10)
+    assert cache.stats()["entries"] == 0
+
+    # The next call downloads the feed again instead of serving the cut-short copy
+    assert len(tool.search("meal planning", "diabetes", 10)) == 3
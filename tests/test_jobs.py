@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+from product.jobs import JobManager, JobQueueFull, JobStore, job_inputs
+from product.results import DEFAULTS
+
+INPUTS = {"product_idea": "Meal planner", "target_customer": "Adults with type 2 diabetes"}
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+class IdlePool:
+    def warmup_async(self, count=None):
+        pass
+
+
+def make_manager(store, **kwargs) -> JobManager:
+    manager = JobManager(store=store, **kwargs)
+    manager.pool = IdlePool()
+    return manager
+
+
+def test_job_inputs_apply_defaults_and_require_idea_and_customer():
+    inputs = job_inputs({**INPUTS, "constraints": "  ", "industry": 42})
+    assert inputs["constraints"] == DEFAULTS["constraints"]
+    assert inputs["industry"] == "42"
+    with pytest.raises(ValueError, match="required"):
+        job_inputs({"product_idea": "Meal planner"})
+
+
+def test_store_tracks_status_events_and_task_outputs(store):
+    store.create("job-1", INPUTS, "parallel")
+    store.set_status("job-1", "running")
+    store.add_event("job-1", "task", {"task": "market", "output": {"raw": "first"}})
+    store.add_event("job-1", "task", {"task": "market", "output": {"raw": "second"}})
+    store.set_status("job-1", "succeeded", result={"decision": "go"})
+
+    job = store.get("job-1")
+    assert (job["status"], job["inputs"], job["result"]) == ("succeeded", INPUTS, {"decision": "go"})
+    assert job["started_at"] <= job["finished_at"]
+    statuses = [event["data"]["status"] for event in store.events("job-1", types=("status",))]
+    assert statuses == ["queued", "running", "succeeded"]
+    assert store.task_outputs("job-1") == {"market": {"raw": "second"}}
+
+    last_seen = store.events("job-1")[2]["seq"]
+    assert [event["type"] for event in store.events("job-1", after=last_seen)] == ["task", "status"]
+    assert store.get("missing") is None
+
+
+def test_recent_lists_newest_first_without_results(store):
+    for job_id in ("job-1", "job-2", "job-3"):
+        store.create(job_id, INPUTS, None)
+    store.set_status("job-2", "failed", error="boom")
+
+    assert [job["id"] for job in store.recent()] == ["job-3", "job-2", "job-1"]
+    assert [job["id"] for job in store.recent(status="failed")] == ["job-2"]
+    assert "result" not in store.recent(limit=1)[0]
+    assert store.unfinished() == ["job-1", "job-3"]
+
+
+def test_submissions_beyond_the_queue_limit_are_rejected(store):
+    manager = make_manager(store, workers=1, max_queue=2)
+    first = manager.submit(INPUTS)
+    second = manager.submit(INPUTS, mode="parallel")
+    assert (first["queue_position"], second["queue_position"]) == (1, 2)
+    with pytest.raises(JobQueueFull):
+        manager.submit(INPUTS)
+
+    # Cancelling frees a slot and moves the next job up
+    assert manager.cancel(first["id"])
+    assert not manager.cancel(first["id"])
+    assert manager.get(second["id"])["queue_position"] == 1
+    assert manager.submit(INPUTS)["queue_position"] == 2
+    assert store.get(first["id"])["status"] == "cancelled"
+
+
+def test_unknown_mode_is_rejected(store):
+    with pytest.raises(ValueError, match="execution mode"):
+        make_manager(store).submit(INPUTS, mode="turbo")
+
+
+def test_start_requeues_unfinished_jobs_and_skips_cancelled_ones(store, monkeypatch):
+    store.create("job-running", INPUTS, None)
+    store.set_status("job-running", "running")
+    store.create("job-queued", INPUTS, None)
+    store.create("job-done", INPUTS, None)
+    store.set_status("job-done", "succeeded", result={"decision": "go"})
+
+    manager = make_manager(store, workers=1)
+    ran = []
+    release = threading.Event()
+
+    def run(job):
+        release.wait(5)
+        ran.append(job["id"])
+        store.set_status(job["id"], "succeeded", result={"decision": "go"})
+
+    monkeypatch.setattr(manager, "_run", run)
+    manager.start()
+    manager.start()
+    # The single worker holds the first job, so the second can still be cancelled
+    wait_for(lambda: manager.stats()["running"] == 1)
+    assert manager.cancel("job-queued")
+    release.set()
+    wait_for(lambda: manager.stats()["running"] == 0 and store.get("job-running")["status"] == "succeeded")
+
+    assert ran == ["job-running"]
+    assert store.get("job-queued")["status"] == "cancelled"
+    assert store.unfinished() == []
+
+
+def test_worker_survives_jobs_that_fail_outside_the_crew(store, monkeypatch):
+    manager = make_manager(store, workers=1)
+
+    def run(job):
+        if job["inputs"]["product_idea"] == "broken":
+            raise OSError("disk full")
+        store.set_status(job["id"], "succeeded", result={"decision": "go"})
+
+    monkeypatch.setattr(manager, "_run", run)
+    manager.start()
+    broken = manager.submit({**INPUTS, "product_idea": "broken"})
+    healthy = manager.submit(INPUTS)
+    wait_for(lambda: store.get(healthy["id"])["status"] == "succeeded")
+
+    assert store.get(broken["id"])["status"] == "failed"
+    assert store.get(broken["id"])["error"] == "OSError: disk full"
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from product.tools.json_stream import iter_values
+
+LISTING = {
+    "kind": "Listing",
+    "data": {
+        "after": "t3_abc",
+        "dist": 3,
+        "children": [
+            {"kind": "t3", "data": {"id": "a1", "title": "Café \"menus\" 🍲", "score": -12, "ratio": 0.97}},
+            {"kind": "t3", "data": {"id": "a2", "title": "braces {not} [structure]", "tags": [], "edited": False}},
+            {"kind": "t3", "data": {"id": "a3", "title": "back\\slash \\\" quote", "body": None, "big": 1.5e10}},
+        ],
+        "before": None,
+    },
+}
+PATHS = ("data.children.item", "data.after")
+EXPECTED = [("data.after", "t3_abc")] + [("data.children.item", child) for child in LISTING["data"]["children"]]
+
+
+def split(data: bytes, *cuts: int) -> list:
+    bounds = [0, *cuts, len(data)]
+    return [data[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_two_chunk_split_yields_the_same_values(indent):
+    data = json.dumps(LISTING, indent=indent, ensure_ascii=False).encode("utf-8")
+    for cut in range(len(data) + 1):
+        assert list(iter_values(split(data, cut), PATHS)) == EXPECTED, f"split at byte {cut}"
+
+
+def test_three_chunk_splits_yield_the_same_values():
+    data = json.dumps(LISTING, ensure_ascii=False).encode("utf-8")
+    for first in range(0, len(data), 7):
+        for second in range(first, len(data), 5):
+            assert list(iter_values(split(data, first, second), PATHS)) == EXPECTED
+
+
+def test_one_byte_chunks_split_multibyte_characters():
+    data = json.dumps(LISTING, ensure_ascii=False).encode("utf-8")
+    assert list(iter_values([data[i:i + 1] for i in range(len(data))], PATHS)) == EXPECTED
+
+
+def test_values_come_in_document_order_at_any_depth():
+    document = [{"data": {"children": [{"id": 1}, {"id": 2}]}}, {"data": {"children": [{"id": 3}]}}]
+    data = json.dumps(document).encode("utf-8")
+    values = [value["id"] for _, value in iter_values(split(data, 9, 30), ("item.data.children.item",))]
+    assert values == [1, 2, 3]
+
+
+def test_scalars_split_at_the_end_of_a_chunk_are_not_cut_short():
+    data = b'{"n": 12345, "t": true, "x": -0.5e-3}'
+    for cut in range(len(data) + 1):
+        assert dict(iter_values(split(data, cut), ("n", "t", "x"))) == {"n": 12345, "t": True, "x": -0.5e-3}
+
+
+def test_unrequested_paths_are_skipped():
+    data = json.dumps(LISTING).encode("utf-8")
+    assert list(iter_values([data], ("missing", "data.children"))) == [("data.children", LISTING["data"]["children"])]
+    assert list(iter_values([data], ())) == []
+
+
+@pytest.mark.parametrize("data", [
+    b'{"data": {"children": [{"id": 1}',
+    b'{"data": {"after": "t3_',
+    b'{"data": {"after": nope}}',
+    b'{"data": 1}}',
+])
+def test_malformed_or_truncated_input_raises(data):
+    with pytest.raises(ValueError):
+        list(iter_values(split(data, len(data) // 2), PATHS))
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from crewai.llms.base_llm import BaseLLM
+from pydantic import BaseModel
+
+from product.llm_cache import CachedLLM, cache_key, install
+from product.tools.cache import ResponseCache
+
+MESSAGES = [{"role": "system", "content": "You are an analyst."}, {"role": "user", "content": "Size the market."}]
+
+
+class CountingLLM(BaseLLM):
+    """Answers with a numbered reply so repeated calls are distinguishable."""
+
+    def __init__(self, model: str = "fake-model", temperature: float = 0.2, reply=None):
+        super().__init__(model=model, temperature=temperature)
+        self.calls = 0
+        self.reply = reply
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self.calls += 1
+        return self.reply if self.reply is not None else f"reply {self.calls}"
+
+    async def acall(self, messages, **kwargs):
+        return self.call(messages, **kwargs)
+
+
+class Answer(BaseModel):
+    text: str
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "llm.sqlite3")
+
+
+def test_key_ignores_line_endings_and_trailing_whitespace():
+    llm = CountingLLM()
+    messy = [{"role": "system", "content": "You are an analyst.  \r\n"}, {"role": "user", "content": "Size the market."}]
+    assert cache_key(llm, messy) == cache_key(llm, MESSAGES)
+
+
+def test_key_ignores_stop_word_order():
+    llm = CountingLLM()
+    llm.stop = ["\nObservation:", "END"]
+    key = cache_key(llm, MESSAGES)
+    llm.stop = ["END", "\nObservation:"]
+    assert cache_key(llm, MESSAGES) == key
+
+
+@pytest.mark.parametrize("change", [
+    lambda llm, kwargs: setattr(llm, "model", "other-model"),
+    lambda llm, kwargs: setattr(llm, "temperature", 0.9),
+    lambda llm, kwargs: kwargs.update(messages=MESSAGES + [{"role": "assistant", "content": "Thought:"}]),
+    lambda llm, kwargs: kwargs.update(tools=[{"name": "search"}]),
+    lambda llm, kwargs: kwargs.update(response_model=Answer),
+], ids=["model", "temperature", "messages", "tools", "response_model"])
+def test_key_changes_with_anything_that_changes_the_reply(change):
+    llm = CountingLLM()
+    kwargs = {"messages": MESSAGES}
+    key = cache_key(llm, **kwargs)
+    change(llm, kwargs)
+    assert cache_key(llm, **kwargs) != key
+
+
+def test_repeated_prompts_are_answered_from_the_cache(cache):
+    inner = CountingLLM()
+    llm = CachedLLM(inner, cache)
+    assert llm.call(MESSAGES) == "reply 1"
+    assert llm.call(MESSAGES) == "reply 1"
+    assert llm.call("Another prompt") == "reply 2"
+    assert inner.calls == 2
+    assert asyncio.run(llm.acall(MESSAGES)) == "reply 1"
+
+
+def test_native_tool_calls_bypass_the_cache(cache):
+    inner = CountingLLM()
+    llm = CachedLLM(inner, cache)
+    functions = {"search": lambda query: "results"}
+    assert llm.call(MESSAGES, available_functions=functions) == "reply 1"
+    assert llm.call(MESSAGES, available_functions=functions) == "reply 2"
+    assert cache.stats()["entries"] == 0
+    # The bypassed calls did not populate the cache for plain calls either
+    assert llm.call(MESSAGES) == "reply 3"
+
+
+def test_structured_and_empty_replies_are_not_stored(cache):
+    for reply in (Answer(text="ok"), ""):
+        llm = CachedLLM(CountingLLM(reply=reply), cache)
+        llm.call(MESSAGES)
+    assert cache.stats()["entries"] == 0
+
+
+def test_wrapper_forwards_stop_words_and_usage(cache):
+    inner = CountingLLM()
+    llm = CachedLLM(inner, cache)
+    llm.stop = ["\nObservation:"]
+    assert inner.stop == ["\nObservation:"]
+    assert llm.get_token_usage_summary() is not None
+    assert llm.get_token_usage_summary() == inner.get_token_usage_summary()
+
+
+def test_install_wraps_each_agent_once(cache):
+    crew = SimpleNamespace(agents=[SimpleNamespace(llm=CountingLLM()), SimpleNamespace(llm="gpt-4o")])
+    install(crew, cache)
+    wrapped = crew.agents[0].llm
+    install(crew, cache)
+    assert isinstance(wrapped, CachedLLM) and crew.agents[0].llm is wrapped
+    assert crew.agents[1].llm == "gpt-4o"
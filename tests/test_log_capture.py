@@ -0,0 +1,84 @@
+import contextvars
+import io
+import sys
+import threading
+
+from product.log_capture import StdoutRouter, capture_to
+
+
+class Sink:
+    def __init__(self):
+        self.parts = []
+
+    def put(self, data):
+        self.parts.append(data)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def use_terminal(monkeypatch) -> io.StringIO:
+    """A fresh stdout for the router to fall back to (set in the test: pytest swaps stdout after setup)."""
+    terminal = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", terminal)
+    return terminal
+
+
+def run_in_thread(fn, context=None):
+    target = (lambda: context.run(fn)) if context is not None else fn
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+
+def test_output_goes_to_the_sink_of_the_current_run(monkeypatch):
+    terminal = use_terminal(monkeypatch)
+    sink = Sink()
+    with capture_to(sink):
+        print("inside")
+    print("outside")
+
+    assert isinstance(sys.stdout, StdoutRouter)
+    assert sink.text == "inside\n"
+    assert terminal.getvalue() == "outside\n"
+
+
+def test_threads_started_with_a_copied_context_keep_routing(monkeypatch):
+    terminal = use_terminal(monkeypatch)
+    sink = Sink()
+    with capture_to(sink):
+        run_in_thread(lambda: print("worker"), contextvars.copy_context())
+    assert sink.text == "worker\n"
+    assert terminal.getvalue() == ""
+
+
+def test_unrelated_threads_are_not_captured_while_a_run_is_active(monkeypatch):
+    terminal = use_terminal(monkeypatch)
+    sink = Sink()
+    with capture_to(sink):
+        run_in_thread(lambda: print("server thread"))
+    assert sink.text == ""
+    assert terminal.getvalue() == "server thread\n"
+
+
+def test_concurrent_runs_only_see_their_own_output(monkeypatch):
+    terminal = use_terminal(monkeypatch)
+    sinks = {name: Sink() for name in ("a", "b")}
+    both_capturing = threading.Barrier(2)
+
+    def run(name):
+        with capture_to(sinks[name]):
+            both_capturing.wait(5)
+            for i in range(3):
+                print(f"{name}{i}")
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in sinks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sinks["a"].text == "a0\na1\na2\n"
+    assert sinks["b"].text == "b0\nb1\nb2\n"
+    assert terminal.getvalue() == ""
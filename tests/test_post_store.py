@@ -0,0 +1,198 @@
+import time
+
+import pytest
+
+from product.tools import post_store, reddit_tool
+from product.tools.post_store import PostStore, indexed_posts, match_query
+
+DAY = 24 * 60 * 60
+NOW = time.time()
+
+
+def post(post_id: str, title: str, body: str = "", subreddit: str = "diabetes", age_days: float = 1, **extra) -> dict:
+    return {
+        "id": post_id, "subreddit": subreddit, "title": title, "selftext": body,
+        "score": extra.pop("score", 10), "num_comments": extra.pop("num_comments", 5),
+        "created_utc": NOW - age_days * DAY, "permalink": f"/r/{subreddit}/comments/{post_id}/", **extra,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PostStore(tmp_path / "posts.sqlite3")
+
+
+def ids(posts) -> list:
+    return [p["id"] for p in posts]
+
+
+def test_match_query_quotes_terms():
+    assert match_query('meal "planning" OR') == '"meal" OR "planning"'
+    assert match_query("the a") == ""
+
+
+def test_search_ranks_title_matches_above_body_and_comment_matches(store):
+    store.add_posts([
+        post("a1", "Weekly shopping", body="I hate meal planning"),
+        post("a2", "Meal planning burnout"),
+        post("a3", "Random", comments=[{"body": "meal planning apps"}]),
+        post("a4", "Unrelated"),
+    ])
+    assert ids(store.search("meal planning")) == ["a2", "a1", "a3"]
+    assert store.search("random")[0]["comments"] == [{"body": "meal planning apps"}]
+
+
+def test_search_filters_by_subreddit_engagement_and_date(store):
+    store.add_posts([
+        post("b1", "carb counting", score=500, num_comments=80, age_days=2),
+        post("b2", "carb counting", score=3, num_comments=1, age_days=2),
+        post("b3", "carb counting", score=200, num_comments=40, age_days=90),
+        post("b4", "carb counting", subreddit="keto", score=900, num_comments=90),
+    ])
+    assert set(ids(store.search("carb", ["Diabetes"]))) == {"b1", "b2", "b3"}
+    assert set(ids(store.search("carb", min_score=100, min_comments=30))) == {"b1", "b3", "b4"}
+    assert set(ids(store.search("carb", since=NOW - 30 * DAY))) == {"b1", "b2", "b4"}
+    assert ids(store.search("carb", until=NOW - 30 * DAY)) == ["b3"]
+
+
+def test_rss_records_keep_stored_engagement_and_comments(store):
+    store.add_posts([post("c1", "Logging food", body="full text", score=42, num_comments=7,
+                          comments=[{"body": "same here"}])])
+    store.add_posts([{"id": "c1", "subreddit": "diabetes", "title": "Logging food", "selftext": "full",
+                      "permalink": "/r/diabetes/comments/c1/"}])
+
+    (stored,) = store.search("logging")
+    assert (stored["score"], stored["num_comments"], stored["selftext"]) == (42, 7, "full text")
+    assert stored["comments"] == [{"body": "same here"}]
+
+
+class FakeNew:
+    """/new listing of `count` posts, newest first, one post per day, `page` posts per page."""
+
+    def __init__(self, count: int, page: int = 100, first_id: int = 1000):
+        self.posts = [post(self.base36(first_id + count - i), f"post {i}", age_days=i) for i in range(count)]
+        self.page = page
+        self.calls = 0
+
+    @staticmethod
+    def base36(number: int) -> str:
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+        text = ""
+        while number:
+            number, rest = divmod(number, 36)
+            text = digits[rest] + text
+        return text
+
+    def __call__(self, path, params, after=None, text_chars=2000):
+        self.calls += 1
+        start = int(after) if after else 0
+        end = start + self.page
+        return [dict(p) for p in self.posts[start:end]], (str(end) if end < len(self.posts) else None)
+
+
+def test_sync_pages_until_the_newest_stored_id(store, monkeypatch):
+    listing = FakeNew(25, page=10)
+    monkeypatch.setattr(reddit_tool, "fetch_listing", listing)
+    assert store.sync("diabetes") == 25
+    assert listing.calls == 3
+
+    # Five newer posts: one page reaches the newest stored ID and stops
+    listing.posts = [post(FakeNew.base36(2000 + i), f"new {i}", age_days=0) for i in range(5)] + listing.posts
+    listing.calls = 0
+    assert store.sync("diabetes") == 5
+    assert listing.calls == 1
+    assert store.newest_id("diabetes") == 2004
+    assert store.stats() == {"posts": 30, "synced_subreddits": 1}
+
+
+def test_base36_ids_compare_numerically(store, monkeypatch):
+    # "zz" < "100" as strings, but 1295 < 1296 as base-36 numbers
+    listing = FakeNew(0)
+    listing.posts = [post("zz", "older")]
+    monkeypatch.setattr(reddit_tool, "fetch_listing", listing)
+    store.sync("diabetes")
+    listing.posts = [post("100", "newer"), post("zz", "older")]
+    assert store.sync("diabetes") == 1
+    assert store.newest_id("diabetes") == int("100", 36)
+
+
+def test_short_listing_covers_every_window(store, monkeypatch):
+    monkeypatch.setattr(reddit_tool, "fetch_listing", FakeNew(50))
+    store.sync("diabetes")
+    assert store.covered_since("diabetes") == 0
+    assert store.is_warm("diabetes", since=None)
+
+
+def test_partial_sync_is_only_warm_for_the_window_it_covers(store, monkeypatch):
+    # 60 daily posts but only 2 pages of 10 read: the last 19 days are complete
+    monkeypatch.setattr(reddit_tool, "fetch_listing", FakeNew(60, page=10))
+    store.sync("diabetes", max_pages=2)
+    assert store.is_warm("diabetes", since=NOW - 7 * DAY)
+    assert not store.is_warm("diabetes", since=NOW - 30 * DAY)
+    assert not store.is_warm("diabetes", since=None)
+
+
+def test_incremental_sync_keeps_earlier_coverage(store, monkeypatch):
+    listing = FakeNew(60, page=10)
+    monkeypatch.setattr(reddit_tool, "fetch_listing", listing)
+    store.sync("diabetes", max_pages=10)
+    covered = store.covered_since("diabetes")
+
+    listing.posts = [post(FakeNew.base36(5000), "newest", age_days=0)] + listing.posts
+    store.sync("diabetes", max_pages=1)
+    assert store.covered_since("diabetes") == covered
+
+
+def test_stale_sync_is_cold(store, monkeypatch):
+    monkeypatch.setattr(reddit_tool, "fetch_listing", FakeNew(5))
+    store.sync("diabetes")
+    monkeypatch.setattr(post_store, "FRESH_SECONDS", 0)
+    assert not store.is_warm("diabetes")
+
+
+class FakeSyncer:
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, subreddit):
+        self.scheduled.append(subreddit)
+
+
+@pytest.fixture
+def routed(store, monkeypatch):
+    """indexed_posts wired to a fresh store and a recording syncer."""
+    syncer = FakeSyncer()
+    monkeypatch.setattr(post_store, "_post_store", store)
+    monkeypatch.setattr(post_store, "_post_syncer", syncer)
+    monkeypatch.setattr(post_store, "MODE", "auto")
+    monkeypatch.setattr(post_store, "SYNC_IN_BACKGROUND", False)
+    store.add_posts([post("d1", "meal planning", age_days=3), post("d2", "meal planning", age_days=45)])
+    return store, syncer
+
+
+def test_cold_subreddit_is_searched_live_without_background_sync(routed):
+    store, syncer = routed
+    assert indexed_posts("meal", "diabetes", 10, window="month") is None
+    assert syncer.scheduled == []
+
+
+def test_background_sync_is_opt_in(routed, monkeypatch):
+    store, syncer = routed
+    monkeypatch.setattr(post_store, "SYNC_IN_BACKGROUND", True)
+    assert indexed_posts("meal", "diabetes", 10, window="month") is None
+    assert syncer.scheduled == ["diabetes"]
+
+
+def test_warm_subreddit_is_answered_within_the_window(routed, monkeypatch):
+    store, _ = routed
+    monkeypatch.setattr(reddit_tool, "fetch_listing", FakeNew(0))
+    store.sync("diabetes")
+    assert ids(indexed_posts("meal", "diabetes", 10, window="month")) == ["d1"]
+    assert set(ids(indexed_posts("meal", "diabetes", 10, window="all"))) == {"d1", "d2"}
+
+
+def test_offline_and_off_modes(routed, monkeypatch):
+    monkeypatch.setattr(post_store, "MODE", "offline")
+    assert ids(indexed_posts("meal", "diabetes", 10, window="month")) == ["d1"]
+    monkeypatch.setattr(post_store, "MODE", "off")
+    assert indexed_posts("meal", "diabetes", 10) is None
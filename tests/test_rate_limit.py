@@ -0,0 +1,122 @@
+import io
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from product.tools import http_client, rate_limit
+from product.tools.rate_limit import RateLimiter, RateLimitError, TokenBucket, retry_after_seconds
+
+HOST = "api.example.com"
+URL = f"https://{HOST}/search"
+
+
+def test_burst_is_free_then_requests_are_spaced_by_the_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+    assert max(bucket.acquire() for _ in range(3)) < 0.01
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.08
+    assert bucket.metrics()["acquired"] == 5
+
+
+def test_pause_blocks_until_the_server_allows_requests_again():
+    bucket = TokenBucket(rate=1000, capacity=5)
+    bucket.pause(0.05, throttled=True)
+    assert bucket.acquire() >= 0.04
+    assert bucket.metrics()["throttled"] == 1
+
+
+def test_exhausted_ratelimit_headers_pause_the_bucket():
+    bucket = TokenBucket(rate=1000, capacity=5)
+    bucket.observe({"x-ratelimit-remaining": "3", "x-ratelimit-reset": "10"})
+    assert bucket.blocked_until == 0.0
+    bucket.observe({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "0.05"})
+    assert bucket.acquire() >= 0.04
+
+
+def test_limits_per_host_with_env_overrides(monkeypatch):
+    limiter = RateLimiter({"www.reddit.com": (1.0, 5)})
+    monkeypatch.setenv("PRODUCT_RATE_LIMIT_GOOGLE_SERPER_DEV", "0.5/3")
+    assert (limiter.bucket("www.reddit.com").rate, limiter.bucket("www.reddit.com").capacity) == (1.0, 5)
+    assert (limiter.bucket("google.serper.dev").rate, limiter.bucket("google.serper.dev").capacity) == (0.5, 3)
+    assert limiter.bucket("other.example").rate == rate_limit.FALLBACK_LIMIT[0]
+    assert limiter.bucket("www.reddit.com") is limiter.bucket("www.reddit.com")
+
+
+@pytest.mark.parametrize("value", ["fast", "0/3", "1/0"])
+def test_invalid_env_override_is_rejected(monkeypatch, value):
+    monkeypatch.setenv("PRODUCT_RATE_LIMIT_API_EXAMPLE_COM", value)
+    with pytest.raises(ValueError, match="PRODUCT_RATE_LIMIT_API_EXAMPLE_COM"):
+        RateLimiter().bucket(HOST)
+
+
+def test_retry_after_accepts_seconds_dates_and_reset_headers():
+    assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+    assert retry_after_seconds({"Retry-After": formatdate(time.time() + 30, usegmt=True)}) == pytest.approx(30, abs=2)
+    assert retry_after_seconds({"x-ratelimit-reset": "12"}) == 12.0
+    assert retry_after_seconds({}) is None
+
+
+class Session:
+    """Answers with the queued (status, headers) pairs in order."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        status, headers = self.answers.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response.raw = io.BytesIO(b"{}")
+        response.url = url
+        return response
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RateLimiter({HOST: (1000.0, 10)})
+    monkeypatch.setattr(rate_limit, "_limiter", limiter)
+    monkeypatch.setattr(http_client, "backoff_delay", lambda attempt: 0.0)
+    return limiter
+
+
+def use_session(monkeypatch, session: Session) -> Session:
+    monkeypatch.setattr(http_client, "_session", session)
+    return session
+
+
+def test_429_is_retried_after_the_requested_wait(limiter, monkeypatch):
+    session = use_session(monkeypatch, Session((429, {"Retry-After": "0.05"}), (200, {})))
+    start = time.monotonic()
+    assert http_client.get(URL).status_code == 200
+    assert time.monotonic() - start >= 0.04
+    assert session.calls == 2
+    assert limiter.bucket(HOST).metrics()["throttled"] == 1
+
+
+def test_persistent_429_raises_rate_limit_error(limiter, monkeypatch):
+    session = use_session(monkeypatch, Session(*[(429, {})] * 3))
+    with pytest.raises(RateLimitError, match=HOST):
+        http_client.get(URL, max_retries=2)
+    assert session.calls == 3
+
+
+def test_long_retry_after_fails_fast(limiter, monkeypatch):
+    session = use_session(monkeypatch, Session((429, {"Retry-After": "3600"})))
+    with pytest.raises(RateLimitError) as error:
+        http_client.get(URL)
+    assert error.value.retry_after == 3600
+    assert session.calls == 1
+
+
+def test_server_errors_are_retried_then_returned(limiter, monkeypatch):
+    session = use_session(monkeypatch, Session((503, {}), (503, {})))
+    assert http_client.get(URL, max_retries=1).status_code == 503
+    assert session.calls == 2
+    assert limiter.bucket(HOST).metrics()["throttled"] == 0
@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from product.tools.cache import ResponseCache, SingleFlight
+
+CALLERS = 8
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def run_concurrently(flight: SingleFlight, fn, key: str = "k"):
+    """Start CALLERS calls of `fn` under one key; `fn` blocks until every other caller has joined."""
+    release = threading.Event()
+
+    def blocking():
+        release.wait(5)
+        return fn()
+
+    def call():
+        try:
+            return flight.do(key, blocking)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(call) for _ in range(CALLERS)]
+        wait_for(lambda: flight.coalesced == CALLERS - 1)
+        release.set()
+        return [future.result() for future in futures]
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"posts": [1, 2, 3]}
+
+    results = run_concurrently(flight, fetch)
+
+    assert len(calls) == 1
+    assert all(value == {"posts": [1, 2, 3]} for value, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * (CALLERS - 1)
+
+
+def test_joined_callers_get_their_own_copy():
+    flight = SingleFlight()
+    results = run_concurrently(flight, lambda: {"posts": [1]})
+
+    for value, _ in results:
+        value["posts"].append("mutated")
+    assert all(value["posts"] == [1, "mutated"] for value, _ in results)
+
+
+def test_error_is_raised_to_every_caller():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise ConnectionError("upstream down")
+
+    results = run_concurrently(flight, fetch)
+
+    assert len(calls) == 1
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_key_is_released_after_each_call():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.do("k", lambda: 2) == (2, False)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: 3) == (3, False)
+    assert flight.coalesced == 0
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        blocked = executor.submit(flight.do, "slow", lambda: release.wait(5))
+        assert flight.do("fast", lambda: "done") == ("done", False)
+        release.set()
+        assert blocked.result() == (True, False)
+
+
+def test_cache_misses_fetch_once_for_concurrent_callers(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return ["result"]
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(cache.get_or_fetch, "serper", "k", fetch) for _ in range(CALLERS)]
+        wait_for(lambda: cache.flights.coalesced == CALLERS - 1)
+        release.set()
+        assert all(future.result() == ["result"] for future in futures)
+
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, CALLERS - 1, 0)
+    assert cache.get("serper", "k") == ["result"]
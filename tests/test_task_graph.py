@@ -0,0 +1,88 @@
+import pytest
+from crewai import Task
+
+from product.pipeline import TaskGraph
+
+
+def make_task(name: str, description: str = "", context=None) -> Task:
+    kwargs = {"context": context} if context is not None else {}
+    return Task(name=name, description=description or f"Do {name}", expected_output="Text", **kwargs)
+
+
+@pytest.fixture
+def diamond():
+    """research (idea) -> pains (customer) and market (idea) -> strategy."""
+    research = make_task("research", "Research {product_idea}")
+    pains = make_task("pains", "Pains of {target_customer}", context=[research])
+    market = make_task("market", "Size the market for {product_idea}", context=[research])
+    strategy = make_task("strategy", "Recommend a strategy", context=[pains, market])
+    return TaskGraph([research, pains, market, strategy])
+
+
+def test_dependencies_come_from_explicit_context(diamond):
+    assert diamond.deps == {
+        "research": [],
+        "pains": ["research"],
+        "market": ["research"],
+        "strategy": ["pains", "market"],
+    }
+
+
+def test_order_puts_dependencies_first():
+    # Declared out of order on purpose
+    research = make_task("research")
+    strategy = make_task("strategy", context=[research])
+    graph = TaskGraph([strategy, research])
+    assert graph.order == ["research", "strategy"]
+
+
+def test_cycle_is_rejected():
+    a = make_task("a")
+    b = make_task("b", context=[a])
+    a.context = [b]
+    with pytest.raises(ValueError, match="cycle"):
+        TaskGraph([a, b])
+
+
+def test_descendants_include_the_task_and_everything_downstream(diamond):
+    assert diamond.descendants("research") == {"research", "pains", "market", "strategy"}
+    assert diamond.descendants("pains") == {"pains", "strategy"}
+    assert diamond.descendants("strategy") == {"strategy"}
+
+
+def test_descendants_of_unknown_task(diamond):
+    with pytest.raises(KeyError, match="Unknown task"):
+        diamond.descendants("nope")
+
+
+def test_ready_waits_for_all_dependencies(diamond):
+    assert diamond.ready(done=set(), started=set()) == ["research"]
+    assert sorted(diamond.ready(done={"research"}, started={"research"})) == ["market", "pains"]
+    assert diamond.ready(done={"research", "pains"}, started={"research", "pains", "market"}) == []
+    assert diamond.ready(done={"research", "pains", "market"}, started={"research", "pains", "market"}) == ["strategy"]
+
+
+def test_fingerprints_are_stable(diamond):
+    inputs = {"product_idea": "meal planner", "target_customer": "adults"}
+    assert diamond.fingerprints(inputs) == diamond.fingerprints(dict(inputs))
+
+
+def test_fingerprints_change_only_for_tasks_using_the_changed_input(diamond):
+    before = diamond.fingerprints({"product_idea": "meal planner", "target_customer": "adults"})
+    after = diamond.fingerprints({"product_idea": "meal planner", "target_customer": "teens"})
+
+    changed = {name for name in before if before[name] != after[name]}
+    # pains reads {target_customer}; strategy consumes pains
+    assert changed == {"pains", "strategy"}
+
+
+def test_fingerprints_ignore_inputs_no_task_reads(diamond):
+    inputs = {"product_idea": "meal planner", "target_customer": "adults"}
+    assert diamond.fingerprints(inputs) == diamond.fingerprints({**inputs, "unused": "anything"})
+
+
+def test_fingerprints_follow_template_changes():
+    research = make_task("research", "Research {product_idea}")
+    changed = make_task("research", "Research {product_idea} in depth")
+    inputs = {"product_idea": "meal planner"}
+    assert TaskGraph([research]).fingerprints(inputs) != TaskGraph([changed]).fingerprints(inputs)
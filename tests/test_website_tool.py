@@ -0,0 +1,194 @@
+import sys
+from array import array
+
+import pytest
+import requests
+
+from product.tools import http_client, website_tool
+from product.tools.website_tool import PageStore, chunk_text, html_to_text, similarities
+
+URL = "https://example.com/pricing"
+OTHER_URL = "https://example.com/about"
+# Each paragraph is long enough to become a chunk of its own
+BASIC = "Basic plan costs $10 per month. " * 20
+FAMILY = "Family plan covers four people. " * 20
+PAGE = f"<html><head><style>p {{}}</style></head><body><p>{BASIC}</p><p>{FAMILY}</p><script>x()</script></body></html>"
+
+
+def letters(text: str) -> list:
+    """Tiny deterministic embedding: letter counts."""
+    vector = [0.0] * 26
+    for char in text.lower():
+        if "a" <= char <= "z":
+            vector[ord(char) - ord("a")] += 1
+    return vector
+
+
+class Embedder:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [letters(text) for text in texts]
+
+
+class Server:
+    """Serves pages with an ETag and answers 304 when the client sends it back."""
+
+    def __init__(self, body: str = PAGE, content_type: str = "text/html; charset=utf-8"):
+        self.body = body.encode("utf-8")
+        self.pages = {OTHER_URL: b"<p>About us: a small team of dietitians.</p>"}
+        self.content_type = content_type
+        self.etag = '"v1"'
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        response = requests.Response()
+        response.url = url
+        if headers and headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+            return response
+        response.status_code = 200
+        response._content = self.pages.get(url, self.body)
+        response.headers.update({"ETag": self.etag, "Content-Type": self.content_type})
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = Server()
+    monkeypatch.setattr(http_client, "get", server.get)
+    return server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(website_tool.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PageStore(tmp_path / "pages.sqlite3", embed=Embedder())
+
+
+def test_html_to_text_keeps_visible_blocks():
+    html = "<head><title>t</title></head><h1>Pricing</h1><p>Basic  plan</p><script>x()</script><li>Family</li>"
+    assert html_to_text(html) == "Pricing\nBasic plan\nFamily"
+
+
+def test_chunk_text_splits_on_lines_and_long_lines():
+    assert chunk_text("aaa\nbbb\nccc", size=8) == ["aaa\nbbb", "ccc"]
+    assert chunk_text("x" * 20, size=8) == ["x" * 8, "x" * 8, "x" * 4]
+
+
+def test_similarities_match_without_numpy(monkeypatch):
+    query = array("f", [1.0, 0.0, 1.0])
+    blobs = [array("f", vector).tobytes() for vector in ([1.0, 0.0, 1.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0])]
+    expected = similarities(query, blobs)
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    assert similarities(query, blobs) == pytest.approx(expected)
+    assert expected == pytest.approx([1.0, 0.0, 0.0])
+
+
+def test_search_ranks_passages_of_the_page(store, server):
+    assert store.search(URL, "family plan for four people", top_k=1) == [FAMILY.strip()]
+    assert store.search(URL, "basic monthly cost", top_k=2) == [BASIC.strip(), FAMILY.strip()]
+
+
+def test_recent_pages_are_not_refetched(store, server, clock):
+    store.search(URL, "price")
+    clock.now += website_tool.RECHECK_SECONDS - 1
+    store.search(URL, "price")
+    assert len(server.requests) == 1
+
+
+def test_stale_pages_are_revalidated_with_their_etag(store, server, clock):
+    store.search(URL, "price")
+    embedded = list(store.embed.texts)
+
+    clock.now += website_tool.RECHECK_SECONDS + 1
+    assert store.search(URL, "price")
+    assert server.requests[-1] == {"If-None-Match": '"v1"'}
+    assert store.embed.texts == embedded
+
+
+def test_unchanged_content_under_a_new_etag_is_not_re_embedded(store, server, clock):
+    store.search(URL, "price")
+    embedded = list(store.embed.texts)
+    server.etag = '"v2"'
+    clock.now += website_tool.RECHECK_SECONDS + 1
+    store.search(URL, "price")
+    assert len(server.requests) == 2
+    assert store.embed.texts == embedded
+
+
+def test_changed_pages_only_embed_new_chunks(store, server, clock):
+    store.search(URL, "price")
+    server.body = PAGE.replace("four", "six").encode("utf-8")
+    server.etag = '"v2"'
+    clock.now += website_tool.RECHECK_SECONDS + 1
+    store.embed.texts.clear()
+
+    changed = FAMILY.replace("four", "six").strip()
+    assert changed in store.search(URL, "price")
+    assert store.embed.texts == [changed]
+
+
+def test_query_embeddings_are_stored_apart_from_chunks(store, server):
+    store.search(URL, "monthly price")
+    store.search(URL, "monthly price")
+
+    stats = store.stats()
+    assert stats["queries"] == 1
+    assert stats["chunks"] == 2
+    assert store.embed.texts.count("query: monthly price") == 1
+    assert all(not text.startswith("query:") for text in store.search(URL, "monthly price", top_k=10))
+
+
+def test_size_cap_evicts_least_recently_used_chunks(tmp_path, server, clock, monkeypatch):
+    store = PageStore(tmp_path / "pages.sqlite3", embed=Embedder())
+    store.search(URL, "price")
+    clock.now += 10
+    store.search(OTHER_URL, "price")
+    # Room for the newer page only: the older one is dropped and re-indexed on next use
+    monkeypatch.setattr(website_tool, "MAX_STORE_BYTES", store.stats()["bytes"] - 1)
+    store.evict(clock.now)
+
+    assert store._query("SELECT url FROM pages") == [(OTHER_URL,)]
+    monkeypatch.setattr(website_tool, "MAX_STORE_BYTES", 10 ** 9)
+    assert store.search(URL, "price")
+    assert len(server.requests) == 3
+
+
+def test_old_pages_and_queries_age_out(store, server, clock):
+    store.search(URL, "price")
+    clock.now += website_tool.MAX_PAGE_AGE_SECONDS + 1
+    store.evict(clock.now)
+    assert store.stats()["pages"] == 0
+    assert store.stats()["chunks"] == 0
+    assert store.stats()["queries"] == 0
+
+
+@pytest.mark.parametrize("body, content_type", [
+    ("Café crème".encode("utf-8"), "text/html"),
+    ("Café crème".encode("cp1252"), "text/html; charset=windows-1252"),
+    ("Café crème".encode("utf-8")[:-1], "text/html"),
+], ids=["utf-8", "declared", "cut-multibyte"])
+def test_pages_without_a_charset_are_not_decoded_as_latin_1(store, server, body, content_type):
+    server.body, server.content_type = b"<p>" + body, content_type
+    (passage,) = store.search(URL, "coffee")
+    assert passage.startswith("Café crèm")